@@ -20,9 +20,20 @@ Moving any of these folders or files will prevent the game from working properly
 Author: Walker M. White (wmw2)
 Date:   November 20, 2019
 """
+import os
+import sys
+
+# Asserts can only be removed when Python starts, so restart it with -O.  This
+# happens before consts removes the options it reads from sys.argv.
+if __name__ == '__main__' and __debug__ and '--unchecked' in sys.argv:
+    os.execv(sys.executable, [sys.executable, '-O'] + sys.argv)
+
 from consts import *
 from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,
+             step=GAME_STEP,maxsteps=GAME_MAXSTEPS,
+             backend=GAME_BACKEND,scale=GAME_SCALE,profile=GAME_PROFILE,
+             record=GAME_RECORD,replay=GAME_REPLAY,track=GAME_TRACK).run()
@@ -75,7 +75,8 @@ class Invaders(GameApp):
     #Invariant: _lastkeys is an int >= 0
     #
     #Attribute _background: the background color of the game
-    #Invariant: _background is a GRectangle object.
+    #Invariant: _background is a GRectangle object, attached to the view
+    #(so it is not drawn in draw)
     #
     #Attribute _level: the level the player is on
     #Invariant: _level is an int >= 0
@@ -86,12 +87,30 @@ class Invaders(GameApp):
     #Attribute _instructions: Instructions to display
     #Invariant: _instructions  is a list of GLabel objects or empty list
     #
+    #Attribute _prompt: the hint on the start screen for the instructions
+    #Invariant: _prompt is a GLabel object
+    #
+    #Attribute _message: the label for the pause and game over messages
+    #Invariant: _message is a GLabel object; _text is _message whenever one
+    #of these messages is shown
+    #
+    #The labels above are made once, in start. Changing the text of a GLabel
+    #only renders new text when the text is different, so a frame where the
+    #score and messages stay the same renders no text at all.
+    #
     #Attribute: _totalscore: the total score of the player
     #Invariant: _totalscore: int >= 0
     #
     #Attribute: _scoreDisplay: Displays the totalscore of the player
     #Invariant: _scoreDisplay is a GLabel object
     #
+    #Attribute _sounds: the sound effects of the game, keyed by file name
+    #Invariant: _sounds is a SoundBank object containing every sound in GAME_SOUNDS
+    #
+    #Attribute _profilekeys: the profiler keys held down at the last update
+    #Invariant: _profilekeys is a set containing some of PROFILE_KEY,
+    #PROFILE_SAVE_KEY, TRACK_KEY and TRACK_SAVE_KEY
+    #
 
 
     # DO NOT MAKE A NEW INITIALIZER!
@@ -113,17 +132,28 @@ class Invaders(GameApp):
         """
         self._state = STATE_INACTIVE
         self._wave = None
+        self._backgroundcolor()
+        self._background.attach(self.view)
         self._lastkeys = 0
+        self._profilekeys = set()
         start_mes = "Press 'S' to Play"
         center_x = GAME_WIDTH/2
         center_y = GAME_HEIGHT/2
         self._text = GLabel(text = start_mes, font_size = 80, x = center_x, y = center_y,
         bold = True, font_name = 'Arcade', fillcolor = 'black', linecolor = 'white')
         self._level = 1
-        self._round = self._displayRound()
-        self._instructions = None
+        self._round = self._hudLabel(GAME_WIDTH - 100 - ALIEN_H_SEP)
+        self._displayRound()
+        self._instructions = self._makeInstructions()
+        self._prompt = self._callInstructions()
+        self._message = GLabel(text = '', font_size = 35, x = center_x, y = center_y,
+        bold = True, font_name = 'Arcade', linecolor = 'white', fillcolor = 'black')
         self._totalscore = 0
-        self._scoreDisplay = self._displayScore()
+        self._scoreDisplay = self._hudLabel(GAME_WIDTH/2)
+        self._displayScore()
+        self._sounds = SoundBank(voices=SOUND_VOICES)
+        for source in GAME_SOUNDS:
+            self._sounds[source] = source
 
     def update(self,dt):
         """
@@ -180,6 +210,7 @@ class Invaders(GameApp):
         Precondition: dt is a number (int or float)
         """
         assert type(dt) in [int, float]
+        self._profileKeys()
         if self._state == STATE_INACTIVE:
             self._stateInactive(dt)
         if self._state == STATE_NEWWAVE:
@@ -198,6 +229,27 @@ class Invaders(GameApp):
             self._stateLevel(dt)
         if self._state == STATE_INSTRUCTIONS:
             self._stateInstructions(dt)
+        if self._wave != None:
+            self._wave.updateWreck(dt)
+        self._sounds.flush()
+
+    def interpolate(self, alpha):
+        """
+        Tells the wave how far into the next update to draw moving objects.
+
+        The game updates at a fixed rate (GAME_STEP), which is not the same
+        as the frame rate. This method is called just before draw with the
+        fraction of a step left over since the last update. The wave only
+        moves while it is active, so otherwise it is drawn where it is.
+
+        Parameter alpha: the fraction of a step since the last update
+        Precondition: alpha is a float in [0,1]
+        """
+        if self._wave != None:
+            if self._state == STATE_ACTIVE:
+                self._wave.setAlpha(alpha)
+            else:
+                self._wave.setAlpha(1.0)
 
     def draw(self):
         """
@@ -213,7 +265,6 @@ class Invaders(GameApp):
         class Wave.  We suggest the latter.  See the example subcontroller.py
         from class.
         """
-        self._background.draw(self.view)
         if self._state != STATE_INACTIVE and self._state != STATE_INSTRUCTIONS:
             self._wave.draw(self.view)
         if not self._text == None: #STATE_INACTIVE
@@ -222,7 +273,7 @@ class Invaders(GameApp):
             self._round.draw(self.view)
             self._scoreDisplay.draw(self.view)
         if self._state == STATE_INACTIVE:
-            self._callInstructions().draw(self.view)
+            self._prompt.draw(self.view)
         if self._state == STATE_INSTRUCTIONS:
             for thing in range(len(self._instructions)):
                 self._instructions[thing].draw(self.view)
@@ -239,28 +290,38 @@ class Invaders(GameApp):
         bold = True, font_name = 'Arcade',linecolor = 'white', fillcolor = 'black')
 
 
-    def _displayRound(self):
+    def _hudLabel(self, x):
         """
-        Displays the round number in the upper right corner.
+        Returns an empty GLabel for the top of the screen, centered at x.
+
+        Parameter x: the horizontal coordinate of the label center
+        Precondition: x is an int or float
         """
-        mes = 'Level: ' + str(self._level)
-        x = GAME_WIDTH - 100 - ALIEN_H_SEP
         y = GAME_HEIGHT - ALIEN_V_SEP - 25
-        return GLabel(text = mes, font_size = 40, x = x, y = y,
+        return GLabel(text = '', font_size = 40, x = x, y = y,
         bold = True, font_name = 'Arcade',linecolor = 'white', fillcolor = 'black')
 
+    def _displayRound(self):
+        """
+        Displays the round number in the upper right corner.
+        """
+        self._round.text = 'Level: ' + str(self._level)
+
     def _displayScore(self):
         """
-        Displays the total score in the upper right corner
+        Displays the total score at the top of the screen
+        """
+        self._scoreDisplay.text = 'Score: ' + str(self._totalscore)
 
-        Parameter totalscore: the total score of the player
-        Precondition: int >= 0
+    def _showMessage(self, mes):
         """
-        mes = 'Score: ' + str(self._totalscore)
-        x = GAME_WIDTH/2
-        y = GAME_HEIGHT - ALIEN_V_SEP - 25
-        return GLabel(text = mes, font_size = 40, x = x, y = y,
-        bold = True, font_name = 'Arcade',linecolor = 'white', fillcolor = 'black')
+        Shows mes in the middle of the screen.
+
+        Parameter mes: the message to show
+        Precondition: mes is a string
+        """
+        self._message.text = mes
+        self._text = self._message
 
     def _determineState(self):
         """
@@ -282,7 +343,16 @@ class Invaders(GameApp):
         Precondition: dt is a number (int or float)
         """
         self._text = None
-        self._round = None
+        if self.input.is_key_down('s'):
+            self._state = STATE_NEWWAVE
+            self._wave = Wave(SHIP_LIVES, ALIEN_SPEED, ALIEN_ROWS, self._totalscore,
+                              self._sounds, self.profiler, self.random_seed())
+            self._displayRound()
+
+    def _makeInstructions(self):
+        """
+        Returns the list of GLabels for the instructions screen.
+        """
         mes1 = "1. Use the right and left arrow keys to move the ship \n"
         mes2 = "2. Use the up arrow key to fire a bolt at the aliens \n"
         mes3 = "3. Kill all aliens to progress to next level \n"
@@ -295,11 +365,7 @@ class Invaders(GameApp):
          bold = True, font_name = 'Arcade', linecolor = 'white', fillcolor = 'black')
         obj2 = GLabel(text = mes_exit, font_size = 35, x = center_x, y = GAME_HEIGHT/2,
          bold = True, font_name = 'Arcade', linecolor = 'white', fillcolor = 'black')
-        self._instructions = [obj1, obj2]
-        if self.input.is_key_down('s'):
-            self._state = STATE_NEWWAVE
-            self._wave = Wave(SHIP_LIVES, ALIEN_SPEED, ALIEN_ROWS, self._totalscore)
-            self._round = self._displayRound()
+        return [obj1, obj2]
 
     def _stateContinue(self, dt):
         """
@@ -320,11 +386,12 @@ class Invaders(GameApp):
         Precondition: dt is a number (int or float)
         """
         self._text = None
-        self._wave = Wave(SHIP_LIVES, ALIEN_SPEED, ALIEN_ROWS, 0)
+        self._wave = Wave(SHIP_LIVES, ALIEN_SPEED, ALIEN_ROWS, 0, self._sounds,
+                          self.profiler, self.random_seed())
         self._state = STATE_ACTIVE
         self._level = 1
-        self._round = self._displayRound()
-        self._scoreDisplay = self._displayScore()
+        self._displayRound()
+        self._displayScore()
 
     def _stateInactive(self, dt):
         """
@@ -333,7 +400,6 @@ class Invaders(GameApp):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        self._backgroundcolor()
         self._determineState()
 
     def _stateLevel(self, dt):
@@ -349,11 +415,12 @@ class Invaders(GameApp):
         new_speed = old_speed*0.97
         old_rows = self._wave.getAlienRows()
         new_alienrows = min(old_rows + 1, 10)
-        self._wave = Wave(old_lives, new_speed, new_alienrows, self._totalscore)
+        self._wave = Wave(old_lives, new_speed, new_alienrows, self._totalscore,
+                          self._sounds, self.profiler, self.random_seed())
         self._state = STATE_ACTIVE
         self._level = self._level + 1
-        self._round = self._displayRound()
-        self._scoreDisplay = self._displayScore()
+        self._displayRound()
+        self._displayScore()
 
     def _statePaused(self):
         """
@@ -363,10 +430,7 @@ class Invaders(GameApp):
         #if self._wave.getLives() != 0:
         mes = ('Uh oh. You now have ' + str(self._wave.getLives()) +
         ' lives left. \n Press "s" to resume.')
-        center_x = GAME_WIDTH/2
-        center_y = GAME_HEIGHT/2
-        self._text = GLabel(text = mes, font_size = 35, x = center_x, y = center_y,
-        bold = True, font_name = 'Arcade', linecolor = 'white', fillcolor = 'black')
+        self._showMessage(mes)
 
     def _stateComplete(self):
         """
@@ -375,18 +439,12 @@ class Invaders(GameApp):
         if self._wave.getWin() == True:
             #self._state = STATE_INACTIVE
             mes = 'Congrats! you won!!! \n Press "spacebar" to continue to next level'
-            center_x = GAME_WIDTH/2
-            center_y = GAME_HEIGHT/2
-            self._text = GLabel(text = mes, font_size = 35, x = center_x, y = center_y,
-            bold = True, font_name = 'Arcade',linecolor = 'white', fillcolor = 'black')
+            self._showMessage(mes)
             if self.input.is_key_down('spacebar'):
                 self._state = STATE_LEVEL
         else:
             mes = 'Uh oh. You lost :( \n Press "s" to play again.'
-            center_x = GAME_WIDTH/2
-            center_y = GAME_HEIGHT/2
-            self._text = GLabel(text = mes, font_size = 35, x = center_x, y = center_y,
-            bold = True, font_name = 'Arcade', linecolor = 'white', fillcolor = 'black')
+            self._showMessage(mes)
             self._determineState()
 
     def _stateActive(self, dt):
@@ -408,13 +466,41 @@ class Invaders(GameApp):
         self._wave.shipDead(dt)
         score = self._wave.getScore()
         self._totalscore = score
-        self._scoreDisplay = self._displayScore()
+        self._displayScore()
         if self._wave.getShip() == None:
             if self._wave.getLives() != 0:
                 self._state = STATE_PAUSED
             else:
                 self._state = STATE_COMPLETE
 
+    def _profileKeys(self):
+        """
+        Shows or hides the frame times or allocations, or saves them, when
+        their key is pressed.
+
+        The keys are PROFILE_KEY and PROFILE_SAVE_KEY for the frame times,
+        and TRACK_KEY and TRACK_SAVE_KEY for the allocations. A key only
+        counts when it goes down, not for as long as it is held.
+        """
+        down = set()
+        for key in (PROFILE_KEY, PROFILE_SAVE_KEY, TRACK_KEY, TRACK_SAVE_KEY):
+            if self.input.is_key_down(key):
+                down.add(key)
+        pressed = down - self._profilekeys
+        self._profilekeys = down
+        if PROFILE_KEY in pressed:
+            self.profiler.enabled = True
+            self.profiler.visible = not self.profiler.visible
+        if PROFILE_SAVE_KEY in pressed:
+            self.profiler.save(PROFILE_FILE)
+            print('Saved the frame times to', PROFILE_FILE)
+        if TRACK_KEY in pressed:
+            self.tracker.enabled = True
+            self.tracker.visible = not self.tracker.visible
+        if TRACK_SAVE_KEY in pressed:
+            self.tracker.save(TRACK_FILE)
+            print('Saved the objects made per frame to', TRACK_FILE)
+
     def _backgroundcolor(self):
         """
         Changes the backgroundcolor for the game.
@@ -0,0 +1,1026 @@
+"""
+Benchmarks for Alien Invaders
+
+This module times the hot spots of the game on the headless simulation in
+core.py, so it runs without a display.  Run it from the command line as
+
+    python invaders/bench.py
+
+Each benchmark prints one line per configuration.  The aliens use the
+largest formation allowed by consts.py (10 rows of 15 aliens).
+
+The graphics benchmark times the drawables in game2d instead. It needs a
+window (the SDL offscreen driver is enough), so it only runs when asked for:
+
+    python invaders/bench.py graphics
+
+The software benchmark plays the game with the software view of game2d,
+which needs no window at all:
+
+    python invaders/bench.py software
+
+The suite plays whole scenarios (the largest formation, a storm of bolts,
+rows of explosions, and a game of several levels) and compares them with
+a baseline saved on the same computer. It exits with status 1 if any
+scenario got slower:
+
+    python invaders/bench.py suite [scenario ...] [--save]
+
+The baseline is not part of the repository, since its times only hold for
+the computer that saved them. Save one with --save before making changes.
+
+Games recorded with --record (see consts.py) play back the same way every
+time, so they can be timed too. The replay plays them without drawing the
+frames, many times faster than real time:
+
+    python invaders/bench.py replay game.json [game2.json ...]
+
+The allocation benchmark plays the same game as the suite, and counts the
+objects made per frame by each class of the game:
+
+    python invaders/bench.py alloc
+"""
+from consts import *
+from core import *
+import introcs
+import numpy as np
+import os
+import random
+import time
+
+# The largest formation allowed on the command line (see consts.py)
+MAX_ROWS = 10
+MAX_COLUMNS = 15
+
+
+def timeit(func, repeat):
+    """
+    Returns the average time in seconds of one call to func.
+
+    Parameter func: the function to time
+    Precondition: func is a function with no arguments
+
+    Parameter repeat: the number of calls to average over
+    Precondition: repeat is an int > 0
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter()-start)/repeat
+
+
+def bruteAlienDead(aliens, bolts):
+    """
+    Returns the (row, column, bolt) hits of the original triple loop.
+
+    This is the collision pass that Wave.alienDead used before the
+    broadphase: every alien is tested against every player bolt. It does
+    not change aliens or bolts.
+
+    Parameter aliens: the alien formation
+    Precondition: aliens is a Formation object
+
+    Parameter bolts: the bolts on screen
+    Precondition: bolts is a list of BoltState objects
+    """
+    hits = []
+    spent = set()
+    for r in range(aliens.rows):
+        for c in range(aliens.columns):
+            for i in range(len(bolts)):
+                bolt = bolts[i]
+                if (not i in spent and bolt.isPlayerBolt()
+                    and aliens.hitBy(r, c, bolt, bolt.velocity)):
+                    hits.append((r, c, i))
+                    spent.add(i)
+                    break
+    return hits
+
+
+def listSparks(sparks):
+    """
+    Moves and culls sparks the way Wave did before the particle system.
+
+    Every spark is a [x, y, vx, vy] list, moved one at a time and removed with
+    a while/del loop.
+
+    Parameter sparks: the sparks to move
+    Precondition: sparks is a list of 4-element lists of floats
+    """
+    for spark in sparks:
+        spark[0] += spark[2]
+        spark[1] += spark[3]
+        spark[3] += GRAVITY
+    i = 0
+    while i < len(sparks):
+        if sparks[i][1] < -10:
+            del sparks[i]
+        else:
+            i += 1
+
+
+def cornerCollides(shape, other):
+    """
+    Returns True if a corner of other is inside of shape, using GObject.contains.
+
+    This is the collision test that the models used before GObject.intersects.
+
+    Parameter shape: the shape to check against
+    Precondition: shape is a GObject
+
+    Parameter other: the shape whose corners are checked
+    Precondition: other is a GObject
+    """
+    hw = other.width/2
+    hh = other.height/2
+    return (shape.contains((other.x-hw, other.y+hh)) or
+            shape.contains((other.x+hw, other.y+hh)) or
+            shape.contains((other.x-hw, other.y-hh)) or
+            shape.contains((other.x+hw, other.y-hh)))
+
+
+def matrixContains(shape, point, angle):
+    """
+    Returns True if shape, turned to angle, contains point.
+
+    This is how a rotated GObject was checked before game2d had GAffine:
+    the angle setter compared angles with numpy, every change built two new
+    introcs matrices, and contains inverted one of them again. The matrices
+    are built in the right order here (introcs multiplies on the left), so
+    the result can be checked against GAffine.
+
+    Parameter shape: the shape to check
+    Precondition: shape is a GObject
+
+    Parameter point: the point to check
+    Precondition: point is a pair of numbers
+
+    Parameter angle: the angle to turn the shape to
+    Precondition: angle is a float
+    """
+    from introcs.geom import Matrix
+    np.allclose([shape.angle], [angle])
+    matrix = Matrix()
+    matrix.scale(*shape.scale)
+    matrix.rotate(angle)
+    matrix.translate(shape.x, shape.y)
+    inverse = Matrix()
+    inverse.translate(-shape.x, -shape.y)
+    inverse.rotate(-angle)
+    inverse.scale(1/shape.scale[0], 1/shape.scale[1])
+    p = list(matrix.inverse()._transform(point[0], point[1]))
+    return abs(p[0]) < shape.width/2 and abs(p[1]) < shape.height/2
+
+
+def _explosions(nsparks, seed):
+    """
+    Returns a Particles object with nsparks sparks in explosions across the screen.
+
+    Parameter nsparks: the number of sparks
+    Precondition: nsparks is a multiple of PARTICLES_PER_SHELL
+
+    Parameter seed: the random seed for the explosions
+    Precondition: seed is an int
+    """
+    rng = random.Random(seed)
+    sparks = Particles(seed)
+    for _ in range(nsparks//PARTICLES_PER_SHELL):
+        color = introcs.RGB(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        x = rng.uniform(0, GAME_WIDTH)
+        y = rng.uniform(DEFENSE_LINE, GAME_HEIGHT)
+        sparks.burst(x, y, PARTICLES_PER_SHELL, color)
+    return sparks
+
+
+def _stormCore(nbolts, seed):
+    """
+    Returns a full-size WaveCore with nbolts player bolts inside the formation.
+
+    Parameter nbolts: the number of bolts to fire into the formation
+    Precondition: nbolts is an int >= 0
+
+    Parameter seed: the random seed for the bolt positions
+    Precondition: seed is an int
+    """
+    core = WaveCore(SHIP_LIVES, ALIEN_SPEED, MAX_ROWS, 0, columns=MAX_COLUMNS, seed=seed)
+    rng = random.Random(seed)
+    aliens = core.getAliens()
+    left = float(aliens.x.min()) - ALIEN_WIDTH
+    right = float(aliens.x.max()) + ALIEN_WIDTH
+    bottom = float(aliens.y.min()) - ALIEN_HEIGHT
+    top = float(aliens.y.max()) + ALIEN_HEIGHT
+    for _ in range(nbolts):
+        x = rng.uniform(left, right)
+        y = rng.uniform(bottom, top)
+        core.getBolts().append(BoltState(x, y, BOLT_SPEED))
+    return core
+
+
+def benchCollisions(repeat=2000):
+    """
+    Times bolt-vs-alien collision at full formation size.
+
+    It compares the original triple loop with the search in WaveCore.alienDead
+    (which uses the formation grid as a broadphase), and checks that both find
+    the same aliens hit by the same bolts.
+
+    Parameter repeat: the number of passes to average over
+    Precondition: repeat is an int > 0
+    """
+    print('collisions: %dx%d aliens' % (MAX_ROWS, MAX_COLUMNS))
+    for nbolts in (1, 4, 16, 64):
+        core = _stormCore(nbolts, nbolts)
+        aliens = core.getAliens()
+        bolts = core.getBolts()
+        expected = bruteAlienDead(aliens, bolts)
+        brute = timeit(lambda: bruteAlienDead(aliens, bolts), repeat)
+        grid = timeit(core._alienHits, repeat)
+        got = core._alienHits()
+        assert got == expected, 'broadphase disagrees with brute force'
+        print('  %3d bolts: brute %8.1f us  grid %8.1f us  speedup %5.1fx  (%d hits)'
+              % (nbolts, brute*1e6, grid*1e6, brute/grid, len(got)))
+
+
+def benchParticles(frames=60):
+    """
+    Times moving and culling explosion sparks for one second of play.
+
+    It compares the original list of sparks with the arrays of the class
+    Particles, starting from the same sparks, and checks that both leave the
+    same sparks on screen.
+
+    Parameter frames: the number of frames to simulate
+    Precondition: frames is an int > 0
+    """
+    print('particles: %d frames' % frames)
+    for nsparks in (1000, 10000, 50000):
+        sparks = _explosions(nsparks, nsparks)
+        n = sparks.count
+        reference = [[sparks.x[i], sparks.y[i], sparks.vx[i], sparks.vy[i]]
+                     for i in range(n)]
+
+        def runList():
+            for _ in range(frames):
+                listSparks(reference)
+
+        def runArrays():
+            for _ in range(frames):
+                sparks.move()
+                sparks.cull(-10)
+
+        brute = timeit(runList, 1)
+        arrays = timeit(runArrays, 1)
+        left = [spark[1] for spark in reference]
+        assert len(left) == sparks.count, 'particle system lost sparks'
+        assert np.allclose(left, sparks.y[:sparks.count]), 'particle system disagrees'
+        print('  %5d sparks: list %8.2f ms/frame  arrays %6.3f ms/frame  speedup %5.1fx  (%d left)'
+              % (nsparks, brute*1e3/frames, arrays*1e3/frames, brute/arrays, sparks.count))
+
+
+def benchTunneling(shots=1000):
+    """
+    Counts the bolts that pass through an alien without hitting it.
+
+    Bolts are fired straight up through an alien from evenly spaced starting
+    heights, and checked once per update, at several bolt speeds. It compares
+    checking only where the bolt is (the old test) with checking its whole
+    path since the last update (Box.hitBy with the bolt velocity).
+
+    Parameter shots: the number of bolts to fire at each speed
+    Precondition: shots is an int > 0
+    """
+    print('tunneling: %d bolts through one alien' % shots)
+    alien = Box(0, 0, ALIEN_WIDTH, ALIEN_HEIGHT)
+    for speed in (BOLT_SPEED, 2*ALIEN_HEIGHT, 4*ALIEN_HEIGHT):
+        missed = [0, 0]
+        for shot in range(shots):
+            bolt = BoltState(0, -200 + speed*shot/shots, speed)
+            hit = [False, False]
+            while bolt.y < 200:
+                bolt.y += speed
+                hit[0] = hit[0] or alien.hitBy(bolt)
+                hit[1] = hit[1] or alien.hitBy(bolt, 0, speed)
+            missed[0] += not hit[0]
+            missed[1] += not hit[1]
+        print('  speed %3d: missed %4d by position, %d by path' % (speed, missed[0], missed[1]))
+
+
+def _graphicsSetup():
+    """
+    Opens a window and points game2d at the game resources.
+
+    Some drawables (like GLabel) cannot be made without a window, and the
+    atlas texture of a sprite batch needs one to be drawn.
+    """
+    import os
+    os.environ['KIVY_NO_ARGS'] = '1'
+    from kivy.core.window import Window
+    _resourceSetup()
+
+
+def _resourceSetup():
+    """
+    Points game2d at the game resources, without opening a window.
+
+    This is enough to make a Wave and sync its drawables, as long as
+    nothing is drawn to a view.
+    """
+    import os
+    os.environ['KIVY_NO_ARGS'] = '1'
+    import kivy.resources
+    from game2d import GameApp
+
+    folder = os.path.dirname(os.path.abspath(__file__))
+    GameApp.images = os.path.join(folder, 'Images')
+    GameApp.fonts  = os.path.join(folder, 'Fonts')
+    GameApp.sounds = os.path.join(folder, 'Sounds')
+    for path in (GameApp.images, GameApp.fonts, GameApp.sounds):
+        kivy.resources.resource_add_path(path)
+
+
+def _graphicsClasses():
+    """
+    Returns a list of (name, factory, changes) for each drawable in game2d.
+
+    The factory makes a new object of that class. The changes are a list of
+    (attribute, value, value) triples: one attribute change that affects how
+    the object looks, with two values to alternate between.
+
+    GPolygon is left out, as it cannot draw without a source image yet.
+    """
+    _graphicsSetup()
+    from game2d import GRectangle, GEllipse, GImage, GSprite, GLabel
+    from game2d import GPath, GTriangle, GScene, GParticles, GSpriteBatch
+
+    shape = [('width', 10, 20), ('height', 10, 20),
+             ('fillcolor', 'red', 'blue'), ('linecolor', 'white', 'green')]
+    box = dict(x=50, y=50, width=10, height=10)
+    return [
+        ('GRectangle', lambda: GRectangle(fillcolor='red', **box),
+         shape+[('linewidth', 1, 2)]),
+        ('GEllipse', lambda: GEllipse(fillcolor='red', **box), shape),
+        ('GImage', lambda: GImage(source='ship.png', **box),
+         shape[:3]+[('source', 'alien1.png', 'alien2.png')]),
+        ('GSprite', lambda: GSprite(source=SHIP_STRIP, format=SHIP_FORMAT, **box),
+         shape[:3]+[('source', ALIEN_STRIPS[0], ALIEN_STRIPS[1])]),
+        ('GLabel', lambda: GLabel(text='Score: 0', font_name='Arcade', font_size=30),
+         shape[2:]+[('halign', 'left', 'right'), ('valign', 'top', 'bottom'),
+                    ('linewidth', 1, 2)]),
+        ('GPath', lambda: GPath(points=[0, 0, 10, 10, 20, 0], linecolor='white'),
+         [('points', [0, 0, 10, 10], [0, 0, 20, 20]), ('linewidth', 1, 2),
+          ('linecolor', 'white', 'green')]),
+        ('GTriangle', lambda: GTriangle(points=[0, 0, 10, 10, 20, 0], fillcolor='red'),
+         [('points', [0, 0, 10, 10, 20, 0], [0, 0, 20, 20, 40, 0]),
+          ('fillcolor', 'red', 'blue'), ('linecolor', 'white', 'green')]),
+        ('GScene', lambda: GScene(children=[GRectangle(**box), GEllipse(**box)]),
+         [('children', [GRectangle(**box)], [GEllipse(**box)])]),
+        ('GParticles', lambda: GParticles(diameter=PARTICLE_DIAMETER),
+         [('fillcolor', 'red', 'blue')]),
+        ('GSpriteBatch', lambda: GSpriteBatch(), [('fillcolor', 'red', 'blue')]),
+    ]
+
+
+def benchGraphics(repeat=200):
+    """
+    Times making and changing each drawable in game2d.
+
+    A change sets every attribute that affects how the object looks, then
+    draws it. "eager" rebuilds the drawing cache after each attribute, as
+    game2d did before changes were deferred; "deferred" rebuilds it once, at
+    draw time. The rebuilds column counts calls to _reset per object.
+
+    Parameter repeat: the number of objects to average over
+    Precondition: repeat is an int > 0
+    """
+    from game2d import GObject
+    print('graphics: %d objects per class' % repeat)
+    for name, factory, changes in _graphicsClasses():
+        cls = type(factory())
+        resets = [0]
+        original = cls._reset
+
+        def counted(self):
+            resets[0] += 1
+            original(self)
+
+        cls._reset = counted
+        try:
+            resets[0] = 0
+            objs = []
+            made = timeit(lambda: objs.append(factory()), repeat)
+            build = resets[0]/repeat
+            for obj in objs:
+                obj._validate()
+
+            def change(eager):
+                step = change.step = 1-change.step
+                for obj in objs:
+                    for attr, first, second in changes:
+                        setattr(obj, attr, second if step else first)
+                        if eager:
+                            obj._invalidate()
+                            obj._validate()
+                    obj._validate()
+            change.step = 0
+
+            resets[0] = 0
+            eager = timeit(lambda: change(True), 1)/repeat
+            eagerresets = resets[0]/repeat
+            resets[0] = 0
+            deferred = timeit(lambda: change(False), 1)/repeat
+            deferredresets = resets[0]/repeat
+        finally:
+            cls._reset = original
+        GObject._validate_all()
+        print('  %-12s make %7.1f us (%.0f rebuilds)  change %d: eager %7.1f us (%.0f)  '
+              'deferred %7.1f us (%.0f)  speedup %4.1fx'
+              % (name, made*1e6, build, len(changes), eager*1e6, eagerresets,
+                 deferred*1e6, deferredresets, eager/deferred))
+
+
+def benchIntersects(repeat=20000):
+    """
+    Times the ship-vs-bolt collision test of the models.
+
+    It compares the old test (the four corners of the bolt, each checked
+    with GObject.contains) with GObject.intersects and its swept variant,
+    and checks that the first two agree.
+
+    Parameter repeat: the number of tests to average over
+    Precondition: repeat is an int > 0
+    """
+    from models import Ship, Bolt
+    print('intersects: ship vs bolt')
+    ship = Ship(GAME_WIDTH/2, SHIP_BOTTOM+SHIP_HEIGHT/2)
+    for label, x, y in (('miss', ship.x+100, ship.y), ('hit', ship.x+5, ship.y+10)):
+        bolt = Bolt(-BOLT_SPEED, x, y)
+        assert cornerCollides(ship, bolt) == ship.intersects(bolt), 'intersects disagrees'
+        corners = timeit(lambda: cornerCollides(ship, bolt), repeat)
+        boxes = timeit(lambda: ship.intersects(bolt), repeat)
+        swept = timeit(lambda: ship.collideswShip(bolt), repeat)
+        print('  %-4s: corners %6.2f us  intersects %5.2f us  swept %5.2f us  speedup %5.1fx'
+              % (label, corners*1e6, boxes*1e6, swept*1e6, corners/boxes))
+
+
+def benchTransforms(repeat=20000):
+    """
+    Times turning a power-up and checking it for a point, as for a spinning
+    power-up under the mouse.
+
+    It compares the introcs matrices game2d used to build (see matrixContains)
+    with GAffine, which is updated in place and inverted only when needed,
+    and checks that the two agree.
+
+    Parameter repeat: the number of turns to average over
+    Precondition: repeat is an int > 0
+    """
+    from models import PowerUp
+    print('transforms: turn and contains')
+    pup = PowerUp(GAME_WIDTH/2)
+    matrix = pup.matrix
+    point = (pup.x+PUP_WIDTH/3, pup.y+PUP_HIEGHT/3)
+    for angle in range(0, 360, 15):
+        pup.angle = float(angle)
+        assert pup.contains(point) == matrixContains(pup, point, float(angle)), 'GAffine disagrees'
+    turn = [0.0]
+
+    def old():
+        turn[0] += 3.0
+        return matrixContains(pup, point, turn[0])
+
+    def new():
+        turn[0] += 3.0
+        pup.angle = turn[0]
+        return pup.contains(point)
+
+    before = timeit(old, repeat)
+    after = timeit(new, repeat)
+    assert pup.matrix is matrix, 'GAffine was reallocated'
+    print('  introcs %6.2f us  GAffine %5.2f us  speedup %5.1fx'
+          % (before*1e6, after*1e6, before/after))
+
+
+def frameCost(frames=600, nbolts=64, volley=8):
+    """
+    Returns the average time in seconds of one frame of a full-size wave.
+
+    A frame is one fixed step of the core, followed by Wave.draw to a view
+    and the commit of that view, the work of Invaders.update and
+    Invaders.draw short of sending the commands to the window. The wave has
+    the largest formation and starts with nbolts player bolts inside of it,
+    so the frame writes the position of every bolt drawable. To time the
+    checked constructors and filmstrips too, each frame also makes a Ship and
+    volley Bolts, and turns the ship to its next frame.
+
+    The time depends on whether Python is checking asserts, so benchChecked
+    calls this in a new Python process for each mode.
+
+    Parameter frames: the number of frames to average over
+    Precondition: frames is an int > 0
+
+    Parameter nbolts: the number of bolts to start with
+    Precondition: nbolts is an int >= 0
+
+    Parameter volley: the number of bolts to make each frame
+    Precondition: volley is an int >= 0
+    """
+    _graphicsSetup()
+    from game2d import GView
+    from models import Bolt, Ship
+    from wave import Wave
+    view = GView()
+    wave = Wave(SHIP_LIVES, ALIEN_SPEED, MAX_ROWS, 0, None)
+    wave._core = _stormCore(nbolts, nbolts)
+    keys = KeyState(['up', 'left'])
+    core = wave.getCore()
+
+    def frame():
+        core.step(GAME_STEP, keys)
+        if core.getShip() is None:
+            core.shipAlive()
+        view.clear()
+        wave.draw(view)
+        view._commit()
+        ship = Ship(GAME_WIDTH/2, SHIP_BOTTOM+SHIP_HEIGHT/2)
+        ship.frame = frame.turn % ship.count
+        for i in range(volley):
+            Bolt(BOLT_SPEED, ship.x, ship.y+i*BOLT_HEIGHT)
+        frame.turn += 1
+    frame.turn = 0
+
+    # Load the textures and fill the caches before timing
+    timeit(frame, 60)
+    return timeit(frame, frames)
+
+
+def benchChecked(frames=600, runs=5):
+    """
+    Times a frame of a full-size wave with and without checking asserts.
+
+    The unchecked time is measured with python -O, which is how the game
+    plays when started with --unchecked (see consts.py). Each mode is timed
+    in runs new Python processes, taking turns so that both modes see the
+    same load, and the median is shown with the spread (the fastest and the
+    slowest run).
+
+    Parameter frames: the number of frames to average over in each run
+    Precondition: frames is an int > 0
+
+    Parameter runs: the number of processes to time for each mode
+    Precondition: runs is an int > 0
+    """
+    import statistics, subprocess, sys
+    print('checked vs unchecked: %dx%d aliens, %d frames, %d runs'
+          % (MAX_ROWS, MAX_COLUMNS, frames, runs))
+    times = {'checked': [], 'unchecked': []}
+    for _ in range(runs):
+        for mode, flags in (('checked', []), ('unchecked', ['-O'])):
+            command = [sys.executable]+flags+[__file__, 'frame', str(frames)]
+            output = subprocess.run(command, capture_output=True, text=True, check=True)
+            times[mode].append(float(output.stdout.split()[-1]))
+    for mode in ('checked', 'unchecked'):
+        print('  %-9s median %6.3f ms/frame  (%6.3f .. %6.3f)'
+              % (mode, statistics.median(times[mode])*1e3,
+                 min(times[mode])*1e3, max(times[mode])*1e3))
+    checked = statistics.median(times['checked'])
+    unchecked = statistics.median(times['unchecked'])
+    print('  saving    median %6.3f ms/frame  (%.1f%%)'
+          % ((checked-unchecked)*1e3, 100*(checked-unchecked)/checked))
+
+
+def benchSoftware(frames=300, shot=None):
+    """
+    Times frames of the whole game drawn by the software view.
+
+    The game is started in software mode (no window), the player presses S
+    and then holds up, and the frames are timed at several scales. A frame
+    is one update and one draw of Invaders, drawn into a NumPy array.
+
+    Parameter frames: the number of frames to time at each scale
+    Precondition: frames is an int > 0
+
+    Parameter shot: the file to save the last full-size frame to, or None
+    Precondition: shot is a string ending in .png, or None
+    """
+    import os
+    os.environ['KIVY_NO_ARGS'] = '1'
+    from app import Invaders
+    print('software view: %d frames, real time is %d fps' % (frames, round(1/GAME_STEP)))
+    for scale in (0.25, 0.5, 1.0):
+        game = Invaders(width=GAME_WIDTH, height=GAME_HEIGHT, step=GAME_STEP,
+                        maxsteps=GAME_MAXSTEPS, backend='software', scale=scale)
+        game.advance(1)
+        game.input.press('s')
+        game.advance(1)
+        game.input.release('s')
+        game.input.press('up')
+        start = time.perf_counter()
+        game.advance(frames)
+        seconds = (time.perf_counter()-start)/frames
+        height, width = game.view.pixels.shape[0:2]
+        print('  scale %4.2f (%3dx%3d): %6.2f ms/frame  %6.1f fps  %4.1fx real time'
+              % (scale, width, height, seconds*1e3, 1/seconds, 1/(seconds*round(1/GAME_STEP))))
+        if shot and scale == 1.0:
+            game.view.save(shot)
+
+
+# The file that suite compares against, and writes with --save
+SUITE_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+# The fraction that ticks per second may drop (or p50 may grow) before it is a regression
+SUITE_TOLERANCE = 0.15
+# The number of player bolts kept in flight by the storm scenario
+STORM_BOLTS = 64
+# The number of frames between the rows blown up by the chain scenario
+CHAIN_PERIOD = 10
+# The level that the levels scenario plays until
+SUITE_LEVELS = 3
+
+
+def _fullWave(seed):
+    """
+    Returns a Wave with the largest formation, and the player keys for it.
+
+    The keys hold up (fire) and left; the scenario flips left and right to
+    sweep the ship across the screen.
+
+    Parameter seed: the random seed of the wave
+    Precondition: seed is an int
+    """
+    _resourceSetup()
+    from wave import Wave
+    wave = Wave(SHIP_LIVES, ALIEN_SPEED, MAX_ROWS, 0, None)
+    wave._core = WaveCore(SHIP_LIVES, ALIEN_SPEED, MAX_ROWS, 0,
+                          columns=MAX_COLUMNS, seed=seed)
+    return wave, KeyState(['up', 'left'])
+
+
+def _waveFrame(wave, keys, frame):
+    """
+    Plays one frame of wave: a fixed step of the core and a sync of the drawables.
+
+    This is the work of Invaders.update and Wave.draw, short of drawing to a
+    view. A destroyed ship is replaced at once, and the ship turns around
+    every 100 frames.
+
+    Parameter wave: the wave to play
+    Precondition: wave is a Wave object
+
+    Parameter keys: the player keys
+    Precondition: keys is a KeyState object
+
+    Parameter frame: the number of the frame, counting from 0
+    Precondition: frame is an int >= 0
+    """
+    if frame % 100 == 0:
+        turn = ('left', 'right') if (frame//100) % 2 else ('right', 'left')
+        keys.release(turn[0])
+        keys.press(turn[1])
+    core = wave.getCore()
+    core.step(GAME_STEP, keys)
+    if core.getShip() is None:
+        core.shipAlive()
+    wave._sync()
+
+
+def scenarioFormation(seed):
+    """
+    Returns the frame function of a full formation marching against the ship.
+
+    Parameter seed: the random seed of the scenario
+    Precondition: seed is an int
+    """
+    wave, keys = _fullWave(seed)
+    count = [0]
+
+    def frame():
+        _waveFrame(wave, keys, count[0])
+        count[0] += 1
+        return True
+
+    return frame
+
+
+def scenarioStorm(seed):
+    """
+    Returns the frame function of a full formation under a storm of bolts.
+
+    Every frame tops the player bolts back up to STORM_BOLTS, fired from
+    random places below the formation, so the collision pass always has
+    that many bolts to check.
+
+    Parameter seed: the random seed of the scenario
+    Precondition: seed is an int
+    """
+    wave, keys = _fullWave(seed)
+    rng = random.Random(seed)
+    count = [0]
+
+    def frame():
+        core = wave.getCore()
+        bolts = core.getBolts()
+        missing = STORM_BOLTS-sum(1 for bolt in bolts if bolt.isPlayerBolt())
+        for _ in range(missing):
+            bolts.append(BoltState(rng.uniform(0, GAME_WIDTH), DEFENSE_LINE, BOLT_SPEED))
+        _waveFrame(wave, keys, count[0])
+        count[0] += 1
+        return True
+
+    return frame
+
+
+def scenarioChain(seed):
+    """
+    Returns the frame function of a full formation exploding row by row.
+
+    Every CHAIN_PERIOD frames, every alien in a random row explodes (without
+    dying), so hundreds of sparks are falling at any time.
+
+    Parameter seed: the random seed of the scenario
+    Precondition: seed is an int
+    """
+    wave, keys = _fullWave(seed)
+    rng = random.Random(seed)
+    count = [0]
+
+    def frame():
+        core = wave.getCore()
+        if count[0] % CHAIN_PERIOD == 0:
+            row = rng.randrange(MAX_ROWS)
+            for column in range(MAX_COLUMNS):
+                core._explodeAlien(row, column)
+        _waveFrame(wave, keys, count[0])
+        count[0] += 1
+        return True
+
+    return frame
+
+
+def _softwareGame(**keywords):
+    """
+    Returns a started Invaders game that runs without a window or rendering.
+
+    Parameter keywords: more keywords for the game, like seed or replay
+    Precondition: keywords are keywords of GameApp
+    """
+    _resourceSetup()
+    from app import Invaders
+    game = Invaders(width=GAME_WIDTH, height=GAME_HEIGHT, step=GAME_STEP,
+                    maxsteps=GAME_MAXSTEPS, backend='software', scale=0.25,
+                    **keywords)
+    game.render = False
+    game.advance(0)
+    return game
+
+
+def _playKeys(keys, frame):
+    """
+    Holds down the keys of the scripted player in the given frame.
+
+    The player holds up, sweeps left and right every 100 frames, and keeps
+    pressing S and the spacebar to get past the messages.
+
+    Parameter keys: the input of the game
+    Precondition: keys is a GInput object
+
+    Parameter frame: the number of the frame, counting from 0
+    Precondition: frame is an int >= 0
+    """
+    held = {'up': True, 's': frame % 20 == 5, 'spacebar': frame % 30 == 7,
+            'left': (frame//100) % 2 == 0, 'right': (frame//100) % 2 == 1}
+    for key in held:
+        if held[key]:
+            keys.press(key)
+        else:
+            keys.release(key)
+
+
+def scenarioLevels(seed):
+    """
+    Returns the frame function of a whole game, played until level SUITE_LEVELS.
+
+    The game runs Invaders with the software view, so every state (including
+    STATE_LEVEL, which makes the next wave) is played. A frame is one update
+    and one draw, but the frame is not rasterized. The player is the one in
+    _playKeys. The frame function returns False once the level is reached.
+
+    Parameter seed: the random seed of the scenario (and so of every wave)
+    Precondition: seed is an int
+    """
+    game = _softwareGame(seed=seed)
+    count = [0]
+
+    def frame():
+        _playKeys(game.input, count[0])
+        game.advance(1)
+        count[0] += 1
+        return game._level < SUITE_LEVELS
+
+    return frame
+
+
+# The scenarios of the suite, as (name, frame function maker, most frames)
+SUITE = [('formation', scenarioFormation, 1200),
+         ('storm', scenarioStorm, 1200),
+         ('chain', scenarioChain, 1200),
+         ('levels', scenarioLevels, 60000)]
+
+
+def runScenario(make, frames, seed=1, repeat=3):
+    """
+    Returns the measurements of one scenario as a dictionary.
+
+    The scenario is played repeat times from the same seed to time each frame,
+    keeping the fastest run, and once more with tracemalloc to find the peak
+    memory it allocates (tracing slows it down too much to time). The keys of the result are 'frames',
+    'tps' (frames per second), 'p50_ms', 'p99_ms', 'peak_kb' and 'blocks'
+    (memory blocks still allocated at the end, per frame).
+
+    Parameter make: the scenario, which makes a new frame function
+    Precondition: make is a function taking a seed, like scenarioStorm
+
+    Parameter frames: the most frames to play
+    Precondition: frames is an int > 0
+
+    Parameter seed: the random seed of the scenario
+    Precondition: seed is an int
+
+    Parameter repeat: the number of timed runs
+    Precondition: repeat is an int > 0
+    """
+    import gc, sys, tracemalloc
+    best = None
+    for _ in range(repeat):
+        frame = make(seed)
+        gc.collect()
+        blocks = sys.getallocatedblocks()
+        times = []
+        start = time.perf_counter()
+        for _ in range(frames):
+            tick = time.perf_counter()
+            going = frame()
+            times.append(time.perf_counter()-tick)
+            if not going:
+                break
+        total = time.perf_counter()-start
+        gc.collect()
+        blocks = sys.getallocatedblocks()-blocks
+        if best is None or len(times)/total > len(best[0])/best[1]:
+            best = (times, total, blocks)
+    times, total, blocks = best
+
+    frame = make(seed)
+    tracemalloc.start()
+    for _ in range(len(times)):
+        if not frame():
+            break
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50, p99 = np.percentile(times, [50, 99])
+    return {'frames': len(times), 'tps': len(times)/total, 'p50_ms': p50*1e3,
+            'p99_ms': p99*1e3, 'peak_kb': peak/1024, 'blocks': blocks/len(times)}
+
+
+def benchSuite(save=False, names=None):
+    """
+    Runs the gameplay scenarios and compares them with the stored baseline.
+
+    Each scenario prints its measurements (see runScenario), followed by the
+    change from the baseline in SUITE_BASELINE, if there is one. A scenario
+    regresses if its ticks per second drop, or its p50 frame time grows, by
+    more than SUITE_TOLERANCE. The baseline is only meaningful on the computer
+    that saved it.
+
+    Parameter save: whether to save these results as the new baseline
+    Precondition: save is a bool
+
+    Parameter names: the scenarios to run, or None for all of them
+    Precondition: names is None or a list of names in SUITE
+
+    Returns the names of the scenarios that regressed.
+    """
+    import json
+    baseline = {}
+    if os.path.exists(SUITE_BASELINE):
+        with open(SUITE_BASELINE) as file:
+            baseline = json.load(file)
+
+    print('suite: %dx%d aliens, baseline %s' % (MAX_ROWS, MAX_COLUMNS,
+          'none' if not baseline else os.path.basename(SUITE_BASELINE)))
+    results = {}
+    regressed = []
+    for name, make, frames in SUITE:
+        if names and not name in names:
+            continue
+        result = runScenario(make, frames)
+        results[name] = result
+        print('  %-9s %6d frames %9.0f ticks/s  p50 %6.3f ms  p99 %6.3f ms  peak %7.0f KB  %+6.2f blocks/frame'
+              % (name, result['frames'], result['tps'], result['p50_ms'],
+                 result['p99_ms'], result['peak_kb'], result['blocks']))
+        if name in baseline:
+            old = baseline[name]
+            slower = result['tps'] < old['tps']*(1-SUITE_TOLERANCE)
+            slower = slower or result['p50_ms'] > old['p50_ms']*(1+SUITE_TOLERANCE)
+            print('  %-9s %6s        %+8.1f%%          %+6.1f%%         %+6.1f%%        %+6.1f%%  %s'
+                  % ('', '', 100*(result['tps']/old['tps']-1),
+                     100*(result['p50_ms']/old['p50_ms']-1),
+                     100*(result['p99_ms']/old['p99_ms']-1),
+                     100*(result['peak_kb']/old['peak_kb']-1),
+                     'REGRESSION' if slower else 'ok'))
+            if slower:
+                regressed.append(name)
+
+    if save:
+        baseline.update(results)
+        with open(SUITE_BASELINE, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print('saved the baseline to', SUITE_BASELINE)
+    return regressed
+
+
+def benchReplay(filenames):
+    """
+    Plays back recordings of the game (see --record in consts.py) and times them.
+
+    The recordings play with the software view, without rendering the frames,
+    so they run many times faster than real time. Each recording prints its
+    length, its speed, the p50 and p99 frame times, and the score and level
+    at the end. A recording always plays back to the same score and level.
+
+    Parameter filenames: the recordings to play
+    Precondition: filenames is a list of names of recording files
+    """
+    print('replay: recordings played without rendering')
+    for filename in filenames:
+        game = _softwareGame(replay=filename)
+        recording = game.replaying
+        times = []
+        start = time.perf_counter()
+        while True:
+            tick = time.perf_counter()
+            if not game.advance(1):
+                break
+            times.append(time.perf_counter()-tick)
+        total = time.perf_counter()-start
+        p50, p99 = np.percentile(times, [50, 99]) if times else (0, 0)
+        print('  %-20s %6d ticks %8.0f ticks/s (%4.0fx real time)  p50 %6.3f ms  p99 %6.3f ms  score %d  level %d'
+              % (os.path.basename(filename), recording.ticks, game.ticks/total,
+                 recording.duration/total, p50*1e3, p99*1e3, game._totalscore,
+                 game._level))
+
+
+def benchAllocations(frames=3000, warmup=600):
+    """
+    Prints the objects made per frame in a game, and what made them.
+
+    The game is the one of the levels scenario, counted by the tracker of
+    game2d once the first frames (which load everything) are over. Only the
+    busiest makers are shown.
+
+    Parameter frames: the number of frames to count
+    Precondition: frames is an int > 0
+
+    Parameter warmup: the number of frames to play before counting
+    Precondition: warmup is an int >= 0
+    """
+    game = _softwareGame(seed=1)
+    tracker = game.tracker
+    tracker.clear()
+    for n in range(warmup+frames):
+        if n == warmup:
+            tracker.enabled = True
+        _playKeys(game.input, n)
+        game.advance(1)
+    tracker.enabled = False
+
+    number, millis = tracker.collections()
+    print('allocations: %d frames, %.2f objects/frame, %.3f gc collections/frame (%.3f ms)'
+          % (tracker.frames, tracker.total(), number, millis))
+    for maker, kind, rate in tracker.rates()[:15]:
+        print('  %-12s -> %-16s %8.2f /frame' % (maker, kind, rate))
+
+
+# Script code
+if __name__ == '__main__':
+    import sys
+    if 'frame' in sys.argv[1:]:
+        print(frameCost(int(sys.argv[-1])))
+    elif 'graphics' in sys.argv[1:]:
+        benchGraphics()
+        benchIntersects()
+        benchTransforms()
+        benchChecked()
+    elif 'software' in sys.argv[1:]:
+        benchSoftware()
+    elif 'alloc' in sys.argv[1:]:
+        benchAllocations()
+    elif 'replay' in sys.argv[1:]:
+        benchReplay(sys.argv[sys.argv.index('replay')+1:])
+    elif 'suite' in sys.argv[1:]:
+        names = [name for name, make, frames in SUITE if name in sys.argv[1:]]
+        if benchSuite('--save' in sys.argv[1:], names):
+            sys.exit(1)
+    else:
+        benchCollisions()
+        benchTunneling()
+        benchParticles()
@@ -19,6 +19,11 @@ GAME_WIDTH  = 800
 #: the height of the game display
 GAME_HEIGHT = 700
 
+#: the number of seconds in one fixed simulation step (60 updates a second)
+GAME_STEP = 1/60
+#: the most simulation steps to run in one frame when catching up
+GAME_MAXSTEPS = 5
+
 ### SPARK CONSTANTS ###
 
 # Gravity of surface
@@ -63,6 +68,12 @@ SHIP_BOTTOM   = 32
 SHIP_MOVEMENT = 5
 # The number of lives a ship has
 SHIP_LIVES    = 3
+# the filmstrip for the ship: the ship, then the frames of its explosion
+SHIP_STRIP    = 'ship-strip.png'
+# the rows and columns of frames in the ship filmstrip
+SHIP_FORMAT   = (2,3)
+# the number of seconds each frame of the ship explosion is shown
+SHIP_EXPLODE  = 0.125
 
 # The y-coordinate of the defensive line the ship is protecting
 DEFENSE_LINE = 100
@@ -90,6 +101,12 @@ ALIEN_ROWS     = 2
 ALIENS_IN_ROW  = 6
 # the image files for the aliens (bottom to top)
 ALIEN_IMAGES   = ('alien1.png','alien2.png','alien3.png')
+# the filmstrips for the aliens, in the same order as ALIEN_IMAGES
+ALIEN_STRIPS   = ('alien-strip1.png','alien-strip2.png','alien-strip3.png')
+# the rows and columns of frames in each alien filmstrip
+ALIEN_FORMAT   = (3,2)
+# the number of frames at the start of an alien filmstrip the alien marches through
+ALIEN_POSES    = 2
 # the number of seconds (0 < float <= 1) between alien steps
 ALIEN_SPEED = 0.5
 
@@ -106,6 +123,20 @@ BOLT_SPEED  = 10
 BOLT_RATE   = 10
 
 
+### SOUND CONSTANTS ###
+
+# the sound when an alien or the ship is destroyed
+BLAST_SOUND = 'blast2.wav'
+# the sound when the player fires a bolt
+PEW_SOUND   = 'pew2.wav'
+# the sound when an alien fires a bolt
+POP_SOUND   = 'pop1.wav'
+# all of the sounds, to load when the game starts
+GAME_SOUNDS = (BLAST_SOUND, PEW_SOUND, POP_SOUND)
+# the number of copies of each sound that can play at once
+SOUND_VOICES = 3
+
+
 ### GAME CONSTANTS ###
 
 # state before the game has started
@@ -126,6 +157,124 @@ STATE_LEVEL = 6
 STATE_INSTRUCTIONS = 7
 
 
+### USE --unchecked TO PLAY WITHOUT CHECKING PRECONDITIONS
+"""
+The preconditions in game2d and models are all asserts. They catch mistakes
+while you work on the game, but they also run on every frame. If you start
+the game typing
+
+    python invaders --unchecked
+
+(the option can go anywhere in the arguments) the game restarts Python with
+the -O option, which removes every assert. GAME_CHECKED says which mode the
+game is in. Running python -O directly also plays unchecked.
+"""
+GAME_CHECKED = __debug__ and not '--unchecked' in sys.argv
+while '--unchecked' in sys.argv:
+    sys.argv.remove('--unchecked')
+
+
+### USE --software TO DRAW THE GAME WITHOUT A WINDOW
+"""
+If you start the game typing
+
+    python invaders --software
+
+the game opens no window. Each frame is drawn into a NumPy array instead (see
+GSoftView in game2d), GAME_SCALE times the size of the window, and the game
+runs as fast as the computer allows. Nobody can press keys in this mode, so it
+is for programs that drive the game (like bench.py), not for playing.
+"""
+GAME_BACKEND = 'software' if '--software' in sys.argv else 'kivy'
+while '--software' in sys.argv:
+    sys.argv.remove('--software')
+#: the size of the software frames, as a fraction of the window size
+GAME_SCALE = 0.5
+
+
+### USE --profile TO TIME EACH PART OF A FRAME
+"""
+If you start the game typing
+
+    python invaders --profile
+
+the game times each phase of every frame (the updates of the wave, the sync
+of the drawables, drawing, and so on). Press PROFILE_KEY at any time to show
+or hide a table of the times (this also starts the timing if --profile was
+not given), and PROFILE_SAVE_KEY to save the last 600 frames to
+the file PROFILE_FILE, one row per frame.
+"""
+GAME_PROFILE = '--profile' in sys.argv
+while '--profile' in sys.argv:
+    sys.argv.remove('--profile')
+#: the key that shows or hides the frame times
+PROFILE_KEY = 'f3'
+#: the key that saves the frame times to PROFILE_FILE
+PROFILE_SAVE_KEY = 'f4'
+#: the CSV file the frame times are saved to
+PROFILE_FILE = 'profile.csv'
+
+
+### USE --track TO COUNT THE OBJECTS MADE IN EACH FRAME
+"""
+If you start the game typing
+
+    python invaders --track
+
+the game counts the objects made in every frame, and which class (Wave,
+Invaders, GLabel, and so on) made them, along with the garbage collections
+they cause. Press TRACK_KEY at any time to show or hide a table of the
+objects made per frame (this also starts counting if --track was not given),
+and TRACK_SAVE_KEY to save the table to the file TRACK_FILE. Counting slows
+the game down, so the frame times are not to be trusted while it is on.
+"""
+GAME_TRACK = '--track' in sys.argv
+while '--track' in sys.argv:
+    sys.argv.remove('--track')
+#: the key that shows or hides the objects made per frame
+TRACK_KEY = 'f5'
+#: the key that saves the objects made per frame to TRACK_FILE
+TRACK_SAVE_KEY = 'f6'
+#: the CSV file the objects made per frame are saved to
+TRACK_FILE = 'allocations.csv'
+
+
+### USE --record FILE AND --replay FILE TO PLAY A GAME AGAIN
+"""
+If you start the game typing
+
+    python invaders --record game.json
+
+the keys held down at every update, and the random seed of every wave, are
+saved to the file game.json when the window closes. Typing
+
+    python invaders --replay game.json
+
+plays that game again, update for update. The replay only matches if the
+game starts the same way, so give it the same rows, aliens and speed as the
+recording. Add --software to replay it as fast as possible without a window
+(bench.py replay is faster still, since it does not draw the frames).
+"""
+def _option(name):
+    """
+    Returns the value after the command line option name, or None if not given.
+
+    The option and its value are removed from sys.argv.
+
+    Parameter name: the option, like '--record'
+    Precondition: name is a string
+    """
+    value = None
+    while name in sys.argv[:-1]:
+        pos = sys.argv.index(name)
+        value = sys.argv[pos+1]
+        del sys.argv[pos:pos+2]
+    return value
+
+GAME_RECORD = _option('--record')
+GAME_REPLAY = _option('--replay')
+
+
 ### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW
 """
 sys.argv is a list of the command line arguments when you run Python. These
@@ -0,0 +1,1110 @@
+"""
+Headless simulation core for Alien Invaders
+
+This module contains the rules for a single wave of Alien Invaders as plain
+data: the ship, the alien formation, the laser bolts, the power-ups, the
+sparks, the score and the lives. Nothing in this module touches Kivy or
+game2d, so a wave can be stepped on a machine with no display or audio
+device. This is what we use for batch testing, bots and regression runs.
+
+The class Wave (in wave.py) owns a WaveCore and renders from it. Anything
+that the core wants to be heard is recorded as a sound event, and it is up
+to the owner of the core to play it (or not).
+
+A headless run looks like this:
+
+    core = WaveCore(SHIP_LIVES, ALIEN_SPEED, ALIEN_ROWS, 0, seed=1)
+    keys = KeyState()
+    keys.press('up')
+    while not core.getEnd():
+        core.step(1/60, keys)
+        if core.getShip() is None:
+            core.shipAlive()
+"""
+from consts import *
+import introcs
+import numpy as np
+import random
+import math
+
+# PRIMARY RULE: The core is not allowed to access anything in any module other
+# than consts.py. In particular, it may never import game2d or Kivy.
+
+
+class Box(object):
+    """
+    A class representing an axis-aligned box in the simulation.
+
+    This is the headless counterpart of a GObject: it has a center, a width
+    and a height, and nothing else.  Collisions follow the rules of the
+    drawables exactly: a point is inside of a box if it is strictly inside of
+    its bounding rectangle, and two boxes intersect if their interiors
+    overlap (see GObject.intersects).
+
+    Attribute x: the horizontal coordinate of the box center
+    Invariant: x is an int or float
+
+    Attribute y: the vertical coordinate of the box center
+    Invariant: y is an int or float
+
+    Attribute width: the horizontal width of the box
+    Invariant: width is an int or float > 0
+
+    Attribute height: the vertical height of the box
+    Invariant: height is an int or float > 0
+    """
+
+    def __init__(self, x, y, width, height):
+        """
+        Initializes a box with the given center and size.
+
+        Parameter x: The horizontal coordinate of the box center
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the box center
+        Precondition: y is an int or float
+
+        Parameter width: The horizontal width of the box
+        Precondition: width is an int or float > 0
+
+        Parameter height: The vertical height of the box
+        Precondition: height is an int or float > 0
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def contains(self, x, y):
+        """
+        Returns True if the point (x,y) is inside of this box.
+
+        Parameter x: The horizontal coordinate of the point
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the point
+        Precondition: y is an int or float
+        """
+        return abs(x-self.x) < self.width/2 and abs(y-self.y) < self.height/2
+
+    def hitBy(self, other, dx=0, dy=0):
+        """
+        Returns True if other touched this box while moving (dx,dy) this update.
+
+        The box other is where it is now, after the move. If dx and dy are 0,
+        this is the same as checking whether the boxes overlap. Otherwise the
+        whole path of other is checked, so a fast box cannot jump over this
+        one between updates (see GObject.intersects_swept).
+
+        Parameter other: The box to check
+        Precondition: other is a Box
+
+        Parameter dx: The horizontal distance other moved this update
+        Precondition: dx is an int or float
+
+        Parameter dy: The vertical distance other moved this update
+        Precondition: dy is an int or float
+        """
+        hw = (self.width+other.width)/2
+        hh = (self.height+other.height)/2
+        px = other.x-dx-self.x
+        py = other.y-dy-self.y
+        start = 0.0
+        end = 1.0
+        if dx == 0:
+            if abs(px) >= hw:
+                return False
+        else:
+            t0 = (-hw-px)/dx
+            t1 = (hw-px)/dx
+            start = max(start, min(t0, t1))
+            end = min(end, max(t0, t1))
+        if dy == 0:
+            if abs(py) >= hh:
+                return False
+        else:
+            t0 = (-hh-py)/dy
+            t1 = (hh-py)/dy
+            start = max(start, min(t0, t1))
+            end = min(end, max(t0, t1))
+        return start < end
+
+
+class ShipState(Box):
+    """
+    A class representing the player ship in the simulation.
+
+    Attribute px: the horizontal coordinate of the ship center before the last update
+    Invariant: px is an int or float
+    """
+
+    def __init__(self, x, y):
+        """
+        Initializes the ship at (x,y) with the size in consts.py.
+
+        Parameter x: The horizontal coordinate of the ship center
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the ship center
+        Precondition: y is an int or float
+        """
+        super().__init__(x, y, SHIP_WIDTH, SHIP_HEIGHT)
+        self.px = x
+
+
+class Formation(object):
+    """
+    A class representing the alien formation as a structure of arrays.
+
+    Alien (r,c) is the alien in row r (bottom row first) and column c.  The
+    aliens never move relative to one another, so each alien only stores its
+    offset from the formation origin, which is the center of alien (0,0).
+    Marching the formation just moves the origin, no matter how many aliens
+    there are.  Collision queries are answered in formation-local coordinates
+    (relative to the origin) for the same reason.
+
+    The per-alien attributes are NumPy arrays of shape (rows, columns).  Dead
+    aliens keep their place in the arrays; only alive changes.  Aliens must be
+    killed with the method kill, which also keeps the per-row and per-column
+    counts up to date.  That way, finding the walls of the formation, its
+    bottom row, or the bottom alien of a column never scans the grid.
+
+    Attribute rows: the number of rows of aliens
+    Invariant: rows is an int between 1 and 10
+
+    Attribute columns: the number of aliens per row
+    Invariant: columns is an int between 1 and 15
+
+    Attribute originx: the horizontal coordinate of the formation origin
+    Invariant: originx is a float
+
+    Attribute originy: the vertical coordinate of the formation origin
+    Invariant: originy is a float
+
+    Attribute localx: the horizontal offset of each alien center from the origin
+    Invariant: localx is a float array that never changes
+
+    Attribute localy: the vertical offset of each alien center from the origin
+    Invariant: localy is a float array that never changes
+
+    Attribute alive: whether each alien is still alive
+    Invariant: alive is a bool array
+
+    Attribute kind: the position of each alien image in ALIEN_IMAGES
+    Invariant: kind is an int array with values in 0..len(ALIEN_IMAGES)-1
+
+    Attribute points: the number of points each alien is worth
+    Invariant: points is an int array with values >= 0
+
+    Attribute version: the number of times the formation has moved
+    Invariant: version is an int >= 0
+
+    Attribute count: the number of living aliens
+    Invariant: count is an int >= 0, equal to the number of True values in alive
+
+    Attribute colcount: the number of living aliens in each column
+    Invariant: colcount is a list of columns ints >= 0
+
+    Attribute rowcount: the number of living aliens in each row
+    Invariant: rowcount is a list of rows ints >= 0
+
+    Attribute bottom: the row of the bottom-most living alien in each column
+    Invariant: bottom is a list of columns ints; bottom[c] is only meaningful
+    if colcount[c] > 0
+
+    Attribute livecolumns: the columns with at least one living alien
+    Invariant: livecolumns is a sorted list of ints in 0..columns-1
+
+    Attribute lowrow: the bottom-most row with at least one living alien
+    Invariant: lowrow is an int in 0..rows (rows when the formation is empty)
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def x(self):
+        """
+        The horizontal coordinate of each alien center, as a new array.
+        """
+        return self.originx + self.localx
+
+    @property
+    def y(self):
+        """
+        The vertical coordinate of each alien center, as a new array.
+        """
+        return self.originy + self.localy
+
+    def __init__(self, rows, columns):
+        """
+        Initializes a full formation at the top of the screen.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int between 1 and 10
+
+        Parameter columns: the number of aliens per row
+        Precondition: columns is an int between 1 and 15
+        """
+        colx = np.arange(columns)*(ALIEN_WIDTH + ALIEN_H_SEP)
+        rowy = np.arange(rows)*(ALIEN_HEIGHT + ALIEN_V_SEP)
+        rowkind = (np.arange(rows)%6)//2
+
+        self.rows = rows
+        self.columns = columns
+        self.originx = ALIEN_H_SEP + ALIEN_WIDTH/2
+        self.originy = GAME_HEIGHT - (ALIEN_CEILING + ALIEN_HEIGHT/2 +
+        (rows-1)*ALIEN_HEIGHT + (rows-1)*ALIEN_V_SEP)
+        self.localx = np.tile(colx, (rows, 1)).astype(float)
+        self.localy = np.repeat(rowy[:, np.newaxis], columns, axis=1).astype(float)
+        self.alive = np.ones((rows, columns), dtype=bool)
+        self.kind = np.repeat(rowkind[:, np.newaxis], columns, axis=1)
+        self.points = 10*(self.kind+1)
+        self.version = 0
+
+        self.count = rows*columns
+        self.colcount = [rows]*columns
+        self.rowcount = [columns]*rows
+        self.bottom = [0]*columns
+        self.livecolumns = list(range(columns))
+        self.lowrow = 0
+
+    def isEmpty(self):
+        """
+        Returns True if every alien is dead.
+        """
+        return self.count == 0
+
+    def left(self):
+        """
+        Returns the x coordinate of the left-most living alien.
+
+        Precondition: the formation is not empty
+        """
+        return self.originx + self.localx.item(0, self.livecolumns[0])
+
+    def right(self):
+        """
+        Returns the x coordinate of the right-most living alien.
+
+        Precondition: the formation is not empty
+        """
+        return self.originx + self.localx.item(0, self.livecolumns[-1])
+
+    def crossed(self, line):
+        """
+        Returns True if the bottom of a living alien is below line.
+
+        Parameter line: the y coordinate to check against
+        Precondition: line is an int or float
+        """
+        if self.count == 0:
+            return False
+        return self.originy + self.localy.item(self.lowrow, 0) - ALIEN_HEIGHT/2 < line
+
+    def hasColumn(self, column):
+        """
+        Returns True if there is a living alien in column.
+
+        Parameter column: the column to check
+        Precondition: column is an int in 0..columns-1
+        """
+        return self.colcount[column] > 0
+
+    def bottomRow(self, column):
+        """
+        Returns the row of the bottom-most living alien in column.
+
+        Parameter column: the column to search
+        Precondition: column is an int in 0..columns-1 with a living alien
+        """
+        return self.bottom[column]
+
+    def kill(self, r, c):
+        """
+        Kills alien (r,c), updating the row and column bookkeeping.
+
+        Parameter r: the row of the alien
+        Precondition: r is an int in 0..rows-1, and alien (r,c) is alive
+
+        Parameter c: the column of the alien
+        Precondition: c is an int in 0..columns-1
+        """
+        self.alive[r, c] = False
+        self.count -= 1
+        self.colcount[c] -= 1
+        self.rowcount[r] -= 1
+        if self.colcount[c] == 0:
+            self.livecolumns.remove(c)
+        elif self.bottom[c] == r:
+            row = r+1
+            while not self.alive[row, c]:
+                row += 1
+            self.bottom[c] = row
+        while self.lowrow < self.rows and self.rowcount[self.lowrow] == 0:
+            self.lowrow += 1
+
+    def position(self, r, c):
+        """
+        Returns the center of alien (r,c) as a pair of floats.
+
+        Parameter r: the row of the alien
+        Precondition: r is an int in 0..rows-1
+
+        Parameter c: the column of the alien
+        Precondition: c is an int in 0..columns-1
+        """
+        return (self.originx + self.localx.item(r, c), self.originy + self.localy.item(r, c))
+
+    def shift(self, dx, dy):
+        """
+        Moves the whole formation by (dx,dy).
+
+        Parameter dx: the horizontal distance to move
+        Precondition: dx is an int or float
+
+        Parameter dy: the vertical distance to move
+        Precondition: dy is an int or float
+        """
+        self.originx = self.originx + dx
+        self.originy = self.originy + dy
+        self.version += 1
+
+    def cells(self, box, dy=0):
+        """
+        Returns the (row, column) pairs of the formation cells that box overlaps.
+
+        The formation is a uniform grid: cell (r,c) is the alien (r,c) together
+        with the gap to its right and above it. A box can only overlap an
+        alien if it overlaps that alien's cell.
+
+        Parameter box: the box to look up
+        Precondition: box is a Box
+
+        Parameter dy: the vertical distance box moved this update (the cells
+        along the whole move are returned)
+        Precondition: dy is an int or float
+        """
+        pitchx = ALIEN_WIDTH + ALIEN_H_SEP
+        pitchy = ALIEN_HEIGHT + ALIEN_V_SEP
+        lx = box.x - self.originx + ALIEN_WIDTH/2
+        ly = box.y - dy/2 - self.originy + ALIEN_HEIGHT/2
+        hh = (box.height + abs(dy))/2
+        c0 = max(int(math.floor((lx - box.width/2)/pitchx)), 0)
+        c1 = min(int(math.floor((lx + box.width/2)/pitchx)), self.columns-1)
+        r0 = max(int(math.floor((ly - hh)/pitchy)), 0)
+        r1 = min(int(math.floor((ly + hh)/pitchy)), self.rows-1)
+        return [(r, c) for r in range(r0, r1+1) for c in range(c0, c1+1)]
+
+    def hitBy(self, r, c, box, dy=0):
+        """
+        Returns True if box touched alien (r,c) while moving dy this update.
+
+        The box is where it is now, after the move. The aliens only move in
+        march steps, so the path of box is a straight vertical strip, and it
+        hits the alien if that strip overlaps it (see Box.hitBy). Dead aliens
+        are never hit.
+
+        Parameter r: the row of the alien
+        Precondition: r is an int in 0..rows-1
+
+        Parameter c: the column of the alien
+        Precondition: c is an int in 0..columns-1
+
+        Parameter box: the box to check
+        Precondition: box is a Box
+
+        Parameter dy: the vertical distance box moved this update
+        Precondition: dy is an int or float
+        """
+        if not self.alive[r, c]:
+            return False
+        ox = box.x - self.originx - self.localx.item(r, c)
+        oy = box.y - dy/2 - self.originy - self.localy.item(r, c)
+        return (abs(ox) < (ALIEN_WIDTH + box.width)/2 and
+                abs(oy) < (ALIEN_HEIGHT + box.height + abs(dy))/2)
+
+
+class BoltState(Box):
+    """
+    A class representing a laser bolt in the simulation.
+
+    Bolts with a positive velocity were fired by the player. Bolts with a
+    negative velocity were fired by an alien.
+
+    Attribute velocity: the velocity in the y direction
+    Invariant: velocity is an int or float
+    """
+
+    def __init__(self, x, y, velocity):
+        """
+        Initializes the bolt at (x,y) with the given velocity.
+
+        Parameter x: The horizontal coordinate of the bolt center
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the bolt center
+        Precondition: y is an int or float
+
+        Parameter velocity: The velocity in the y direction
+        Precondition: velocity is an int or float
+        """
+        super().__init__(x, y, BOLT_WIDTH, BOLT_HEIGHT)
+        self.velocity = velocity
+
+    def isPlayerBolt(self):
+        """
+        Returns True if this bolt was fired by the player.
+        """
+        return self.velocity > 0
+
+
+class PowerUpState(Box):
+    """
+    A class representing a falling power-up (an extra life) in the simulation.
+    """
+
+    def __init__(self, x):
+        """
+        Initializes the power-up at the top of the screen.
+
+        Parameter x: The horizontal coordinate of the power-up center
+        Precondition: x is an int or float
+        """
+        super().__init__(x, GAME_WIDTH - 100, PUP_WIDTH, PUP_HIEGHT)
+
+
+class Particles(object):
+    """
+    A class representing the sparks of all alien explosions as arrays.
+
+    Each spark is a row in the arrays below, rather than an object. Moving the
+    sparks and removing those that fell off screen are whole-array operations,
+    so tens of thousands of sparks cost little more than a few. Only the first
+    count entries of each array are sparks; the rest is spare room that is
+    grown (by doubling) as needed.
+
+    Attribute count: the number of sparks
+    Invariant: count is an int >= 0
+
+    Attribute x: the horizontal coordinates of the spark centers
+    Invariant: x is a 1d float array with at least count entries
+
+    Attribute y: the vertical coordinates of the spark centers
+    Invariant: y is a 1d float array with the same length as x
+
+    Attribute vx: the velocities in the x direction
+    Invariant: vx is a 1d float array with the same length as x
+
+    Attribute vy: the velocities in the y direction
+    Invariant: vy is a 1d float array with the same length as x
+
+    Attribute colors: the spark colors as r, g, b, a values in 0..1
+    Invariant: colors is a float array of shape (len(x), 4)
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _rng: the random number generator for the spark velocities
+    # Invariant: _rng is a numpy.random.Generator
+
+    def __init__(self, seed=None, capacity=256):
+        """
+        Initializes an empty particle system.
+
+        Parameter seed: the seed for the spark velocities
+        Precondition: seed is None or an int >= 0
+
+        Parameter capacity: the number of sparks to make room for
+        Precondition: capacity is an int > 0
+        """
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.colors = np.zeros((capacity, 4))
+        self._rng = np.random.default_rng(seed)
+
+    def burst(self, x, y, n, color):
+        """
+        Adds n sparks at (x,y) flying out at random velocities.
+
+        The velocities are chosen as in the original explosions: a vertical
+        speed of at most MAX_INIT_VEL, and a horizontal speed that keeps the
+        total speed under MAX_INIT_VEL.
+
+        Parameter x: the horizontal coordinate of the explosion
+        Precondition: x is an int or float
+
+        Parameter y: the vertical coordinate of the explosion
+        Precondition: y is an int or float
+
+        Parameter n: the number of sparks to add
+        Precondition: n is an int >= 0
+
+        Parameter color: the color of the sparks
+        Precondition: color is an introcs.RGB object
+        """
+        if self.count+n > len(self.x):
+            self._grow(self.count+n)
+        new = slice(self.count, self.count+n)
+        vy = self._rng.uniform(-MAX_INIT_VEL, MAX_INIT_VEL, n)
+        angle = self._rng.uniform(0, 2*math.pi, n)
+        self.x[new] = x
+        self.y[new] = y
+        self.vx[new] = np.sqrt(MAX_INIT_VEL**2 - vy**2) * np.sin(angle)
+        self.vy[new] = vy
+        self.colors[new] = color.glColor()
+        self.count += n
+
+    def move(self):
+        """
+        Moves every spark by its velocity, and then applies gravity
+        """
+        n = self.count
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += GRAVITY
+
+    def cull(self, bottom):
+        """
+        Removes the sparks below the given line.
+
+        The remaining sparks keep their order.
+
+        Parameter bottom: the lowest y coordinate to keep
+        Precondition: bottom is an int or float
+        """
+        n = self.count
+        keep = self.y[:n] >= bottom
+        if keep.all():
+            return
+        kept = int(np.count_nonzero(keep))
+        for array in (self.x, self.y, self.vx, self.vy, self.colors):
+            array[:kept] = array[:n][keep]
+        self.count = kept
+
+    def _grow(self, size):
+        """
+        Enlarges the arrays to hold at least size sparks.
+
+        Parameter size: the number of sparks to make room for
+        Precondition: size is an int > len(self.x)
+        """
+        capacity = max(size, 2*len(self.x))
+        for name in ('x', 'y', 'vx', 'vy', 'colors'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,)+old.shape[1:])
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+
+class KeyState(object):
+    """
+    A class representing a set of held keys for headless play.
+
+    This class has the same is_key_down method as GInput, so it can be passed
+    anywhere the core expects the game input.  Bots and tests press and release
+    keys on it directly.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _down: the keys currently held down
+    # Invariant: _down is a set of strings
+
+    def __init__(self, keys=()):
+        """
+        Initializes the key state with the given keys held down.
+
+        Parameter keys: the keys to hold down
+        Precondition: keys is an iterable of strings
+        """
+        self._down = set(keys)
+
+    def is_key_down(self, key):
+        """
+        Returns True if key is currently held down.
+
+        Parameter key: the key to test
+        Precondition: key is a string
+        """
+        return key in self._down
+
+    def press(self, key):
+        """
+        Holds the given key down.
+
+        Parameter key: the key to press
+        Precondition: key is a string
+        """
+        self._down.add(key)
+
+    def release(self, key):
+        """
+        Releases the given key (if it is held down).
+
+        Parameter key: the key to release
+        Precondition: key is a string
+        """
+        self._down.discard(key)
+
+
+class WaveCore(object):
+    """
+    This class simulates a single wave of Alien Invaders without drawing it.
+
+    It follows exactly the rules of the class Wave, which owns an instance of
+    this class and draws from it.  The update methods have the same names as
+    those in Wave, and step runs all of them in the order that Invaders does
+    while a wave is active.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _ship: the player ship
+    # Invariant: _ship is a ShipState object or None
+    #
+    # Attribute _aliens: the alien formation
+    # Invariant: _aliens is a Formation object
+    #
+    # Attribute _bolts: the laser bolts currently on screen
+    # Invariant: _bolts is a list of BoltState objects in firing order, possibly empty
+    #
+    # Attribute _spare: spent bolts kept so that firing does not allocate
+    # Invariant: _spare is a list of BoltState objects not in _bolts
+    #
+    # Attribute _sparks: the sparks of the alien explosions
+    # Invariant: _sparks is a Particles object
+    #
+    # Attribute _powerup: the power-ups currently on screen
+    # Invariant: _powerup is a list of PowerUpState objects, possibly empty
+    #
+    # Attribute _events: the sound events since the last call to popEvents
+    # Invariant: _events is a list of sound file names, possibly empty
+    #
+    # Attribute _random: the random number generator for this wave
+    # Invariant: _random is a random.Random object
+    #
+    # All other attributes are the same as in Wave.
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getShip(self):
+        """
+        Returns the player ship, or None if it was destroyed.
+        """
+        return self._ship
+
+    def getAliens(self):
+        """
+        Returns the alien formation.
+        """
+        return self._aliens
+
+    def getBolts(self):
+        """
+        Returns the list of laser bolts currently on screen.
+        """
+        return self._bolts
+
+    def getSparks(self):
+        """
+        Returns the particle system with the sparks currently on screen.
+        """
+        return self._sparks
+
+    def getPowerUps(self):
+        """
+        Returns the list of power-ups currently on screen.
+        """
+        return self._powerup
+
+    def getLives(self):
+        """
+        Returns the value of self._lives
+        """
+        return self._lives
+
+    def getSpeed(self):
+        """
+        Returns the value of self._speed
+        """
+        return self._speed
+
+    def getScore(self):
+        """
+        Returns the value of self._score
+        """
+        return self._score
+
+    def getAlienRows(self):
+        """
+        Returns the number of rows of aliens
+        """
+        return self._aliens.rows
+
+    def getColumns(self):
+        """
+        Returns the number of aliens per row
+        """
+        return self._aliens.columns
+
+    def getEnd(self):
+        """
+        Returns the value of self._end.
+        """
+        return self._end
+
+    def getWin(self):
+        """
+        Returns the value of self._win.
+        """
+        return self._win
+
+    def popEvents(self):
+        """
+        Returns the sound events since the last call, and forgets them.
+        """
+        events = self._events
+        self._events = []
+        return events
+
+    def __init__(self, lives, speed, alienrows, score, columns=ALIENS_IN_ROW, seed=None):
+        """
+        Initializes the wave.
+
+        Parameter lives: the number of lives the player has remaining
+        Precondition: lives is an int between 0 and SHIP_LIVES
+
+        Parameter speed: the speed the aliens move across the screen
+        Precondition: speed is a float between 0 and ALIEN_SPEED
+
+        Parameter alienrows: the number of rows of aliens
+        Precondition: alienrows is an int between 1 and 10
+
+        Parameter score: the player score at the start of the wave
+        Precondition: score is an int >= 0
+
+        Parameter columns: the number of aliens per row
+        Precondition: columns is an int between 1 and 15
+
+        Parameter seed: the seed for the random number generator
+        Precondition: seed is None or a value accepted by random.seed
+        """
+        self._random = random.Random(seed)
+        self._aliens = Formation(alienrows, columns)
+        self._ship = ShipState(GAME_WIDTH/2, SHIP_BOTTOM)
+        self._time = 0
+        self._direction = 'right'
+        self._bolts = []
+        self._spare = []
+        self._fire = self._random.randint(1,BOLT_RATE)
+        self._aliensteps = 0
+        self._lives = lives
+        self._end = False
+        self._win = False
+        self._speed = speed
+        self._sparks = Particles(self._random.getrandbits(32))
+        self._score = score
+        self._time2 = 0
+        self._release = self._random.randint(5, PUP_RATE)
+        self._powerup = []
+        self._events = []
+
+    def step(self, dt, input):
+        """
+        Simulates a single frame of active play.
+
+        The updates run in the same order as in Invaders. This method does
+        nothing about a destroyed ship; the caller should call shipAlive
+        (as Invaders does in STATE_CONTINUE) if it wants to keep playing.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+
+        Parameter input: the player input
+        Precondition: input has a method is_key_down (e.g. GInput or KeyState)
+        """
+        self.updateShip(dt, input)
+        self.alienDead(dt)
+        self.updateAlienMovement(dt)
+        self.updateBolts(dt, input)
+        self.updatePowerUp(dt)
+        self.shipDead(dt)
+
+    def shipAlive(self):
+        """
+        Creates a new ship and removes all bolts
+        """
+        self._ship = ShipState(GAME_WIDTH/2, SHIP_BOTTOM)
+        self._spare.extend(self._bolts)
+        self._bolts.clear()
+
+    def updateShip(self, dt, input):
+        """
+        Moves the ship left and right.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+
+        Parameter input: the player input
+        Precondition: input has a method is_key_down (e.g. GInput or KeyState)
+        """
+        da = self._ship.x
+        self._ship.px = da
+        if input.is_key_down('left'):
+            da = max(da -SHIP_MOVEMENT, SHIP_WIDTH/2)
+        if input.is_key_down('right'):
+            da = min(da+SHIP_MOVEMENT,GAME_WIDTH-SHIP_WIDTH/2)
+        self._ship.x = da
+
+    def updateAlienMovement(self, dt):
+        """
+        Marches the aliens left, right, and down, and moves the sparks.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._time = self._time + dt
+        if not self._aliens.isEmpty():
+            if self._time > self._speed:
+                if self._direction == 'right':
+                    self._alienMoveRight()
+                else:
+                    self._alienMoveLeft()
+                self._time = 0
+                self._aliensteps = self._aliensteps + 1
+
+        if self._aliens.crossed(DEFENSE_LINE):
+            self._end = True
+            self._win = False
+        self._sparks.move()
+        self._sparks.cull(-10)
+
+    def updateBolts(self, dt, input):
+        """
+        Fires new bolts and moves all of the bolts on screen.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+
+        Parameter input: the player input
+        Precondition: input has a method is_key_down (e.g. GInput or KeyState)
+        """
+        if self._end == False:
+            self._updatePlayerBolts(dt, input)
+            self._updateAlienBolts(dt)
+            # Move the bolts and compact the survivors to the front in one pass
+            k = 0
+            for bolt in self._bolts:
+                bolt.y = bolt.y + bolt.velocity
+                if bolt.y > GAME_WIDTH or bolt.y < 0:
+                    self._spare.append(bolt)
+                else:
+                    self._bolts[k] = bolt
+                    k += 1
+            del self._bolts[k:]
+
+    def updatePowerUp(self, dt):
+        """
+        Releases, moves and collects the power-ups.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._time2 = self._time2 + dt
+        if self._release <= self._time2:
+            x = self._random.randint(0, GAME_WIDTH)
+            self._powerup.append(PowerUpState(x))
+            self._release = self._random.randint(5, PUP_RATE)
+            self._time2 = 0
+
+        for pup in self._powerup:
+            pup.y = pup.y + PUP_SPEED
+        if not self._ship is None:
+            for j in range(len(self._powerup)):
+                if self._ship.hitBy(self._powerup[j]):
+                    del self._powerup[j]
+                    self._lives = min(self._lives + 1, 5)
+                    break
+        i = 0
+        while i < len(self._powerup):
+            if self._powerup[i].y > GAME_WIDTH or self._powerup[i].y < 0:
+                del self._powerup[i]
+            else:
+                i += 1
+
+    def alienDead(self, dt):
+        """
+        Removes any alien hit by a player bolt, and ends the wave if none are left.
+
+        Each alien is killed by the first bolt (in firing order) that hits it,
+        and the aliens are checked bottom row first, left to right.  Instead of
+        testing every bolt against every alien, each bolt only tests the few
+        formation cells that its path overlaps (see _alienHits).
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        hits = self._alienHits()
+        if len(hits) > 0:
+            for r, c, i in hits:
+                self._events.append(BLAST_SOUND)
+                self._explodeAlien(r, c)
+                self._score = self._score + self._aliens.points.item(r, c)
+                self._aliens.kill(r, c)
+            self._removeBolts(set(i for r, c, i in hits))
+
+        self._end = self._aliens.isEmpty()
+        if self._end:
+            self._win = True
+
+    def shipDead(self, dt):
+        """
+        Destroys the ship if it is hit by an alien bolt.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self._ship is None:
+            return
+        for i in range(len(self._bolts)):
+            bolt = self._bolts[i]
+            if not bolt.isPlayerBolt() and self._ship.hitBy(bolt, 0, bolt.velocity):
+                self._removeBolts((i,))
+                self._ship = None
+                self._events.append(BLAST_SOUND)
+                self._lives = self._lives - 1
+                if self._lives == 0:
+                    self._win = False
+                return
+
+    # HELPER METHODS
+    def _alienMoveRight(self):
+        """
+        Moves the aliens right, or down at the right wall.
+        """
+        check = self._aliens.right() + ALIEN_H_WALK + ALIEN_H_SEP
+        if check < GAME_WIDTH - ALIEN_H_SEP:
+            self._aliens.shift(ALIEN_H_WALK, 0)
+        else:
+            self._aliens.shift(0, -ALIEN_V_WALK)
+            self._direction = 'left'
+
+    def _alienMoveLeft(self):
+        """
+        Moves the aliens left, or down at the left wall.
+        """
+        check = self._aliens.left() - ALIEN_H_WALK - ALIEN_H_SEP
+        if check > 0 + ALIEN_H_SEP:
+            self._aliens.shift(-ALIEN_H_WALK, 0)
+        else:
+            self._aliens.shift(0, -ALIEN_V_WALK)
+            self._direction = 'right'
+
+    def _alienHits(self):
+        """
+        Returns the (row, column, bolt index) triples for the aliens hit this frame.
+
+        The triples are in the order the aliens are checked (bottom row first,
+        left to right), and each alien and each bolt appears at most once.
+
+        Each bolt only tests the formation cells its path this update
+        overlaps, which is the same as testing every alien (the others cannot
+        touch it). Testing the path means a bolt cannot pass through an alien
+        between updates, however fast it is.
+        """
+        hits = []
+        for i in range(len(self._bolts)):
+            bolt = self._bolts[i]
+            if bolt.isPlayerBolt():
+                for r, c in self._aliens.cells(bolt, bolt.velocity):
+                    if self._aliens.hitBy(r, c, bolt, bolt.velocity):
+                        hits.append((r, c, i))
+
+        if len(hits) < 2:
+            return hits
+        hits.sort()
+        result = []
+        killed = set()
+        spent = set()
+        for r, c, i in hits:
+            if not (r, c) in killed and not i in spent:
+                result.append((r, c, i))
+                killed.add((r, c))
+                spent.add(i)
+        return result
+
+    def _newBolt(self, x, y, velocity):
+        """
+        Returns a bolt at (x,y) with the given velocity, reusing a spent bolt if possible
+
+        Parameter x: The horizontal coordinate of the bolt center
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the bolt center
+        Precondition: y is an int or float
+
+        Parameter velocity: The velocity in the y direction
+        Precondition: velocity is an int or float
+        """
+        if len(self._spare) == 0:
+            return BoltState(x, y, velocity)
+        bolt = self._spare.pop()
+        bolt.x = x
+        bolt.y = y
+        bolt.velocity = velocity
+        return bolt
+
+    def _removeBolts(self, spent):
+        """
+        Removes the bolts at the given positions in _bolts, keeping them for reuse.
+
+        The other bolts stay in firing order.  This is a single pass over the
+        bolts, however many are removed.
+
+        Parameter spent: the positions of the bolts to remove
+        Precondition: spent is a set or tuple of valid indices into _bolts
+        """
+        k = 0
+        for i in range(len(self._bolts)):
+            bolt = self._bolts[i]
+            if i in spent:
+                self._spare.append(bolt)
+            else:
+                self._bolts[k] = bolt
+                k += 1
+        del self._bolts[k:]
+
+    def _updatePlayerBolts(self, dt, input):
+        """
+        Fires a bolt from the ship if the player has no bolt on screen
+        """
+        for bolt in self._bolts:
+            if bolt.isPlayerBolt():
+                return
+        if input.is_key_down('up'):
+            y = SHIP_HEIGHT/2 + SHIP_BOTTOM + BOLT_HEIGHT/2
+            self._bolts.append(self._newBolt(self._ship.x, y, BOLT_SPEED))
+            self._events.append(PEW_SOUND)
+
+    def _updateAlienBolts(self, dt):
+        """
+        Fires a bolt from the bottom alien of a random column every few steps
+        """
+        if self._aliensteps == self._fire:
+            column = self._random.choice(self._aliens.livecolumns)
+            x, y = self._aliens.position(self._aliens.bottomRow(column), column)
+            self._bolts.append(self._newBolt(x, y - ALIEN_HEIGHT/2, -BOLT_SPEED))
+            self._events.append(POP_SOUND)
+            self._fire = self._random.randint(1,BOLT_RATE)
+            self._aliensteps = 0
+
+    def _explodeAlien(self, r, c):
+        """
+        Creates the sparks for exploding alien (r,c).
+
+        Parameter r: the row of the alien
+        Precondition: r is an int in 0..rows-1
+
+        Parameter c: the column of the alien
+        Precondition: c is an int in 0..columns-1
+        """
+        x, y = self._aliens.position(r, c)
+        color = introcs.RGB(self._random.randrange(256),
+                            self._random.randrange(256),
+                            self._random.randrange(256))
+        self._sparks.burst(x, y, PARTICLES_PER_SHELL, color)
@@ -7,10 +7,18 @@ simpler for students in CS 1110.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
+from .gaffine import GAffine
 from .gobject import GObject, GScene
+from .glayer import GLayer
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
 from .gsprite import GSprite
 from .gpath import GPath, GTriangle, GPolygon
+from .gparticles import GParticles
+from .gbatch import TextureAtlas, GSpriteBatch
 from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
+from .gsoftview import GSoftView
+from .gprofile import GProfiler
+from .grecord import GRecording
+from .galloc import GAllocTracker
+from .sound import Sound, SoundLibrary, SoundBank
 from .app import GameApp
\ No newline at end of file
@@ -16,6 +16,7 @@ from kivy.config import Config
 from kivy.clock  import Clock
 
 import os.path
+import random
 
 class GameApp(kivy.app.App):
     """
@@ -35,9 +36,40 @@ class GameApp(kivy.app.App):
     
     :meth:`draw`: This method draws all of the objects to the screen.  The only 
     thing you should have in this method are calls to ``self.view.draw()``.
+    
+    By default, :meth:`update` is called once per animation frame with the time since
+    the last frame.  If you set the attribute :attr:`step`, the game runs with a fixed
+    time step instead: every frame adds its time to an accumulator, and :meth:`update`
+    is called once for every whole ``step`` in the accumulator (but never more than
+    :attr:`maxsteps` times per frame).  The leftover fraction of a step is available
+    as :attr:`alpha`, and is passed to :meth:`interpolate` just before :meth:`draw`.
+    
+    Each frame has a budget of ``1/fps`` seconds, and the Kivy clock waits between
+    frames, so the game uses no more CPU than the frames need.  If a frame starts a
+    whole budget late, the game is falling behind: that frame
+    still calls :meth:`update`, but skips :meth:`draw` (and the window keeps showing
+    the last frame drawn), at most :attr:`maxskips` frames in a row.  The attributes
+    :attr:`frames`, :attr:`late` and :attr:`skipped` count what has happened so far.
+    
+    A game made with the keyword ``backend='software'`` opens no window at all.  Its
+    :attr:`view` is a :class:`GSoftView`, which draws each frame into a NumPy array
+    (``scale`` times the size of the window).  The game runs as fast as it can, with
+    every frame standing for one :attr:`budget` of game time, until :meth:`stop` is
+    called.  You can also start it with :meth:`advance` instead of :meth:`run`, to
+    process a given number of frames at a time.
+    
+    A game with a fixed :attr:`step` can record the keys held down at each update
+    (with :meth:`record`, or the keyword ``record``), and play them back later (with
+    :meth:`replay`, or the keyword ``replay``).  If the game gets the seeds of all of its
+    random numbers from :meth:`random_seed`, the playback does exactly what the game did
+    when it was recorded.  A software game plays a recording back as fast as it can.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
+    # Class attribute for the texture atlas of the Images folder (made when first needed)
+    ATLAS = None
+    # Class attribute for whether the game is drawn without a window (set by __init__)
+    SOFTWARE = False
     
     
     # MUTABLE ATTRIBUTES
@@ -48,7 +80,8 @@ class GameApp(kivy.app.App):
         
         By default this value is 60 FPS. However, we cannot guarantee that the FPS is 
         achievable.  If you are having performance stuttering, you might want to drop
-        this value to 30 FPS instead.
+        this value to 30 FPS instead.  The rate is also capped by the Kivy setting
+        ``maxfps`` (60 by default).
         
         **Invariant**: Must be an int or float > 0.
         """
@@ -58,9 +91,90 @@ class GameApp(kivy.app.App):
     def fps(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         assert value > 0, 'value %s is not positive' % repr(value)
-        Clock.unschedule(self._refresh)
         self._fps = value
-        Clock.schedule_interval(self._refresh,1.0/self._fps)
+        if not self._clock is None:
+            self._clock.cancel()
+            self._clock = Clock.schedule_interval(self._refresh,1.0/self._fps)
+    
+    @property
+    def step(self):
+        """
+        The fixed simulation time step in seconds, or None for a variable step
+        
+        If this value is None (the default), :meth:`update` is called once per frame
+        with the time since the last frame.  Otherwise, :meth:`update` is always called
+        with this value, as many times as the elapsed time allows.  This makes the speed 
+        of the game independent of the frame rate.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._step
+    
+    @step.setter
+    def step(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._step = value
+        self._accumulator = 0.0
+    
+    @property
+    def maxsteps(self):
+        """
+        The maximum number of fixed steps to simulate in a single frame
+        
+        If a frame is so late that it needs more steps than this to catch up, the 
+        extra time is dropped and the game slows down instead of falling further 
+        behind.  This value is ignored if :attr:`step` is None.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @maxsteps.setter
+    def maxsteps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
+    @property
+    def maxskips(self):
+        """
+        The maximum number of late frames in a row that may skip :meth:`draw`
+        
+        Skipping the draw of a late frame gives its time to :meth:`update`, so the game
+        can catch up.  After this many skipped frames in a row, the next frame is drawn
+        even if it is late, so the window never freezes.  If this value is 0, no frame
+        is ever skipped.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._maxskips
+    
+    @maxskips.setter
+    def maxskips(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value >= 0, 'value %s is negative' % repr(value)
+        self._maxskips = value
+    
+    @property
+    def render(self):
+        """
+        Whether a software game draws its frames into pixels
+        
+        If this value is False, a software game still calls :meth:`draw` every frame,
+        but the :attr:`view` never turns the shapes drawn into pixels.  This is much
+        faster, for programs that only need the game to run (like the replay of a 
+        recording).  A game with a window always draws its frames.
+        
+        **Invariant**: Must be a bool, and True unless the :attr:`backend` is 'software'.
+        """
+        return self._render
+    
+    @render.setter
+    def render(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        assert value or self._backend == 'software', 'only a software game can stop rendering'
+        self._render = value
     
     
     # IMMUTABLE PROPERTIES
@@ -90,7 +204,8 @@ class GameApp(kivy.app.App):
         Use the `draw` method  in this attribute to display any :class:`GObject` instance 
         on the screen.  See the class :class:`GView` for more information.
         
-        **Invariant**: Must be instance of :class:`GView`.
+        **Invariant**: Must be instance of :class:`GView` (or :class:`GSoftView` if the
+        :attr:`backend` is 'software').
         """
         return self._view
     
@@ -106,6 +221,146 @@ class GameApp(kivy.app.App):
         """
         return self._input
     
+    @property
+    def alpha(self):
+        """
+        The fraction of a fixed step left in the accumulator after the last update
+        
+        Use this value to draw moving objects between their previous and current 
+        positions.  It is always 1.0 if :attr:`step` is None, since the game has 
+        been simulated all the way to the current frame.
+        
+        **Invariant**: Must be a float in the range [0,1].
+        """
+        if self._step is None:
+            return 1.0
+        return min(self._accumulator/self._step,1.0)
+    
+    @property
+    def budget(self):
+        """
+        The time in seconds allowed for one frame
+        
+        **Invariant**: Must be a float > 0, equal to ``1/fps``.
+        """
+        return 1.0/self._fps
+    
+    @property
+    def frames(self):
+        """
+        The number of frames processed since the game started, drawn or not
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+    
+    @property
+    def late(self):
+        """
+        The number of frames that started a whole :attr:`budget` (or more) late
+        
+        **Invariant**: Must be an int in the range 0..:attr:`frames`.
+        """
+        return self._late
+    
+    @property
+    def skipped(self):
+        """
+        The number of late frames that skipped :meth:`draw`
+        
+        **Invariant**: Must be an int in the range 0..:attr:`late`.
+        """
+        return self._skipped
+    
+    @property
+    def profiler(self):
+        """
+        The profiler that times the phases of each frame.
+        
+        The game times the phases 'update', 'draw', 'commit' (sending the frame to the
+        window) on its own, and counts the drawing statistics of the view
+        (like 'view.textures', see the attribute ``stats`` of :class:`GView`), but only
+        if the profiler is enabled (the keyword ``profile=True``, or setting its 
+        ``enabled`` attribute).  Your game can
+        time its own phases with the methods ``begin`` and ``end`` of this object.  If
+        its ``visible`` attribute is True, the times are drawn over the game.  See the
+        class :class:`GProfiler` for more information.
+        
+        **Invariant**: Must be instance of :class:`GProfiler`.
+        """
+        return self._profiler
+    
+    @property
+    def tracker(self):
+        """
+        The tracker that counts the objects made in each frame.
+        
+        The tracker is off unless it is enabled (the keyword ``track=True``, or setting
+        its ``enabled`` attribute), since it slows down every function call.  When it 
+        is on, it counts the objects made by each part of the game (the classes and 
+        modules in the folder of your game, or in this package), and the garbage 
+        collections, per frame.  If its ``visible`` attribute is True, the busiest parts
+        are drawn over the game.  See the class :class:`GAllocTracker` for more 
+        information.
+        
+        **Invariant**: Must be instance of :class:`GAllocTracker`.
+        """
+        return self._tracker
+    
+    @property
+    def ticks(self):
+        """
+        The number of times :meth:`update` has been called since the game started
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._ticks
+    
+    @property
+    def recording(self):
+        """
+        The recording of the keys pressed in each update, or None if there is none
+        
+        See the method :meth:`record` for more information.
+        
+        **Invariant**: Must be None or instance of :class:`GRecording`.
+        """
+        return self._recording
+    
+    @property
+    def replaying(self):
+        """
+        The recording being played back, or None if the game uses the keyboard
+        
+        See the method :meth:`replay` for more information.
+        
+        **Invariant**: Must be None or instance of :class:`GRecording`.
+        """
+        return self._replay
+    
+    @property
+    def backend(self):
+        """
+        The way the game is drawn: 'kivy' (an OpenGL window) or 'software' (a NumPy array)
+        
+        **Invariant**: Must be one of 'kivy' or 'software'.
+        """
+        return self._backend
+    
+    @property
+    def checked(self):
+        """
+        Whether the game checks the preconditions of this package
+        
+        Every precondition in this package (like the type of a new ``x`` value) is an
+        assert.  They catch mistakes while you develop a game, but they also cost time on
+        every frame.  Running Python with the option -O removes all of them, at which
+        point this attribute is False.  The mode is fixed when Python starts.
+        
+        **Invariant**: Must be a bool
+        """
+        return __debug__
+    
     # CLASS METHODS
     @classmethod
     def is_image(cls,name):
@@ -181,8 +436,10 @@ class GameApp(kivy.app.App):
         
         try:
             from kivy.core.image import Image
+            from .gobject import GObject
             texture = Image(name).texture
             cls.TEXTURE_CACHE[name] = texture
+            GObject._count_texture()
         except:
             texture = None
         
@@ -208,6 +465,19 @@ class GameApp(kivy.app.App):
         
         return None
     
+    @classmethod
+    def load_atlas(cls):
+        """
+        Returns: The texture atlas of every image in the **Images** folder
+        
+        The atlas is packed the first time this method is called, and cached after
+        that.  It is used by :class:`GSpriteBatch` to draw many images at once.
+        """
+        if cls.ATLAS is None:
+            from .gbatch import TextureAtlas
+            GameApp.ATLAS = TextureAtlas(cls.images)
+        return cls.ATLAS
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -232,19 +502,65 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        s = keywords.pop('step', None)
+        m = keywords.pop('maxsteps', 5)
+        k = keywords.pop('maxskips', 2)
+        b = keywords.pop('backend', 'kivy')
+        p = keywords.pop('profile', False)
+        c = keywords.pop('scale', 1.0)
+        r = keywords.pop('seed', None)
+        o = keywords.pop('record', None)
+        y = keywords.pop('replay', None)
+        t = keywords.pop('track', False)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(f)
-        assert f > 0, 'fps %s is not positive' % repr(value)
+        assert f > 0, 'fps %s is not positive' % repr(f)
+        assert b in ['kivy','software'], 'backend %s is not valid' % repr(b)
+        assert type(c) in [int,float], 'scale %s is not a number' % repr(c)
+        assert c > 0, 'scale %s is not positive' % repr(c)
+        assert type(p) == bool, 'profile %s is not a bool' % repr(p)
+        assert type(t) == bool, 'track %s is not a bool' % repr(t)
+        assert o is None or type(o) == str, 'record %s is not a file name' % repr(o)
+        assert y is None or type(y) == str, 'replay %s is not a file name' % repr(y)
 
         self._gwidth = w
         self._gheight = h
-        self._fps = f
+        self._clock = None
+        self.fps = f
+        self.step = s
+        self.maxsteps = m
+        self.maxskips = k
+        self._frames = 0
+        self._late = 0
+        self._skipped = 0
+        self._skiprun = 0
+        self._backend = b
+        self._scale = c
+        self._running = False
+        self._render = True
+        self._ticks = 0
+        self._random = random.Random(r)
+        self._recording = None
+        self._recordfile = None
+        self._replay = None
+        self._replaytick = 0
+        self._replayseed = 0
+        from .gprofile import GProfiler
+        self._profiler = GProfiler(enabled=p)
+        if not y is None:
+            from .grecord import GRecording
+            self.replay(GRecording.load(y))
+        if not o is None:
+            self.record(o)
+        GameApp.SOFTWARE = b == 'software'
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
         self._setpaths()
+        from .galloc import GAllocTracker
+        self._tracker = GAllocTracker([os.path.dirname(GameApp.images)],enabled=t)
         
         # Tell Kivy to build the application
         kivy.app.App.__init__(self,**keywords)
@@ -272,6 +588,16 @@ class GameApp(kivy.app.App):
         This is a Kivy reserved method.  It is part of the Kivy application process.  
         It should **never** be overridden.
         """
+        if self._backend == 'software':
+            self._boot_software()
+            try:
+                while self._running:
+                    self._frame(self.budget)
+            finally:
+                # Save the recording even if the game was interrupted
+                if self._running:
+                    self.on_stop()
+            return
         Clock.schedule_once(self._bootstrap,-1)
         kivy.app.App.run(self)
     
@@ -280,12 +606,121 @@ class GameApp(kivy.app.App):
         Closes the game window and exit Python.
         
         This is a Kivy reserved method.  It is part of the Kivy application process.  
-        It should **never** be overridden.
+        It should **never** be overridden.  With the software backend, it only ends
+        :meth:`run` (or :meth:`advance`) and returns.
         """
         import sys
+        if self._backend == 'software':
+            self._running = False
+            self.on_stop()
+            return
         kivy.app.App.stop(self)
         sys.exit(0)
     
+    def advance(self,frames=1):
+        """
+        Processes the given number of frames of a software game.
+        
+        The first call starts the game (calling :meth:`start`).  Each frame updates the
+        game by one :attr:`budget` of time and draws it into the :attr:`view`, without
+        waiting.  This method stops early if the game calls :meth:`stop`.
+        
+        :param frames: the number of frames to process
+        :type frames:  ``int`` >= 0
+        
+        :return: The number of frames processed
+        :rtype:  ``int``
+        """
+        assert self._backend == 'software', 'advance requires the software backend'
+        assert type(frames) == int and frames >= 0, '%s is not a valid frame count' % repr(frames)
+        if not hasattr(self,'_view'):
+            self._boot_software()
+        count = 0
+        while self._running and count < frames:
+            self._frame(self.budget)
+            count += 1
+        return count
+    
+    def on_stop(self):
+        """
+        Saves the recording, if the game was made with the keyword ``record``.
+        
+        This is a Kivy reserved method, called when the window closes.  It should 
+        **never** be overridden.
+        """
+        if not self._recordfile is None:
+            self._recording.save(self._recordfile)
+    
+    def record(self,filename=None):
+        """
+        Starts recording the keys held down at the start of every update.
+        
+        The recording also holds every seed returned by :meth:`random_seed`.  It is 
+        available in the attribute :attr:`recording`, which you can save at any time.
+        If you give a file name, the recording is also saved to that file when the game
+        stops.  Recording requires a fixed :attr:`step`.
+        
+        :param filename: the file to save the recording to when the game stops
+        :type filename:  ``str`` or None
+        
+        :return: the new recording
+        :rtype:  :class:`GRecording`
+        """
+        from .grecord import GRecording
+        assert not self._step is None, 'a game needs a fixed step to be recorded'
+        assert filename is None or type(filename) == str, '%s is not a file name' % repr(filename)
+        self._recording = GRecording(self._step)
+        self._recordfile = filename
+        return self._recording
+    
+    def replay(self,recording):
+        """
+        Plays back a recording, starting with the next update.
+        
+        While a recording plays back, the keys it used are held down (or not) just as 
+        they were when it was recorded, whatever happens on the keyboard.  The method
+        :meth:`random_seed` returns the seeds of the recording, in the same order.  The
+        game returns to the keyboard once the last update of the recording is done.  A
+        software game stops instead, so :meth:`run` returns.
+        
+        A game with a window plays the recording in real time.  A software game plays it
+        as fast as it can; set :attr:`render` to False to play it even faster.  For the
+        game to do the same thing, it must start in the same state as the recording, 
+        with the same :attr:`step`.
+        
+        :param recording: the recording to play back
+        :type recording:  :class:`GRecording`
+        """
+        from .grecord import GRecording
+        assert isinstance(recording,GRecording), '%s is not a recording' % repr(recording)
+        assert not self._step is None and abs(recording.step-self._step) < 1e-9, \
+            'the recording step %s is not the game step' % repr(recording.step)
+        self._replay = recording
+        self._replaytick = 0
+        self._replayseed = 0
+    
+    def random_seed(self):
+        """
+        Returns a new seed for a random number generator.
+        
+        A game that is recorded should get all of its random numbers from generators 
+        with these seeds (like ``random.Random(seed)``), so that the playback makes the
+        same random numbers.  While a recording plays back, this method returns its 
+        seeds in order.  Otherwise, the seeds come from a generator seeded with the 
+        keyword ``seed``, or with the time if there is no such keyword.
+        
+        :return: a seed for a random number generator
+        :rtype:  ``int`` >= 0
+        """
+        if not self._replay is None and self._replayseed < len(self._replay.seeds):
+            seed = self._replay.seeds[self._replayseed][1]
+            self._replayseed += 1
+        else:
+            seed = self._random.getrandbits(32)
+        if not self._recording is None:
+            self._recording.add_seed(seed)
+        return seed
+    
     def start(self):
         """
         Initializes the game state, creating a new game.
@@ -310,11 +745,28 @@ class GameApp(kivy.app.App):
         that represent the current animation state, so that they can persist across
         animation frames.  These attributes should be initialized in `start`.
         
+        If :attr:`step` is set, this method is called at that fixed rate instead, 
+        possibly several times (or not at all) per animation frame.
+        
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
         pass
     
+    def interpolate(self,alpha):
+        """
+        Prepares the game objects to be drawn part way into the next fixed step.
+        
+        This method is called just before :meth:`draw`.  If you use a fixed :attr:`step`,
+        you can override it to place moving objects ``alpha`` of the way between their 
+        positions at the last two updates, so that motion looks smooth even when the 
+        frame rate and the simulation rate differ.  By default it does nothing.
+        
+        :param alpha: the fraction of a step since the last update
+        :type alpha:  ``float`` in [0,1]
+        """
+        pass
+    
     def draw(self):
         """
         Draws the game objects on the screen.
@@ -331,12 +783,10 @@ class GameApp(kivy.app.App):
         Bootstraps the clock scheduler for the game..
         
         This method is a callback-proxy for method `start`.  It handles important issues 
-        behind the scenes, particularly with setting the FPS
+        behind the scenes, particularly with setting the FPS.  The Kivy clock calls the
+        refresh once every :attr:`budget`.
         """
-        if (self.fps < 60):
-            Clock.schedule_interval(self._refresh,1.0/self.fps)
-        else:
-            Clock.schedule_interval(self._refresh,0)
+        self._clock = Clock.schedule_interval(self._refresh,self.budget)
         self.start()
     
     def _refresh(self,dt):
@@ -345,13 +795,110 @@ class GameApp(kivy.app.App):
         
         This method a callback-proxy for the methods `update` and `draw`.  It handles
         important issues behind the scenes, particularly with clearing the window.
+        If :attr:`step` is set, it runs the fixed-step accumulator.  It skips the draw
+        if the frame started a whole :attr:`budget` late (that is, if the time since the
+        last frame is at least two budgets).
         
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
-        self.view.clear()
+        self._frame(dt,dt >= 2.0/self._fps)
+    
+    def _frame(self,dt,late=False):
+        """
+        Updates and (unless it is skipped) draws a single animation frame.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        
+        :param late: whether the frame started a whole budget late
+        :type late:  ``bool``
+        """
+        profiler = self._profiler
+        profiler.begin('update')
+        if self._step is None:
+            self._update(dt)
+        else:
+            self._accumulator += dt
+            steps = 0
+            while self._accumulator >= self._step and steps < self._maxsteps:
+                self._update(self._step)
+                self._accumulator -= self._step
+                steps += 1
+            if self._accumulator >= self._step:
+                # Too far behind; drop the whole steps we could not simulate
+                self._accumulator %= self._step
+        profiler.end('update')
+        
+        self._frames += 1
+        if late:
+            self._late += 1
+        if late and self._skiprun < self._maxskips:
+            self._skipped += 1
+            self._skiprun += 1
+        else:
+            self._skiprun = 0
+            profiler.begin('draw')
+            self.view.clear()
+            self.interpolate(self.alpha)
+            self.draw()
+            profiler.end('draw')
+            profiler.draw(self.view)
+            self._tracker.draw(self.view,self.width-10)
+            if self._render:
+                profiler.begin('commit')
+                self.view._commit()
+                profiler.end('commit')
+                if profiler.enabled:
+                    for name, value in self.view.stats.items():
+                        profiler.count('view.'+name,value)
+        profiler.commit()
+        self._tracker.commit()
+    
+    def _update(self,dt):
+        """
+        Calls :meth:`update`, after recording the keys or setting them from a recording.
+        
+        A software game stops when its recording has played back, and does not update.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        if self._backend == 'software' and not self._running:
+            return
+        if not self._replay is None:
+            if self._replaytick < self._replay.ticks:
+                self._replay.apply(self._replaytick,self._input)
+                self._replaytick += 1
+            else:
+                self._replay = None
+                if self._backend == 'software':
+                    self.stop()
+                    return
+        if not self._recording is None:
+            self._recording.add_tick(self._input)
+        self._ticks += 1
         self.update(dt)
-        self.draw()
+    
+    def _boot_software(self):
+        """
+        Creates the view and input of a software game, and starts the game.
+        
+        This method replaces :meth:`build` and :meth:`_bootstrap` when there is no window.
+        The input handler is not connected to anything, so no keys are ever down unless
+        they are set by a program.
+        """
+        import signal
+        from .gview import GInput
+        from .gsoftview import GSoftView
+        self._view = GSoftView(self.width,self.height,self._scale)
+        self._input = GInput()
+        self._running = True
+        self.start()
+        # SDL (loaded for images and sound) turns Ctrl-C into a window event, but there
+        # is no window to receive it
+        signal.signal(signal.SIGINT,signal.default_int_handler)
+        signal.signal(signal.SIGTERM,signal.SIG_DFL)
     
     def _setpaths(self):
         """
@@ -0,0 +1,196 @@
+"""
+Lightweight 2D transforms for 2D game support.
+
+This module provides the transform matrix of a :class:`GObject`.  Unlike the matrices
+in ``introcs``, these transforms are plain Python (no numpy), are only 2D, and are
+updated in place.  So moving, rotating or scaling an object never allocates a new
+matrix.
+"""
+import math
+
+
+# #mark -
+class GAffine(object):
+    """
+    A class representing a 2D affine transform.
+
+    The transform is the 2x3 matrix::
+
+        | a  c  tx |
+        | b  d  ty |
+
+    so a point (x,y) is sent to (a*x+c*y+tx, b*x+d*y+ty).  The six entries are public
+    attributes, but you should normally change them with :meth:`set`, which marks the
+    cached inverse as out of date.
+
+    The inverse of this transform is computed the first time it is needed after each
+    change, and stored in the same :class:`GAffine` object from then on.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def inverse(self):
+        """
+        The inverse of this transform.
+
+        The inverse is recomputed in place if this transform has changed since the
+        last time it was accessed.  If this transform is not invertible (e.g. it has a
+        scale of 0), the inverse sends every point to the origin.
+
+        **invariant**: Value is a :class:`GAffine`
+        """
+        if self._inverse is None:
+            self._inverse = GAffine()
+            self._itrue = False
+        if not self._itrue:
+            self._invert(self._inverse)
+            self._itrue = True
+        return self._inverse
+
+
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates a new identity transform.
+        """
+        self.a  = 1.0
+        self.b  = 0.0
+        self.c  = 0.0
+        self.d  = 1.0
+        self.tx = 0.0
+        self.ty = 0.0
+        self._inverse = None
+        self._itrue = False
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this transform.
+        :rtype:  ``str``
+        """
+        return '[[%s,%s,%s],[%s,%s,%s]]' % (repr(self.a),repr(self.c),repr(self.tx),
+                                            repr(self.b),repr(self.d),repr(self.ty))
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this transform.
+        :rtype:  ``str``
+        """
+        return str(self.__class__)+str(self)
+
+
+    # PUBLIC METHODS
+    def set(self,x,y,angle,sx,sy):
+        """
+        Sets this transform (in place) to a translation, rotation and scale.
+
+        The result is the transform of a :class:`GObject`: a point is first scaled by
+        (sx,sy), then rotated by angle degrees counter-clockwise, and then moved by (x,y).
+
+        :param x: the horizontal translation
+        :type x:  ``float``
+
+        :param y: the vertical translation
+        :type y:  ``float``
+
+        :param angle: the angle of rotation in degrees
+        :type angle:  ``float``
+
+        :param sx: the horizontal scale
+        :type sx:  ``float``
+
+        :param sy: the vertical scale
+        :type sy:  ``float``
+        """
+        if angle == 0.0:
+            cos = 1.0
+            sin = 0.0
+        else:
+            rad = math.radians(angle)
+            cos = math.cos(rad)
+            sin = math.sin(rad)
+        self.a  = cos*sx
+        self.b  = sin*sx
+        self.c  = -sin*sy
+        self.d  = cos*sy
+        self.tx = x
+        self.ty = y
+        self._itrue = False
+
+    def transform(self,x,y):
+        """
+        Transforms the point (x,y) by this matrix.
+
+        :param x: the horizontal coordinate of the point
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical coordinate of the point
+        :type y:  ``int`` or ``float``
+
+        :return: The transformed point
+        :rtype:  2-element ``tuple`` of ``float``
+        """
+        return (self.a*x+self.c*y+self.tx, self.b*x+self.d*y+self.ty)
+
+    def radius_x(self,width,height):
+        """
+        Returns the horizontal half-size of a transformed rectangle.
+
+        The rectangle has the given size and is centered at the origin.  The value is
+        half of the width of the bounding box of the rectangle after this transform, so
+        the bounding box spans ``tx-radius_x`` to ``tx+radius_x``.
+
+        :param width: the width of the rectangle
+        :type width:  ``int`` or ``float``
+
+        :param height: the height of the rectangle
+        :type height:  ``int`` or ``float``
+
+        :return: The horizontal half-size of the transformed rectangle
+        :rtype:  ``float``
+        """
+        return (abs(self.a)*width+abs(self.c)*height)/2.0
+
+    def radius_y(self,width,height):
+        """
+        Returns the vertical half-size of a transformed rectangle.
+
+        The rectangle has the given size and is centered at the origin.  The value is
+        half of the height of the bounding box of the rectangle after this transform,
+        so the bounding box spans ``ty-radius_y`` to ``ty+radius_y``.
+
+        :param width: the width of the rectangle
+        :type width:  ``int`` or ``float``
+
+        :param height: the height of the rectangle
+        :type height:  ``int`` or ``float``
+
+        :return: The vertical half-size of the transformed rectangle
+        :rtype:  ``float``
+        """
+        return (abs(self.b)*width+abs(self.d)*height)/2.0
+
+
+    # HIDDEN METHODS
+    def _invert(self,result):
+        """
+        Stores the inverse of this transform in result.
+
+        :param result: the transform to overwrite
+        :type result:  :class:`GAffine`
+        """
+        det = self.a*self.d-self.b*self.c
+        if det == 0.0:
+            result.a = result.b = result.c = result.d = 0.0
+            result.tx = result.ty = 0.0
+        else:
+            a =  self.d/det
+            b = -self.b/det
+            c = -self.c/det
+            d =  self.a/det
+            result.a  = a
+            result.b  = b
+            result.c  = c
+            result.d  = d
+            result.tx = -(a*self.tx+c*self.ty)
+            result.ty = -(b*self.tx+d*self.ty)
+        result._itrue = False
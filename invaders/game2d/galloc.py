@@ -0,0 +1,376 @@
+"""
+Allocation tracking for 2D game support.
+
+This module provides a tracker that counts the objects made in each animation frame,
+and which part of the game made them.  A game that makes objects every frame (labels,
+sounds, models, Kivy instructions) makes work for the garbage collector, whose
+collections show up as hitches.  The tracker also counts those collections, and the
+time they take.
+"""
+from .gobject import GObject
+from .grectangle import GLabel
+import collections
+import gc
+import os.path
+import sys
+import time
+
+
+# #mark -
+class GAllocTracker(object):
+    """
+    A class representing a tracker for the objects made in each animation frame.
+
+    While the tracker is :attr:`enabled`, it counts every object of a Python class that
+    is made (by watching calls to ``__init__``), along with its maker.  The maker is the
+    object whose method made it, as long as that method is part of the game (a file
+    in one of the :attr:`roots`).  So a :class:`GLabel` made in a method of the wave
+    counts for the wave, while the Kivy objects made inside of the :class:`GLabel` count
+    for the label.  Objects made outside of any method of the game count for the module
+    (file) that made them, and objects made entirely outside of the game count for
+    'other'.  Objects written in C, like numpy arrays and Kivy graphics instructions,
+    are not counted this way.  Instead, the instructions put in a drawing cache when a
+    :class:`GObject` rebuilds it count for the class of that object, with the kind
+    'instructions'.
+
+    At the end of each frame, :meth:`commit` adds the counts of the frame to a ring
+    buffer, along with the garbage collections of that frame and the time they took.
+    The method :meth:`rates` divides the counts in the ring buffer by the number of
+    frames, which is the steady-state rate if the game has been doing the same thing
+    for the last :attr:`capacity` frames.
+
+    A :class:`GameApp` has a tracker in its ``tracker`` attribute.  Tracking makes each
+    function call slower, so the tracker is off unless you enable it.  Enabling and
+    disabling it is allowed at any time.
+    """
+    # The number of frames between updates of the overlay text
+    OVERLAY_INTERVAL = 30
+    # The number of rates shown in the overlay
+    OVERLAY_ROWS = 12
+    # The font of the overlay (the fixed width font that comes with Kivy)
+    OVERLAY_FONT = 'data/fonts/RobotoMono-Regular.ttf'
+
+
+    # MUTABLE PROPERTIES
+    @property
+    def enabled(self):
+        """
+        Whether this tracker is counting objects.
+
+        **invariant**: Value is a bool
+        """
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        if value and not self._enabled:
+            self._current.clear()
+            self._gcstart = None
+            sys.setprofile(self._watch)
+            gc.callbacks.append(self._collect)
+            GObject.TRACKER = self
+        elif not value and self._enabled:
+            if sys.getprofile() == self._watch:
+                sys.setprofile(None)
+            gc.callbacks.remove(self._collect)
+            if GObject.TRACKER is self:
+                GObject.TRACKER = None
+        self._enabled = value
+
+    @property
+    def visible(self):
+        """
+        Whether :meth:`draw` shows the overlay of allocation rates.
+
+        The overlay is a table in the bottom right corner of the view, with the number
+        of objects made per frame by the busiest makers, and the garbage collections per
+        frame.  It is updated every few frames, since rendering text is slow.  The
+        overlay itself is never counted.
+
+        **invariant**: Value is a bool
+        """
+        return self._visible
+
+    @visible.setter
+    def visible(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._visible = value
+        self._shown = None
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The number of frames kept in the ring buffer.
+
+        **invariant**: Value is an int > 0
+        """
+        return self._capacity
+
+    @property
+    def frames(self):
+        """
+        The number of frames committed since this tracker was made (or cleared).
+
+        Only the last :attr:`capacity` of these are still in the ring buffer.
+
+        **invariant**: Value is an int >= 0
+        """
+        return self._frames
+
+    @property
+    def roots(self):
+        """
+        The folders with the files of the game.
+
+        Only methods in these folders can be makers.
+
+        **invariant**: Value is a tuple of absolute paths
+        """
+        return self._roots
+
+
+    # BUILT-IN METHODS
+    def __init__(self,roots=(),capacity=600,enabled=False):
+        """
+        Creates a new tracker with an empty ring buffer.
+
+        The folder of this package is always one of the roots.
+
+        :param roots: the folders with the files of the game
+        :type roots:  ``list`` or ``tuple`` of ``str``
+
+        :param capacity: the number of frames to keep in the ring buffer
+        :type capacity:  ``int`` > 0
+
+        :param enabled: whether to start counting right away
+        :type enabled:  ``bool``
+        """
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        here = os.path.dirname(os.path.abspath(__file__))
+        paths = [os.path.abspath(root) for root in roots]+[here]
+        self._roots = tuple(os.path.join(path,'') for path in paths)
+        self._capacity = capacity
+        self._enabled = False
+        self._visible = False
+        self._paused  = False
+        self._current = {}
+        self._gcstart = None
+        self._gccount = 0
+        self._gctime  = 0.0
+        self._codes = {}
+        self._label = None
+        self._shown = None
+        self.clear()
+        self.enabled = enabled
+
+
+    # PUBLIC METHODS
+    def commit(self):
+        """
+        Ends the current frame, adding its counts to the ring buffer.
+        """
+        if not self._enabled:
+            return
+        self._buffer.append((self._current,self._gccount,self._gctime))
+        for key in self._current:
+            self._totals[key] = self._totals.get(key,0)+self._current[key]
+        if len(self._buffer) > self._capacity:
+            old = self._buffer.popleft()[0]
+            for key in old:
+                self._totals[key] -= old[key]
+                if not self._totals[key]:
+                    del self._totals[key]
+        self._current = {}
+        self._gccount = 0
+        self._gctime  = 0.0
+        self._frames += 1
+
+    def clear(self):
+        """
+        Empties the ring buffer.
+        """
+        self._buffer = collections.deque()
+        self._totals = {}
+        self._frames = 0
+        self._current = {}
+        self._gccount = 0
+        self._gctime  = 0.0
+
+    def rates(self):
+        """
+        Returns the number of objects made per frame, for each maker and kind of object.
+
+        The rates are averages over the frames in the ring buffer.
+
+        :return: a list of (maker, kind, rate), from the highest rate to the lowest
+        :rtype:  ``list`` of ``tuple``
+        """
+        count = max(len(self._buffer),1)
+        result = [(maker,kind,total/count) for ((maker,kind),total) in self._totals.items()]
+        result.sort(key=lambda row: (-row[2],row[0],row[1]))
+        return result
+
+    def total(self):
+        """
+        Returns the number of objects made per frame by the whole game.
+
+        :return: the average over the frames in the ring buffer
+        :rtype:  ``float``
+        """
+        return sum(self._totals.values())/max(len(self._buffer),1)
+
+    def collections(self):
+        """
+        Returns the garbage collections per frame, and the time they take per frame.
+
+        :return: the average number of collections and milliseconds over the frames in
+            the ring buffer
+        :rtype:  ``tuple`` of two ``float``
+        """
+        count = max(len(self._buffer),1)
+        number = sum(frame[1] for frame in self._buffer)
+        millis = sum(frame[2] for frame in self._buffer)*1000.0
+        return (number/count,millis/count)
+
+    def save(self,filename):
+        """
+        Saves the rates to a CSV file.
+
+        The file has one row per maker and kind of object, in the order of :meth:`rates`,
+        with the number made per frame and in all of the frames in the ring buffer.
+
+        :param filename: the file to write
+        :type filename:  ``str``
+        """
+        import csv
+        count = max(len(self._buffer),1)
+        with open(filename,'w',newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['maker','kind','per_frame','total'])
+            for maker, kind, rate in self.rates():
+                writer.writerow([maker,kind,'%.4f' % rate,round(rate*count)])
+
+    def draw(self,view,right):
+        """
+        Draws the overlay of allocation rates to the given view, if it is :attr:`visible`.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+
+        :param right: the right edge of the overlay
+        :type right:  ``int`` or ``float``
+        """
+        if not self._visible:
+            return
+        self._paused = True
+        if self._label is None:
+            self._label = GLabel(text=' ',font_name=GAllocTracker.OVERLAY_FONT,font_size=13,
+                                 right=right,bottom=10,linecolor=[0,1,1,1],fillcolor=[0,0,0,0.7])
+        if self._shown is None or self._frames-self._shown >= GAllocTracker.OVERLAY_INTERVAL:
+            self._shown = self._frames
+            rows = self.rates()[:GAllocTracker.OVERLAY_ROWS]
+            width = max([len(row[0])+len(row[1])+4 for row in rows]+[15])
+            lines = ['%-*s %7s' % (width,'made by -> kind','/frame')]
+            for maker, kind, rate in rows:
+                lines.append('%-*s %7.2f' % (width,maker+' -> '+kind,rate))
+            lines.append('%-*s %7.2f' % (width,'all objects',self.total()))
+            number, millis = self.collections()
+            lines.append('%-*s %7.3f' % (width,'gc collections',number))
+            lines.append('%-*s %7.3f' % (width,'gc ms',millis))
+            self._label.text = '\n'.join(lines)
+            self._label.right = right
+        self._label.draw(view)
+        self._paused = False
+
+
+    # HIDDEN METHODS
+    def _watch(self,frame,event,arg):
+        """
+        Counts the object made by a call to ``__init__``.
+
+        This method is the profile function (see ``sys.setprofile``) while the tracker
+        is enabled.  Only the outermost ``__init__`` of an object counts, so an object
+        whose initializer calls the one of its parent class is counted once.
+
+        :param frame: the frame of the function called
+        :type frame:  ``frame``
+
+        :param event: the profile event
+        :type event:  ``str``
+
+        :param arg: the value of the event
+        :type arg:  any
+        """
+        if event != 'call' or self._paused:
+            return
+        code = frame.f_code
+        if code.co_name != '__init__' or not code.co_argcount:
+            return
+        this = frame.f_locals.get(code.co_varnames[0])
+        kind = type(this)
+        if getattr(kind.__init__,'__code__',None) is not code:
+            return
+        key = (self._maker(frame.f_back),kind.__name__)
+        self._current[key] = self._current.get(key,0)+1
+
+    def _rebuilt(self,maker,count):
+        """
+        Counts the instructions put in a drawing cache when it was rebuilt.
+
+        This method is called by :class:`GObject` while the tracker is enabled.
+
+        :param maker: the name of the class of the object rebuilt
+        :type maker:  ``str``
+
+        :param count: the number of instructions in the new cache
+        :type count:  ``int`` >= 0
+        """
+        if self._paused or not count:
+            return
+        key = (maker,'instructions')
+        self._current[key] = self._current.get(key,0)+count
+
+    def _maker(self,frame):
+        """
+        Returns the name of the maker of an object, starting from the frame that made it.
+
+        The maker is the class of the first method of the game in the stack, or the
+        module if that function is not a method.
+
+        :param frame: the frame that called ``__init__``
+        :type frame:  ``frame`` or None
+        """
+        while not frame is None:
+            code = frame.f_code
+            if not code in self._codes:
+                self._codes[code] = code.co_filename.startswith(self._roots)
+            if self._codes[code]:
+                if code.co_argcount and code.co_varnames[0] in ('self','cls'):
+                    this = frame.f_locals.get(code.co_varnames[0])
+                    if not this is None:
+                        return this.__name__ if isinstance(this,type) else type(this).__name__
+                return os.path.splitext(os.path.basename(code.co_filename))[0]
+            frame = frame.f_back
+        return 'other'
+
+    def _collect(self,phase,info):
+        """
+        Counts a garbage collection, and the time it takes.
+
+        This method is a callback for ``gc.callbacks``.
+
+        :param phase: whether the collection is starting or stopping
+        :type phase:  ``str``
+
+        :param info: information about the collection
+        :type info:   ``dict``
+        """
+        if phase == 'start':
+            self._gcstart = time.perf_counter()
+        elif not self._gcstart is None:
+            self._gccount += 1
+            self._gctime  += time.perf_counter()-self._gcstart
+            self._gcstart = None
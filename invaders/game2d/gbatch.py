@@ -0,0 +1,557 @@
+"""
+Texture atlas and sprite batch support for 2D game support.
+
+This module provides support for drawing many images at once.  The images in the
+**Images** folder are packed into a single texture, the :class:`TextureAtlas`.  A
+:class:`GSpriteBatch` then draws any number of copies of those images with a single
+Kivy ``Mesh``, instead of one ``Rectangle`` (and one matrix push and pop) per image.
+"""
+# Lower-level kivy modules to support animation
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .app import GameApp
+import numpy as np
+
+
+# Each sprite is a quad: the offsets of its corners from the center...
+_CORNERS = np.array([[-0.5,-0.5],[0.5,-0.5],[0.5,0.5],[-0.5,0.5]],dtype=np.float32)
+# ...which corner of the atlas region goes with each one (as columns of u0,v0,u1,v1)...
+_UCOLUMNS = np.array([0,2,2,0])
+_VCOLUMNS = np.array([1,1,3,3])
+# ...and the two triangles that make it up
+_TRIANGLES = np.array([0,1,2,2,3,0],dtype=np.uint16)
+
+# Indices are unsigned shorts, so a mesh can have at most 65536 vertices
+MESH_SPRITES = 16384
+# The triangles of every sprite in a full mesh
+_INDICES = np.ravel(np.arange(MESH_SPRITES,dtype=np.uint16).reshape(-1,1)*4+_TRIANGLES)
+
+
+def _load_pixels(path):
+    """
+    Returns the pixels of an image file as an array, or None if it cannot be read
+
+    The array has shape (height, width, 4) and type ``uint8``, with the rows in
+    top-to-bottom order and the channels as r, g, b, a.  Reading the file does not
+    need a graphics window.
+
+    :param path: The path to the image file
+    :type path:  ``str``
+    """
+    from kivy.core.image import ImageLoader
+    try:
+        data = ImageLoader.load(path)._data[0]
+    except:
+        return None
+
+    fmt = data.fmt
+    if not fmt in ('rgba','bgra','rgb','bgr'):
+        return None
+    channels = len(fmt)
+    rowlength = data.rowlength if data.rowlength else data.width*channels
+    raw = np.frombuffer(data.data,dtype=np.uint8)
+    raw = raw[:rowlength*data.height].reshape(data.height,rowlength)
+    raw = raw[:,:data.width*channels].reshape(data.height,data.width,channels)
+
+    pixels = np.full((data.height,data.width,4),255,dtype=np.uint8)
+    if fmt[0] == 'b':
+        pixels[:,:,0:3] = raw[:,:,2::-1]
+    else:
+        pixels[:,:,0:3] = raw[:,:,0:3]
+    if channels == 4:
+        pixels[:,:,3] = raw[:,:,3]
+    if not data.flip_vertical:
+        pixels = pixels[::-1]
+    return pixels
+
+
+def _shrink(pixels, maxsize):
+    """
+    Returns the pixels shrunk by a whole factor so that neither side exceeds maxsize
+
+    Each new pixel is the average of a square block of old pixels.  If the image already
+    fits, the pixels are returned unchanged.
+
+    :param pixels: The image pixels
+    :type pixels:  array of shape (height, width, 4)
+
+    :param maxsize: The maximum width and height
+    :type maxsize:  ``int`` > 0
+    """
+    height, width = pixels.shape[0:2]
+    factor = -(-max(width,height)//maxsize)
+    if factor <= 1:
+        return pixels
+    height = height//factor
+    width  = width//factor
+    blocks = pixels[:height*factor,:width*factor].reshape(height,factor,width,factor,4)
+    return blocks.mean(axis=(1,3)).astype(np.uint8)
+
+
+# #mark -
+
+class TextureAtlas(object):
+    """
+    A class representing a set of images packed into a single texture.
+
+    Every image in the atlas is a named *region*: a rectangle of the texture.  Regions
+    are identified by number, which you get with the method :meth:`index`.  Each image
+    file is a region named after the file.
+
+    The atlas is packed when it is created, which does not need a graphics window.  The
+    Kivy texture is only made the first time you access the attribute :attr:`texture`.
+
+    Images larger than ``maxsize`` on a side are shrunk to fit when they are packed.
+    This only matters for images that are drawn much smaller than their file, which is
+    the only sensible way to draw them in a game anyway.
+
+    You should rarely need to make an atlas yourself.  :class:`GSpriteBatch` uses the
+    atlas of the **Images** folder, provided by ``GameApp.load_atlas()``.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def width(self):
+        """
+        The width of the atlas texture in pixels.
+
+        **invariant**: Value is a power of two (``int``)
+        """
+        return self._pixels.shape[1]
+
+    @property
+    def height(self):
+        """
+        The height of the atlas texture in pixels.
+
+        **invariant**: Value is a power of two (``int``)
+        """
+        return self._pixels.shape[0]
+
+    @property
+    def names(self):
+        """
+        The names of the regions, in order of their index.
+
+        **invariant**: Value is a tuple of ``str``
+        """
+        return tuple(self._names)
+
+    @property
+    def uvs(self):
+        """
+        The texture coordinates of each region.
+
+        Row i is (u0, v0, u1, v1) for the region with index i, where (u0,v0) is the
+        bottom left corner and (u1,v1) is the top right corner.  Do not modify this array.
+
+        **invariant**: Value is a NumPy array of shape (len(names), 4)
+        """
+        return self._uvs
+
+    @property
+    def texture(self):
+        """
+        The Kivy texture for this atlas.
+
+        The texture is made the first time that this attribute is accessed.  This
+        requires a graphics window.
+
+        **invariant**: Value is a Kivy ``Texture``
+        """
+        if self._texture is None:
+            from kivy.graphics.texture import Texture
+            texture = Texture.create(size=(self.width,self.height),colorfmt='rgba')
+            texture.blit_buffer(self._pixels.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+            self._texture = texture
+            GObject._count_texture()
+        return self._texture
+
+
+    # BUILT-IN METHODS
+    def __init__(self,folder,maxsize=256,padding=1):
+        """
+        Creates a new atlas from the images in the given folder.
+
+        Files that are not images that Kivy can read are skipped.
+
+        :param folder: The path to the folder of images
+        :type folder:  ``str``
+
+        :param maxsize: The largest width or height of an image in the atlas
+        :type maxsize:  ``int`` > 0
+
+        :param padding: The number of empty pixels between images
+        :type padding:  ``int`` >= 0
+        """
+        import os
+        images = []
+        for name in sorted(os.listdir(folder)):
+            pixels = _load_pixels(os.path.join(folder,name))
+            if not pixels is None:
+                images.append((name,_shrink(pixels,maxsize)))
+        self._pack(images,padding)
+        self._texture = None
+
+    def __contains__(self,name):
+        """
+        :return: True if ``name`` is a region in this atlas.
+        :rtype:  ``bool``
+        """
+        return name in self._index
+
+
+    # PUBLIC METHODS
+    def index(self,name):
+        """
+        Returns the index of the region with the given name.
+
+        :param name: The name of the region
+        :type name:  ``str``
+
+        :return: The region index
+        :rtype:  ``int``
+        """
+        assert name in self._index, '%s is not in this atlas' % repr(name)
+        return self._index[name]
+
+    def region(self,name):
+        """
+        Returns the rectangle of the texture for the region with the given name.
+
+        :param name: The name of the region
+        :type name:  ``str``
+
+        :return: The region as (x, y, width, height), in pixels from the bottom left
+        :rtype:  ``tuple``
+        """
+        return self._rects[self.index(name)]
+
+    def add_region(self,name,parent,x,y,width,height):
+        """
+        Adds a new region that is part of another region.
+
+        This is how you refer to the frames of a sprite sheet (see :class:`GSprite`).
+        The position is relative to the bottom left corner of the parent region.
+
+        :param name: The name of the new region
+        :type name:  ``str``
+
+        :param parent: The name of the region that contains it
+        :type parent:  ``str``
+
+        :param x: The left edge of the new region, in pixels
+        :type x:  ``int`` >= 0
+
+        :param y: The bottom edge of the new region, in pixels
+        :type y:  ``int`` >= 0
+
+        :param width: The width of the new region, in pixels
+        :type width:  ``int`` > 0
+
+        :param height: The height of the new region, in pixels
+        :type height:  ``int`` > 0
+
+        :return: The index of the new region
+        :rtype:  ``int``
+        """
+        px, py, pw, ph = self.region(parent)
+        assert 0 <= x and x+width <= pw and 0 <= y and y+height <= ph, \
+            'region is outside of %s' % repr(parent)
+        if name in self._index:
+            return self._index[name]
+        self._add(name,px+x,py+y,width,height)
+        return self._index[name]
+
+
+    def frames(self,name,format):
+        """
+        Returns the region indices of the frames of a filmstrip.
+
+        The filmstrip is divided into frames as in :class:`GSprite`, and the frames are
+        returned left-to-right, top-to-bottom.  The frame regions are added to the atlas
+        the first time that this method is called, and reused after that.
+
+        :param name: The name of the filmstrip region
+        :type name:  ``str``
+
+        :param format: The filmstrip grid size as (rows, columns)
+        :type format:  2-element tuple of ints > 0
+
+        :return: The index of each frame
+        :rtype:  ``tuple`` of ``int``
+        """
+        rows, columns = format
+        x, y, width, height = self.region(name)
+        width  = width//columns
+        height = height//rows
+        result = []
+        for row in range(rows):
+            for col in range(columns):
+                key = '%s[%d,%d,%d]' % (name,rows,columns,row*columns+col)
+                top = (rows-row-1)*height
+                result.append(self.add_region(key,name,col*width,top,width,height))
+        return tuple(result)
+
+
+    # HIDDEN METHODS
+    def _pack(self,images,padding):
+        """
+        Packs the images into the smallest square power-of-two texture that fits them.
+
+        The images are placed on shelves, tallest first.
+
+        :param images: The images to pack
+        :type images:  list of (name, pixel array) pairs
+
+        :param padding: The number of empty pixels between images
+        :type padding:  ``int`` >= 0
+        """
+        order = sorted(images,key=lambda item: -item[1].shape[0])
+        widest = max([item[1].shape[1] for item in images]+[1])
+        size = 64
+        while size < widest+padding:
+            size *= 2
+
+        while True:
+            places = []
+            x = y = shelf = 0
+            for name, pixels in order:
+                h, w = pixels.shape[0:2]
+                if x+w+padding > size:
+                    x = 0
+                    y += shelf
+                    shelf = 0
+                places.append((name,pixels,x,y))
+                x += w+padding
+                shelf = max(shelf,h+padding)
+            if y+shelf <= size:
+                break
+            size *= 2
+
+        # Rows of the array are bottom to top, like texture coordinates
+        self._pixels = np.zeros((size,size,4),dtype=np.uint8)
+        self._names = []
+        self._index = {}
+        self._rects = []
+        self._table = np.zeros((len(places),4))
+        self._uvs = self._table[:0]
+        for name, pixels, x, y in places:
+            h, w = pixels.shape[0:2]
+            self._pixels[y:y+h,x:x+w] = pixels[::-1]
+        for name, pixels, x, y in sorted(places):
+            self._add(name,x,y,pixels.shape[1],pixels.shape[0])
+
+    def _add(self,name,x,y,width,height):
+        """
+        Records a region of the texture.
+
+        :param name: The name of the region
+        :type name:  ``str``
+
+        :param x: The left edge of the region in the texture
+        :type x:  ``int`` >= 0
+
+        :param y: The bottom edge of the region in the texture
+        :type y:  ``int`` >= 0
+
+        :param width: The width of the region
+        :type width:  ``int`` > 0
+
+        :param height: The height of the region
+        :type height:  ``int`` > 0
+        """
+        size = float(self._pixels.shape[0])
+        n = len(self._names)
+        if n == len(self._table):
+            # Grow the table geometrically, so adding n regions copies O(n) rows
+            table = np.zeros((max(2*n,16),4))
+            table[:n] = self._table
+            self._table = table
+        self._table[n] = [x/size, y/size, (x+width)/size, (y+height)/size]
+        self._uvs = self._table[:n+1]
+        self._index[name] = n
+        self._names.append(name)
+        self._rects.append((x,y,width,height))
+
+
+# #mark -
+
+class GSpriteBatch(GObject):
+    """
+    A class representing many images from a texture atlas, drawn all at once.
+
+    The images in a batch are not :class:`GObject` objects.  They are *sprites*: rows
+    in NumPy arrays that give the atlas region, center, and size of each image.  You
+    give these arrays to the batch with the method :meth:`set_sprites` whenever they
+    change.  All of the sprites are drawn with a single Kivy ``Mesh`` (or one mesh
+    per 16384 sprites), so a hundred sprites cost about as much to draw as one.
+
+    The sprite coordinates are relative to the attributes ``x`` and ``y`` of the batch,
+    so you can move every sprite at once by moving the batch.  If ``fillcolor`` is set,
+    it tints every sprite, as in :class:`GImage`.  The attributes ``width`` and
+    ``height`` are ignored.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def atlas(self):
+        """
+        The texture atlas with the images of the sprites.
+
+        **invariant**: Value is a :class:`TextureAtlas`
+        """
+        return self._atlas
+
+    @property
+    def count(self):
+        """
+        The number of sprites drawn.
+
+        **invariant**: Value must be an ``int`` >= 0
+        """
+        return self._count
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty sprite batch.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  This class supports the
+        same keywords as :class:`GObject`, as well as the keyword ``atlas``.  If there
+        is no atlas, the batch uses the atlas of the **Images** folder.  Use
+        :meth:`set_sprites` to add the sprites.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._atlas = keywords['atlas'] if 'atlas' in keywords else GameApp.load_atlas()
+        self._count = 0
+        self._vertices = np.zeros((0,4,4),dtype=np.float32)
+        self._meshes = []
+        self._staged = False
+        GObject.__init__(self,**keywords)
+        self._invalidate()
+        self._defined = True
+
+
+    # PUBLIC METHODS
+    def set_sprites(self,regions,x,y,width,height):
+        """
+        Sets the sprites to draw.
+
+        All of the arrays must have the same length n, one entry per sprite.  The
+        sprites are drawn in order, so later sprites are drawn on top of earlier ones.
+        The arrays are copied, so you may change them after this call.
+
+        :param regions: the atlas region index of each sprite (see :meth:`TextureAtlas.index`)
+        :type regions:  1-d NumPy array of ints
+
+        :param x: the horizontal coordinates of the sprite centers
+        :type x:  1-d NumPy array of floats
+
+        :param y: the vertical coordinates of the sprite centers
+        :type y:  1-d NumPy array of floats
+
+        :param width: the width of each sprite (or a single number for all of them)
+        :type width:  1-d NumPy array of floats, or ``int`` or ``float``
+
+        :param height: the height of each sprite (or a single number for all of them)
+        :type height:  1-d NumPy array of floats, or ``int`` or ``float``
+        """
+        n = len(regions)
+        assert len(x) == n and len(y) == n, 'the sprite arrays have different lengths'
+
+        # Build every vertex at once: (x, y, u, v) at four corners
+        w = np.reshape(np.broadcast_to(width,(n,)),(n,1))
+        h = np.reshape(np.broadcast_to(height,(n,)),(n,1))
+        uvs = self._atlas.uvs[regions]
+        vertices = np.empty((n,4,4),dtype=np.float32)
+        vertices[:,:,0] = np.reshape(x,(n,1)) + w*_CORNERS[:,0]
+        vertices[:,:,1] = np.reshape(y,(n,1)) + h*_CORNERS[:,1]
+        vertices[:,:,2] = uvs[:,_UCOLUMNS]
+        vertices[:,:,3] = uvs[:,_VCOLUMNS]
+        self._vertices = vertices
+        self._count = n
+        self._stage()
+
+    def set_regions(self,regions):
+        """
+        Changes the atlas region of every sprite, without moving them.
+
+        This is how you animate a batch: the sprites keep their positions and sizes,
+        and only their texture coordinates are rewritten (in place).
+
+        :param regions: the atlas region index of each sprite (see :meth:`TextureAtlas.index`)
+        :type regions:  1-d NumPy array of ints, with one entry per sprite
+        """
+        assert len(regions) == self._count, '%s does not have %d regions' % (repr(regions),self._count)
+        uvs = self._atlas.uvs[regions]
+        self._vertices[:,:,2] = uvs[:,_UCOLUMNS]
+        self._vertices[:,:,3] = uvs[:,_VCOLUMNS]
+        self._stage()
+
+
+    # HIDDEN METHODS
+    def _stage(self):
+        """
+        Marks the meshes as out of date.
+
+        The vertices are not copied into the meshes until the batch is drawn, or until
+        the view shows the next frame (if it is attached or the child of a scene).
+        """
+        self._staged = True
+        GObject.DIRTY.add(self)
+
+    def _validate(self):
+        """
+        Rebuilds the drawing cache and updates the meshes if they are out of date.
+        """
+        GObject._validate(self)
+        if self._staged:
+            self._staged = False
+            GObject.DIRTY.discard(self)
+            self._upload()
+
+    def _upload(self):
+        """
+        Copies the sprite vertices into the meshes, adding or removing meshes as needed.
+        """
+        vertices = self._vertices
+        n = len(vertices)
+        chunks = (n+MESH_SPRITES-1)//MESH_SPRITES
+        while len(self._meshes) < chunks:
+            mesh = Mesh(mode='triangles',texture=self._atlas.texture)
+            self._meshes.append(mesh)
+            self._group.add(mesh)
+        while len(self._meshes) > max(chunks,1):
+            self._group.remove(self._meshes.pop())
+
+        for i in range(chunks):
+            part = vertices[i*MESH_SPRITES:(i+1)*MESH_SPRITES]
+            self._meshes[i].vertices = np.ravel(part)
+            self._meshes[i].indices = _INDICES[:6*len(part)]
+        if chunks == 0 and self._meshes:
+            # Kivy cannot take an empty buffer
+            self._meshes[0].vertices = []
+            self._meshes[0].indices = []
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        # Meshes must be added to a group (not inserted) to bind their texture
+        self._group = InstructionGroup()
+        for mesh in self._meshes:
+            self._group.add(mesh)
+        self._cache.add(self._group)
+        self._cache.add(PopMatrix())
@@ -0,0 +1,123 @@
+"""
+Cached layers for 2D game support.
+
+This module provides support for shapes that rarely change, like a background, a
+border, or a row of icons.  Instead of drawing each shape every animation frame, the
+shapes are drawn once into an offscreen texture (a Kivy ``Fbo``), and that texture is
+drawn as a single rectangle.
+"""
+# Lower-level kivy modules to support animation
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject, is_gobject_list
+
+
+class GLayer(GObject):
+    """
+    A class representing a group of shapes cached in an offscreen texture.
+
+    Like :class:`GScene`, a layer is a collection of :class:`GObject` objects.  But the
+    children of a layer are not drawn every animation frame.  They are drawn once into
+    a texture the size of the layer, and the layer draws that texture.  So a layer
+    costs the same to draw no matter how many shapes are in it.
+
+    The texture is drawn again whenever the layer is *invalidated*.  This happens when
+    you change ``children`` or the size of the layer.  It also happens when you change
+    one of the children (such as its color or position), since Kivy redraws an offscreen
+    texture whenever its drawing commands change.  So a layer is only a savings if its
+    children change much less often than once a frame.
+
+    The children are positioned in the coordinates of the layer, with (0,0) at the
+    bottom left corner.  So a layer centered in the window, the size of the window,
+    uses the same coordinates as the window.  If ``fillcolor`` is set, it tints the
+    layer, as in :class:`GImage`.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def children(self):
+        """
+        The list of objects stored in this layer.
+
+        The objects are drawn in layer coordinates, with (0,0) at the bottom left corner.
+        A shape may only be the child of one layer (or scene), and should not be drawn
+        on its own.
+
+        **invariant**: Value must be a list or tuple of :class:`GObject` (possibly empty)
+        """
+        return tuple(self._children)
+
+    @children.setter
+    def children(self,value):
+        assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
+        self._children = list(value)
+        if self._defined:
+            self._invalidate()
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new cached layer.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to cache
+        shapes rect and line in a layer the size of an 800x700 window, use::
+
+            GLayer(x=400,y=350,width=800,height=700,children=[rect,line])
+
+        This class supports the same keywords as :class:`GObject`, as well as the
+        attribute ``children``.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self.children = keywords['children'] if 'children' in keywords else []
+        self._fbo = None
+        GObject.__init__(self,**keywords)
+        self._invalidate()
+        self._defined = True
+
+
+    # PUBLIC METHODS
+    def refresh(self):
+        """
+        Forces the layer to draw its children again.
+
+        Changes to the children are noticed on their own, so you only need this method
+        if you change the contents of a child that is not a :class:`GObject` attribute,
+        like the pixels of its texture.
+        """
+        self._invalidate()
+
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+
+        The children are drawn into the offscreen texture, and the texture is drawn as
+        a single rectangle.
+        """
+        GObject._reset(self)
+        size = (max(int(round(self.width)),1),max(int(round(self.height)),1))
+        if self._fbo is None or tuple(self._fbo.size) != size:
+            self._fbo = Fbo(size=size)
+            GObject._count_texture()
+
+        self._fbo.clear()
+        self._fbo.add(ClearColor(0,0,0,0))
+        self._fbo.add(ClearBuffers())
+        for child in self._children:
+            child._validate()
+            self._fbo.add(child._cache)
+
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(self._fbo)
+        self._cache.add(Rectangle(pos=(-self.width/2.0,-self.height/2.0),
+                                  size=(self.width,self.height),texture=self._fbo.texture))
+        self._cache.add(PopMatrix())
@@ -10,7 +10,9 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from introcs.geom import Point2, Matrix
+from introcs.geom import Point2
+from .gaffine import GAffine
+import weakref
 
 def is_color(c):
     """
@@ -71,7 +73,7 @@ def is_gobject_list(g):
     """
     try:
         from functools import reduce
-        return len(g) >= 0 and reduce(lambda x, y: x and y, map(lambda z: isinstance(z,GObject), g))
+        return len(g) >= 0 and reduce(lambda x, y: x and y, map(lambda z: isinstance(z,GObject), g), True)
     except:
         return False
 
@@ -88,7 +90,23 @@ class GObject(object):
     You should never make a `GObject` directly.  Instead, you should use one of the
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`,
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
+
+    Changing an attribute that affects how an object looks (such as its size or color)
+    does not rebuild its drawing commands right away.  The object is only marked as
+    changed, and the commands are rebuilt once, the next time it is drawn.  So setting
+    several attributes in a row costs no more than setting one.  Position and angle
+    never require a rebuild.
     """
+    # Class attribute for tracking the objects with out-of-date drawing caches
+    DIRTY = weakref.WeakSet()
+    # Class attributes counting the caches rebuilt, the instructions put in them, and
+    # the textures made, since the view last took the counts (see GView.stats)
+    RESETS = 0
+    REBUILT = 0
+    TEXTURES = 0
+    # Class attribute for the allocation tracker counting rebuilt instructions, if any
+    # (see GAllocTracker)
+    TRACKER = None
 
     # MUTABLE PROPERTIES
     @property
@@ -138,7 +156,7 @@ class GObject(object):
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
         if self._defined:
-            self._reset()
+            self._invalidate()
 
     @property
     def height(self):
@@ -157,7 +175,7 @@ class GObject(object):
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
         if self._defined:
-            self._reset()
+            self._invalidate()
 
     @property
     def scale(self):
@@ -202,12 +220,9 @@ class GObject(object):
 
     @angle.setter
     def angle(self,value):
-        import numpy as np
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = np.allclose([self._rotate.angle],[value])
         self._rotate.angle = float(value)
-        if not diff:
-            self._mtrue = False
+        self._mtrue = False
 
     @property
     def linecolor(self):
@@ -244,7 +259,7 @@ class GObject(object):
 
         self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
         if self._defined:
-            self._reset()
+            self._invalidate()
 
     @property
     def fillcolor(self):
@@ -282,7 +297,7 @@ class GObject(object):
 
         self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
         if self._defined:
-            self._reset()
+            self._invalidate()
 
     @property
     def name(self):
@@ -314,18 +329,12 @@ class GObject(object):
         Changing this value will shift the center of the object so that the left
         edge matches the new value.
 
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-
         **invariant**: Value must be an ``int`` or ``float``.
         """
         if self._rotate.angle == 0.0:
             return self.x-self.width/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
+        return self.x-self.matrix.radius_x(self.width,self.height)
 
     @left.setter
     def left(self,value):
@@ -344,18 +353,12 @@ class GObject(object):
         Changing this value will shift the center of the object so that the right
         edge matches the new value.
 
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-
         **invariant**: Value must be an ``int`` or ``float``.
         """
         if self._rotate.angle == 0.0:
             return self.x+self.width/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
+        return self.x+self.matrix.radius_x(self.width,self.height)
 
     @right.setter
     def right(self,value):
@@ -374,18 +377,12 @@ class GObject(object):
         Changing this value will shift the center of the object so that the top
         edge matches the new value.
 
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-
         **invariant**: Value must be an ``int`` or ``float``.
         """
         if self._rotate.angle == 0.0:
             return self.y+self.height/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
+        return self.y+self.matrix.radius_y(self.width,self.height)
 
     @top.setter
     def top(self,value):
@@ -405,18 +402,12 @@ class GObject(object):
         Changing this value will shift the center of the object so that the bottom
         edge matches the new value.
 
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-
         **invariant**: Value must be an ``int`` or ``float``.
         """
         if self._rotate.angle == 0.0:
             return self.y-self.height/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
+        return self.y-self.matrix.radius_y(self.width,self.height)
 
 
     @bottom.setter
@@ -432,12 +423,12 @@ class GObject(object):
         """
         The transformation matrix for this object
 
-        This value is constructed dynamically as needed.  It should only be used
-        internally in this package
+        This value is updated in place as needed, so it is the same object for the
+        life of this shape.  It should only be used internally in this package
 
-        **invariant**: Either a :class:`Matrix` or ``None``
+        **invariant**: Value is a :class:`GAffine`
         """
-        if not self._mtrue or self._matrix is None:
+        if not self._mtrue:
             self._build_matrix()
         return self._matrix
 
@@ -446,14 +437,13 @@ class GObject(object):
         """
         The inverse transformation matrix for this object
 
-        This value is constructed dynamically as needed.  It should only be used
-        internally in this package
+        This value is updated in place as needed, and is only recomputed after the
+        position, angle or scale changes.  It should only be used internally in this
+        package
 
-        **invariant**: Either a :class:`Matrix` or ``None``
+        **invariant**: Value is a :class:`GAffine`
         """
-        if not self._mtrue or self._matrix is None:
-            self._build_matrix()
-        return self._invrse
+        return self.matrix.inverse
 
 
     # BUILT-IN METHODS
@@ -480,10 +470,16 @@ class GObject(object):
         # Set the properties.
         self._defined = False
 
+        # The drawing cache keeps its identity for the life of the object
+        self._cache = InstructionGroup()
+        self._dirty = False
+
         # Create the Kivy transforms for position and size
         self._trans  = Translate(0,0,0)
         self._rotate = Rotate(angle=0,axis=(0,0,1))
         self._scale  = Scale(1,1,1)
+        self._matrix = GAffine()
+        self._mtrue  = False
 
         # Now update these with the keywords; size first
         try:
@@ -545,23 +541,97 @@ class GObject(object):
 
         By default, this method just checks the bounding box of the shape.
 
-        **Warning**: Using this method on a rotated object may slow down your framerate.
-
         :param point: the point to check
         :type point: :class:`Point2` or a pair of numbers
 
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        import numpy as np
         if isinstance(point,Point2):
             point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
 
-        if self._rotate.angle != 0.0:
-            point = self.matrix.inverse()._transform(point[0],point[1])
+        if self._rotate.angle == 0.0:
+            return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
+
+        p = self.inverse.transform(point[0],point[1])
+        return abs(p[0]) < self.width/2.0 and abs(p[1]) < self.height/2.0
+
+    def intersects(self,other):
+        """
+        Checks whether this shape overlaps another shape
 
-        return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
+        Both shapes are treated as their bounding boxes: the rectangle of size ``width``
+        by ``height`` centered at (``x``, ``y``).  The shapes overlap if the insides of
+        these rectangles overlap; shapes that only share an edge do not.  Rotation is
+        ignored.
+
+        This method is much faster than checking the corners of one shape with
+        :meth:`contains`, and it does not allocate anything.
+
+        :param other: the shape to check
+        :type other: :class:`GObject`
+
+        :return: True if the shapes overlap
+        :rtype:  ``bool``
+        """
+        assert isinstance(other,GObject), '%s is not a GObject' % repr(other)
+        return (abs(self.x-other.x)*2 < self.width+other.width and
+                abs(self.y-other.y)*2 < self.height+other.height)
+
+    def intersects_swept(self,other,dx,dy):
+        """
+        Checks whether this shape touched another shape while moving by (dx,dy)
+
+        This shape is where it is now, at the end of the move, and the other shape is
+        standing still.  This method checks the whole path of the move, not just where
+        it ended.  So a fast shape (like a laser bolt) cannot jump over another shape
+        between animation frames.  If ``dx`` and ``dy`` are both 0, this is the same as
+        :meth:`intersects`.
+
+        Like :meth:`intersects`, both shapes are treated as their bounding boxes, and
+        this method does not allocate anything.
+
+        :param other: the shape to check
+        :type other: :class:`GObject`
+
+        :param dx: the horizontal distance this shape moved
+        :type dx:  ``int`` or ``float``
+
+        :param dy: the vertical distance this shape moved
+        :type dy:  ``int`` or ``float``
+
+        :return: True if the shape touched other at some point of the move
+        :rtype:  ``bool``
+        """
+        assert isinstance(other,GObject), '%s is not a GObject' % repr(other)
+        assert type(dx) in [int,float] and type(dy) in [int,float], \
+            '(%s,%s) is not a valid move' % (repr(dx),repr(dy))
+        hw = (self.width+other.width)/2.0
+        hh = (self.height+other.height)/2.0
+        px = self.x-dx-other.x
+        py = self.y-dy-other.y
+
+        # Clip the move [0,1] to the times it is inside the box on each axis
+        start = 0.0
+        end = 1.0
+        if dx == 0:
+            if abs(px) >= hw:
+                return False
+        else:
+            t0 = (-hw-px)/dx
+            t1 = (hw-px)/dx
+            start = max(start,min(t0,t1))
+            end = min(end,max(t0,t1))
+        if dy == 0:
+            if abs(py) >= hh:
+                return False
+        else:
+            t0 = (-hh-py)/dy
+            t1 = (hh-py)/dy
+            start = max(start,min(t0,t1))
+            end = min(end,max(t0,t1))
+        return start < end
 
     def transform(self,point):
         """
@@ -579,11 +649,10 @@ class GObject(object):
         :rtype:  :class:`Point2`
         """
         if isinstance(point,Point2):
-            return self.inverse.transform(point)
-        else:
-            assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-            p = self.inverse._transform(point[0],point[2])
-            return Point2(p[0],p[1])
+            point = (point.x,point.y)
+        assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+        p = self.inverse.transform(point[0],point[1])
+        return Point2(p[0],p[1])
 
     def draw(self, view):
         """
@@ -595,16 +664,97 @@ class GObject(object):
         :type view:  :class:`GView`
         """
         try:
-            view.draw(self._cache)
+            view._draw_shape(self)
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
+    def attach(self, view):
+        """
+        Attaches this shape to the provided view, so that it is drawn every frame.
+
+        An attached shape stays on screen, without calls to :meth:`draw`, until it is
+        detached.  Changing its position, size or color updates it in place.  See
+        :class:`GView` for how attached shapes are layered.
+
+        :param view: view to attach to
+        :type view:  :class:`GView`
+        """
+        view._attach_shape(self)
+
+    def detach(self, view):
+        """
+        Detaches this shape from the provided view.
+
+        Nothing happens if the shape is not attached.
+
+        :param view: view to detach from
+        :type view:  :class:`GView`
+        """
+        view._detach_shape(self)
+
     # HIDDEN METHODS
+    def _invalidate(self):
+        """
+        Marks the drawing cache as out of date.
+
+        The cache is not rebuilt until the object is drawn, or until the view shows
+        the next frame (for attached objects and the children of a scene).
+        """
+        if not self._dirty:
+            self._dirty = True
+            GObject.DIRTY.add(self)
+
+    def _validate(self):
+        """
+        Rebuilds the drawing cache if it is out of date.
+        """
+        if self._dirty:
+            self._dirty = False
+            GObject.DIRTY.discard(self)
+            self._reset()
+            GObject.RESETS += 1
+            GObject.REBUILT += len(self._cache.children)
+            if not GObject.TRACKER is None:
+                GObject.TRACKER._rebuilt(type(self).__name__,len(self._cache.children))
+
+    @classmethod
+    def _validate_all(cls):
+        """
+        Rebuilds the drawing cache of every object that is out of date.
+        """
+        while cls.DIRTY:
+            cls.DIRTY.pop()._validate()
+
+    @classmethod
+    def _count_texture(cls):
+        """
+        Counts a new texture, for the statistics of the view.
+        """
+        GObject.TEXTURES += 1
+
+    @classmethod
+    def _take_counts(cls):
+        """
+        Returns the caches rebuilt, instructions rebuilt and textures made since the
+        last call, and starts counting again from 0.
+
+        :return: the counts (resets, rebuilt, textures)
+        :rtype:  ``tuple`` of ``int``
+        """
+        counts = (GObject.RESETS,GObject.REBUILT,GObject.TEXTURES)
+        GObject.RESETS = 0
+        GObject.REBUILT = 0
+        GObject.TEXTURES = 0
+        return counts
+
     def _reset(self):
         """
         Resets the drawing cache.
+
+        The cache is refilled in place, so that any view or scene that holds it
+        shows the new contents.
         """
-        self._cache = InstructionGroup()
+        self._cache.clear()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
@@ -612,16 +762,12 @@ class GObject(object):
 
     def _build_matrix(self):
         """
-        Builds the transform matrices after a settings change.
+        Updates the transform matrix (in place) after a settings change.
+
+        The inverse is not computed until it is needed.
         """
-        self._matrix = Matrix()
-        self._matrix.translate(self._trans.x,self._trans.y)
-        self._matrix.rotate(self._rotate.angle)
-        self._matrix.scale(self._scale.x,self._scale.y)
-        self._invrse = Matrix()
-        self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
-        self._invrse.rotate(-self._rotate.angle)
-        self._invrse.translate(-self._trans.x,-self._trans.y)
+        self._matrix.set(self._trans.x,self._trans.y,self._rotate.angle,
+                         self._scale.x,self._scale.y)
         self._mtrue = True
 
 
@@ -662,7 +808,7 @@ class GScene(GObject):
         assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
         self._children = list(value)
         if self._defined:
-            self._reset()
+            self._invalidate()
 
 
     # IMMUTABLE PROPERTIES
@@ -721,7 +867,7 @@ class GScene(GObject):
         self._defined = False
         self.children = keywords['children'] if 'children' in keywords else []
         GObject.__init__(self,**keywords)
-        self._reset()
+        self._invalidate()
         self._defined = True
 
 
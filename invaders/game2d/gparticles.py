@@ -0,0 +1,211 @@
+"""
+Particle system drawables for 2D game support.
+
+This module provides support for drawing large numbers of small, round particles
+(sparks, smoke, and so on).  Instead of making a :class:`GEllipse` for each particle,
+the particles are stored in NumPy arrays and drawn together as a single mesh.
+"""
+# Lower-level kivy modules to support animation
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+import numpy as np
+
+
+# The default Kivy shader has no per-vertex color, so particles get their own
+_PARTICLE_VS = '''
+$HEADER$
+attribute vec4 vColor;
+void main(void) {
+    frag_color = vColor * color;
+    tex_coord0 = vTexCoords0;
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+'''
+
+_PARTICLE_FS = '''
+$HEADER$
+void main(void) {
+    if (dot(tex_coord0, tex_coord0) > 1.0) {
+        discard;
+    }
+    gl_FragColor = frag_color;
+}
+'''
+
+# Each particle is a quad: its corners (which are also its texture coordinates)...
+_CORNERS = np.array([[-1,-1],[1,-1],[1,1],[-1,1]],dtype=np.float32)
+# ...and the two triangles that make it up
+_TRIANGLES = np.array([0,1,2,2,3,0],dtype=np.uint16)
+
+# Indices are unsigned shorts, so a mesh can have at most 65536 vertices
+MESH_PARTICLES = 16384
+# The triangles of every particle in a full mesh
+_INDICES = np.ravel(np.arange(MESH_PARTICLES,dtype=np.uint16).reshape(-1,1)*4+_TRIANGLES)
+
+
+class GParticles(GObject):
+    """
+    A class representing a cloud of round particles.
+
+    The particles are not :class:`GObject` objects.  They are rows in NumPy arrays,
+    passed to this object with the method :meth:`set_particles` every time that they
+    move.  All of the particles are drawn as a single Kivy ``Mesh`` (or one mesh per
+    16384 particles), so drawing ten thousand particles costs about the same number
+    of instructions as drawing ten.
+
+    The particle coordinates are relative to the attributes ``x`` and ``y``, which
+    default to 0.  The attributes ``width``, ``height``, ``fillcolor`` and ``linecolor``
+    are ignored; the particles have their own colors.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def diameter(self):
+        """
+        The diameter of each particle.
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._diameter
+
+    @diameter.setter
+    def diameter(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value > 0, '%s is not positive' % repr(value)
+        self._diameter = float(value)
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of particles drawn.
+
+        **invariant**: Value must be an ``int`` >= 0
+        """
+        return self._count
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty particle system.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to create
+        a particle system for sparks 5 pixels wide, use::
+
+            GParticles(diameter=5)
+
+        This class supports the same keywords as :class:`GObject`, as well as the
+        attribute ``diameter`` (which defaults to 1).  Use :meth:`set_particles` to
+        add the particles.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self.diameter = keywords['diameter'] if 'diameter' in keywords else 1
+        self._count = 0
+        self._vertices = np.zeros((0,4,8),dtype=np.float32)
+        self._meshes = []
+        self._staged = False
+        GObject.__init__(self,**keywords)
+        self._invalidate()
+        self._defined = True
+
+
+    # PUBLIC METHODS
+    def set_particles(self,x,y,colors):
+        """
+        Sets the positions and colors of the particles to draw.
+
+        The arrays ``x`` and ``y`` are the particle centers, and must have the same
+        length n.  The array ``colors`` must have shape (n,4), with the r, g, b, and a
+        value of each particle as floats between 0 and 1.  The arrays are copied, so
+        you may change them after this call.
+
+        :param x: the horizontal coordinates of the particle centers
+        :type x:  1-d NumPy array of floats
+
+        :param y: the vertical coordinates of the particle centers
+        :type y:  1-d NumPy array of floats
+
+        :param colors: the particle colors
+        :type colors:  NumPy array of floats with shape (len(x),4)
+        """
+        n = len(x)
+        assert len(y) == n, '%s and %s have different lengths' % (repr(x),repr(y))
+        assert np.shape(colors) == (n,4), '%s is not an array of %d colors' % (repr(colors),n)
+
+        # Build every vertex at once: (x, y, u, v, r, g, b, a) at four corners
+        vertices = np.empty((n,4,8),dtype=np.float32)
+        radius = self._diameter/2.0
+        vertices[:,:,0] = np.reshape(x,(n,1)) + radius*_CORNERS[:,0]
+        vertices[:,:,1] = np.reshape(y,(n,1)) + radius*_CORNERS[:,1]
+        vertices[:,:,2:4] = _CORNERS
+        vertices[:,:,4:8] = np.reshape(colors,(n,1,4))
+        self._vertices = vertices
+        self._count = n
+        self._stage()
+
+
+    # HIDDEN METHODS
+    def _stage(self):
+        """
+        Marks the meshes as out of date.
+
+        The vertices are not copied into the meshes until the particles are drawn, or
+        until the view shows the next frame (if they are attached or in a scene).
+        """
+        self._staged = True
+        GObject.DIRTY.add(self)
+
+    def _validate(self):
+        """
+        Rebuilds the drawing cache and updates the meshes if they are out of date.
+        """
+        GObject._validate(self)
+        if self._staged:
+            self._staged = False
+            GObject.DIRTY.discard(self)
+            self._upload()
+
+    def _upload(self):
+        """
+        Copies the particle vertices into the meshes, adding or removing meshes as needed.
+        """
+        vertices = self._vertices
+        n = len(vertices)
+        chunks = (n+MESH_PARTICLES-1)//MESH_PARTICLES
+        while len(self._meshes) < chunks:
+            mesh = Mesh(fmt=[(b'vPosition',2,'float'),(b'vTexCoords0',2,'float'),
+                             (b'vColor',4,'float')],mode='triangles')
+            self._meshes.append(mesh)
+            self._context.add(mesh)
+        while len(self._meshes) > max(chunks,1):
+            self._context.remove(self._meshes.pop())
+
+        for i in range(chunks):
+            part = vertices[i*MESH_PARTICLES:(i+1)*MESH_PARTICLES]
+            self._meshes[i].vertices = np.ravel(part)
+            self._meshes[i].indices = _INDICES[:6*len(part)]
+        if chunks == 0 and self._meshes:
+            # Kivy cannot take an empty buffer
+            self._meshes[0].vertices = []
+            self._meshes[0].indices = []
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._context = RenderContext(use_parent_projection=True,use_parent_modelview=True)
+        self._context.shader.fs = _PARTICLE_FS
+        self._context.shader.vs = _PARTICLE_VS
+        self._context.add(Color(1,1,1,1))
+        for mesh in self._meshes:
+            self._context.add(mesh)
+        self._cache.add(self._context)
+        self._cache.add(PopMatrix())
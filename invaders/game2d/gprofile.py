@@ -0,0 +1,389 @@
+"""
+Frame profiling for 2D game support.
+
+This module provides a profiler that times the phases of each animation frame (such as
+updating and drawing the game) and keeps the last few hundred frames in ring buffers.
+It can also count things that happen in each frame, like the textures made.  The times
+and counts can be shown on top of the game, summarized as percentiles, or saved to a
+CSV file to see which part of the game a slow frame spent its time in.
+"""
+from .grectangle import GLabel
+import numpy as np
+import time
+
+
+# #mark -
+class GProfiler(object):
+    """
+    A class representing a profiler for the phases of an animation frame.
+
+    A phase is any named part of a frame.  You time a phase by calling :meth:`begin`
+    and :meth:`end` with its name around the code to time.  A phase may be timed more
+    than once in a frame (the times are added), or not at all (its time is 0).  Phases
+    may also be nested, in which case the time of the outer phase includes the time of
+    the phases inside of it.
+
+    A counter is any named number in a frame, added up with :meth:`count`.  A counter
+    that is not counted in a frame is 0 for that frame.
+
+    At the end of each frame, :meth:`commit` adds the time of every phase to its ring
+    buffer, along with the time of the whole frame (from the previous commit), and the
+    value of every counter to its own ring buffer.  Each ring buffer holds the last
+    :attr:`capacity` frames, so memory use does not grow the longer the game runs.
+
+    A :class:`GameApp` has a profiler in its ``profiler`` attribute, which times the
+    phases 'update', 'draw' and 'commit' (sending the frame to the window) on its own.
+    It also counts the drawing statistics of its view (see the attribute ``stats`` of
+    :class:`GView`) as counters, with names like 'view.groups'.
+    The profiler only times phases while it is :attr:`enabled`.  Otherwise
+    :meth:`begin`, :meth:`end`, :meth:`count` and :meth:`commit` do nothing, so a game
+    can leave its calls in place.
+    """
+    # The number of frames between updates of the overlay text
+    OVERLAY_INTERVAL = 30
+    # The font of the overlay (the fixed width font that comes with Kivy)
+    OVERLAY_FONT = 'data/fonts/RobotoMono-Regular.ttf'
+
+
+    # MUTABLE PROPERTIES
+    @property
+    def enabled(self):
+        """
+        Whether this profiler is timing phases.
+
+        **invariant**: Value is a bool
+        """
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        if value and not self._enabled:
+            self._starts.clear()
+            self._last = time.perf_counter()
+        self._enabled = value
+
+    @property
+    def visible(self):
+        """
+        Whether :meth:`draw` shows the overlay of phase times.
+
+        The overlay is a table in the bottom left corner of the view, with the mean,
+        median (p50) and 99th percentile (p99) of each phase over the frames in the ring
+        buffers, in milliseconds, followed by the same for each counter.  It is updated
+        every few frames, since rendering text is slow.
+
+        **invariant**: Value is a bool
+        """
+        return self._visible
+
+    @visible.setter
+    def visible(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._visible = value
+        self._shown = None
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The number of frames kept in each ring buffer.
+
+        **invariant**: Value is an int > 0
+        """
+        return self._capacity
+
+    @property
+    def frames(self):
+        """
+        The number of frames committed since this profiler was made (or cleared).
+
+        Only the last :attr:`capacity` of these are still in the ring buffers.
+
+        **invariant**: Value is an int >= 0
+        """
+        return self._frames
+
+    @property
+    def phases(self):
+        """
+        The names of the phases timed so far, in the order they first began.
+
+        The name 'frame' is the whole frame, and is always first.
+
+        **invariant**: Value is a tuple of strings
+        """
+        return tuple(self._phases)
+
+    @property
+    def counters(self):
+        """
+        The names of the counters counted so far, in the order they were first counted.
+
+        **invariant**: Value is a tuple of strings
+        """
+        return tuple(self._counters)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,capacity=600,enabled=False):
+        """
+        Creates a new profiler with empty ring buffers.
+
+        :param capacity: the number of frames to keep in each ring buffer
+        :type capacity:  ``int`` > 0
+
+        :param enabled: whether to start timing phases right away
+        :type enabled:  ``bool``
+        """
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        self._capacity = capacity
+        self._enabled = False
+        self._visible = False
+        self._starts  = {}
+        self._current = {}
+        self._counts  = {}
+        self._label = None
+        self._shown = None
+        self.clear()
+        self.enabled = enabled
+
+
+    # PUBLIC METHODS
+    def begin(self,phase):
+        """
+        Starts timing the given phase.
+
+        :param phase: the name of the phase
+        :type phase:  ``str``
+        """
+        if self._enabled:
+            if not phase in self._current:
+                # So that new phases are listed in the order they begin
+                self._current[phase] = 0.0
+            self._starts[phase] = time.perf_counter()
+
+    def end(self,phase):
+        """
+        Stops timing the given phase, adding the time to the current frame.
+
+        Nothing happens if :meth:`begin` was not called for this phase.
+
+        :param phase: the name of the phase
+        :type phase:  ``str``
+        """
+        if self._enabled and phase in self._starts:
+            elapsed = time.perf_counter()-self._starts.pop(phase)
+            self._current[phase] = self._current.get(phase,0.0)+elapsed
+
+    def count(self,counter,value=1):
+        """
+        Adds a value to a counter in the current frame.
+
+        :param counter: the name of the counter
+        :type counter:  ``str``
+
+        :param value: the amount to add
+        :type value:  ``int`` or ``float``
+        """
+        if self._enabled:
+            self._counts[counter] = self._counts.get(counter,0)+value
+
+    def commit(self):
+        """
+        Ends the current frame, adding the time of each phase to its ring buffer.
+
+        The time of the 'frame' phase is the time since the last commit (or since the
+        profiler was enabled or cleared, for the first frame).
+        """
+        if not self._enabled:
+            return
+        now = time.perf_counter()
+        self._current['frame'] = now-self._last
+        self._last = now
+
+        slot = self._frames % self._capacity
+        for phase in self._current:
+            if not phase in self._buffers:
+                self._buffers[phase] = np.zeros(self._capacity)
+                self._phases.append(phase)
+            self._buffers[phase][slot] = self._current[phase]*1000.0
+        for phase in self._phases:
+            if not phase in self._current:
+                self._buffers[phase][slot] = 0.0
+        for counter in self._counts:
+            if not counter in self._cbuffers:
+                self._cbuffers[counter] = np.zeros(self._capacity)
+                self._counters.append(counter)
+            self._cbuffers[counter][slot] = self._counts[counter]
+        for counter in self._counters:
+            if not counter in self._counts:
+                self._cbuffers[counter][slot] = 0.0
+        self._current.clear()
+        self._counts.clear()
+        self._frames += 1
+
+    def clear(self):
+        """
+        Empties the ring buffers and forgets every phase and counter.
+        """
+        self._buffers = {'frame':np.zeros(self._capacity)}
+        self._phases = ['frame']
+        self._cbuffers = {}
+        self._counters = []
+        self._counts.clear()
+        self._frames = 0
+        self._last = time.perf_counter()
+        self._current.clear()
+        self._starts.clear()
+
+    def times(self,phase):
+        """
+        Returns the times of a phase in the ring buffer, in milliseconds.
+
+        The times are in order from the oldest frame to the newest.  The array is empty
+        if no frames have been committed.  If the phase was never timed, every time is 0.
+
+        :param phase: the name of the phase
+        :type phase:  ``str``
+
+        :return: the time of the phase in each frame in the ring buffer
+        :rtype:  NumPy array of floats
+        """
+        return self._ordered(self._buffers,phase)
+
+    def values(self,counter):
+        """
+        Returns the values of a counter in the ring buffer.
+
+        The values are in order from the oldest frame to the newest.  The array is empty
+        if no frames have been committed.  If the counter was never counted, every value
+        is 0.
+
+        :param counter: the name of the counter
+        :type counter:  ``str``
+
+        :return: the value of the counter in each frame in the ring buffer
+        :rtype:  NumPy array of floats
+        """
+        return self._ordered(self._cbuffers,counter)
+
+    def percentile(self,phase,q):
+        """
+        Returns a percentile of the times of a phase in the ring buffer, in milliseconds.
+
+        The value is 0 if no frames have been committed.
+
+        :param phase: the name of the phase
+        :type phase:  ``str``
+
+        :param q: the percentile to compute
+        :type q:  ``int`` or ``float`` in 0..100
+        """
+        times = self.times(phase)
+        return float(np.percentile(times,q)) if len(times) else 0.0
+
+    def summary(self):
+        """
+        Returns the mean, median and 99th percentile of every phase, in milliseconds.
+
+        :return: a list of (phase, mean, p50, p99), with phases in the order of
+            :attr:`phases`
+        :rtype:  ``list`` of ``tuple``
+        """
+        return [self._stats(phase,self.times(phase)) for phase in self._phases]
+
+    def counts(self):
+        """
+        Returns the mean, median and 99th percentile of every counter.
+
+        :return: a list of (counter, mean, p50, p99), with counters in the order of
+            :attr:`counters`
+        :rtype:  ``list`` of ``tuple``
+        """
+        return [self._stats(counter,self.values(counter)) for counter in self._counters]
+
+    def save(self,filename):
+        """
+        Saves the frames in the ring buffers to a CSV file.
+
+        The file has one row per frame, from oldest to newest.  The first column is the
+        frame number (counting from 0), followed by the time of each phase in
+        milliseconds, in the order of :attr:`phases`, and then the value of each
+        counter, in the order of :attr:`counters`.
+
+        :param filename: the file to write
+        :type filename:  ``str``
+        """
+        import csv
+        count = min(self._frames,self._capacity)
+        first = self._frames-count
+        columns = [self.times(phase) for phase in self._phases]
+        columns += [self.values(counter) for counter in self._counters]
+        with open(filename,'w',newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['number']+[phase+'_ms' for phase in self._phases]+self._counters)
+            for row in range(count):
+                writer.writerow([first+row]+['%.4f' % column[row] for column in columns])
+
+    def draw(self,view):
+        """
+        Draws the overlay of phase times to the given view, if it is :attr:`visible`.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        if not self._visible:
+            return
+        if self._label is None:
+            # A fixed width font keeps the columns lined up
+            self._label = GLabel(text=' ',font_name=GProfiler.OVERLAY_FONT,font_size=13,
+                                 left=10,bottom=10,linecolor=[1,1,0,1],fillcolor=[0,0,0,0.7])
+        if self._shown is None or self._frames-self._shown >= GProfiler.OVERLAY_INTERVAL:
+            self._shown = self._frames
+            summary = self.summary()
+            counts = self.counts()
+            width = max([len(row[0]) for row in summary+counts]+[10])
+            lines = ['%-*s %7s %7s %7s' % (width,'phase (ms)','mean','p50','p99')]
+            for phase, mean, p50, p99 in summary:
+                lines.append('%-*s %7.2f %7.2f %7.2f' % (width,phase,mean,p50,p99))
+            if counts:
+                lines.append('%-*s %7s %7s %7s' % (width,'count','mean','p50','p99'))
+            for counter, mean, p50, p99 in counts:
+                lines.append('%-*s %7.2f %7.0f %7.0f' % (width,counter,mean,p50,p99))
+            self._label.text = '\n'.join(lines)
+        self._label.draw(view)
+
+
+    # HIDDEN METHODS
+    def _ordered(self,buffers,name):
+        """
+        Returns a ring buffer in order from the oldest frame to the newest.
+
+        :param buffers: the ring buffers, keyed by name
+        :type buffers:  ``dict``
+
+        :param name: the name of the ring buffer
+        :type name:  ``str``
+        """
+        count = min(self._frames,self._capacity)
+        if not name in buffers:
+            return np.zeros(count)
+        start = self._frames % self._capacity if self._frames > self._capacity else 0
+        return np.roll(buffers[name],-start)[:count]
+
+    def _stats(self,name,values):
+        """
+        Returns the tuple (name, mean, p50, p99) for the given values.
+
+        :param name: the name of the phase or counter
+        :type name:  ``str``
+
+        :param values: the values in the ring buffer
+        :type values:  NumPy array of floats
+        """
+        if len(values):
+            p50, p99 = np.percentile(values,[50,99])
+            return (name,float(values.mean()),float(p50),float(p99))
+        return (name,0.0,0.0,0.0)
@@ -0,0 +1,203 @@
+"""
+Input recording for 2D game support.
+
+This module provides a recording of the keys held down at every update of a game,
+along with the random seeds the game asked for.  A game with a fixed time step that
+gets all of its randomness from :meth:`GameApp.random_seed` does exactly the same thing
+when a recording is played back, so a recording can reproduce a bug or a slow frame,
+or be played back much faster than real time to time the game.
+"""
+import json
+
+
+# #mark -
+class GRecording(object):
+    """
+    A class representing the input to a game, one update (or tick) at a time.
+
+    Each tick holds the set of keys that were down when it began, stored as one bit per
+    key.  The keys get their bits in the order they are first pressed, so a recording
+    only knows the keys that were actually used.  The random seeds are stored in the
+    order they were drawn, along with the tick they were drawn in.
+
+    A :class:`GameApp` makes a recording with its method ``record``, and plays one
+    back with its method ``replay``.  You should rarely need to add ticks or seeds
+    yourself.  A recording is saved as a JSON file, where runs of ticks with the same
+    keys are stored as a single [keys, count] pair, so a long game makes a small file.
+    """
+    # The format of the saved files
+    VERSION = 1
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def step(self):
+        """
+        The time step of the game, in seconds.
+
+        Every tick of a recording updates the game by this amount of time.
+
+        **invariant**: Value is a float > 0
+        """
+        return self._step
+
+    @property
+    def keys(self):
+        """
+        The keys used in this recording, in the order they were first pressed.
+
+        **invariant**: Value is a tuple of strings
+        """
+        return tuple(self._keys)
+
+    @property
+    def ticks(self):
+        """
+        The number of ticks in this recording.
+
+        **invariant**: Value is an int >= 0
+        """
+        return len(self._masks)
+
+    @property
+    def seeds(self):
+        """
+        The random seeds in this recording, in the order they were drawn.
+
+        Each seed is a pair (tick, seed), where tick is the number of the tick it was
+        drawn in (counting from 0).
+
+        **invariant**: Value is a tuple of pairs of ints
+        """
+        return tuple(self._seeds)
+
+    @property
+    def duration(self):
+        """
+        The game time of this recording, in seconds.
+
+        **invariant**: Value is a float >= 0
+        """
+        return len(self._masks)*self._step
+
+
+    # BUILT-IN METHODS
+    def __init__(self,step):
+        """
+        Creates a new, empty recording.
+
+        :param step: the time step of the game, in seconds
+        :type step:  ``int`` or ``float`` > 0
+        """
+        assert type(step) in [int,float] and step > 0, '%s is not a valid step' % repr(step)
+        self._step  = float(step)
+        self._keys  = []
+        self._bits  = {}
+        self._masks = []
+        self._seeds = []
+
+
+    # PUBLIC METHODS
+    def add_tick(self,input):
+        """
+        Adds a tick with the keys currently held down.
+
+        :param input: the input handler of the game
+        :type input:  :class:`GInput`
+        """
+        mask = 0
+        for key in input.keys:
+            if not key in self._bits:
+                self._bits[key] = 1 << len(self._keys)
+                self._keys.append(key)
+            mask |= self._bits[key]
+        self._masks.append(mask)
+
+    def add_seed(self,seed):
+        """
+        Adds a random seed drawn in the last tick.
+
+        :param seed: the seed drawn
+        :type seed:  ``int`` >= 0
+        """
+        assert type(seed) == int and seed >= 0, '%s is not a valid seed' % repr(seed)
+        self._seeds.append((max(len(self._masks)-1,0),seed))
+
+    def apply(self,tick,input):
+        """
+        Sets the keys held down in the given input handler to those of a tick.
+
+        Only the keys in :attr:`keys` are pressed or released.  Any other key is left
+        alone.
+
+        :param tick: the tick to apply
+        :type tick:  ``int`` in 0..ticks-1
+
+        :param input: the input handler of the game
+        :type input:  :class:`GInput`
+        """
+        assert type(tick) == int and 0 <= tick < len(self._masks), '%s is not a valid tick' % repr(tick)
+        mask = self._masks[tick]
+        for key in self._keys:
+            if mask & self._bits[key]:
+                input.press(key)
+            else:
+                input.release(key)
+
+    def is_key_down(self,tick,key):
+        """
+        Checks whether a key was held down in the given tick.
+
+        :param tick: the tick to check
+        :type tick:  ``int`` in 0..ticks-1
+
+        :param key: the key to check
+        :type key:  ``str``
+
+        :return: True if ``key`` was down when the tick began
+        :rtype:  ``bool``
+        """
+        assert type(tick) == int and 0 <= tick < len(self._masks), '%s is not a valid tick' % repr(tick)
+        return key in self._bits and bool(self._masks[tick] & self._bits[key])
+
+    def save(self,filename):
+        """
+        Saves this recording to a JSON file.
+
+        :param filename: the file to write
+        :type filename:  ``str``
+        """
+        runs = []
+        for mask in self._masks:
+            if runs and runs[-1][0] == mask:
+                runs[-1][1] += 1
+            else:
+                runs.append([mask,1])
+        data = {'version':GRecording.VERSION,'step':self._step,'keys':self._keys,
+                'runs':runs,'seeds':[list(pair) for pair in self._seeds]}
+        with open(filename,'w') as file:
+            json.dump(data,file,separators=(',',':'))
+
+    @classmethod
+    def load(cls,filename):
+        """
+        Returns the recording saved in a JSON file.
+
+        :param filename: the file to read
+        :type filename:  ``str``
+
+        :return: the recording in the file
+        :rtype:  :class:`GRecording`
+        """
+        with open(filename) as file:
+            data = json.load(file)
+        if data.get('version') != GRecording.VERSION:
+            raise IOError('Module game2d cannot read the recording %s' % repr(filename))
+        result = cls(data['step'])
+        for key in data['keys']:
+            result._bits[key] = 1 << len(result._keys)
+            result._keys.append(key)
+        for mask, count in data['runs']:
+            result._masks.extend([mask]*count)
+        result._seeds = [tuple(pair) for pair in data['seeds']]
+        return result
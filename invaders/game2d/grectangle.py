@@ -47,7 +47,7 @@ class GRectangle(GObject):
         assert value >= 0, '%s is negative' % repr(value)
         self._linewidth = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # BUILT-IN METHODS
@@ -71,7 +71,7 @@ class GRectangle(GObject):
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         # Always delay the call to parent class, to avoid reset
         GObject.__init__(self,**keywords)
-        self._reset()
+        self._invalidate()
         self._defined = True
     
     
@@ -139,8 +139,6 @@ class GEllipse(GRectangle):
         This method is better than simple rectangle inclusion.  It checks that the point 
         is within the proper radius as well.
         
-        **Warning**: Using this method on a rotated object may slow down your framerate.
-        
         :param point: the point to check
         :type point: :class:`GPoint`` or a pair of numbers
         """
@@ -154,7 +152,7 @@ class GEllipse(GRectangle):
             dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
             dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
         else:
-            p = self.matrix.inverse()._transform(point[0],point[1])
+            p = self.inverse.transform(point[0],point[1])
             dx = p[0]*p[0]/(rx*rx)
             dy = p[1]*p[1]/(ry*ry)
         
@@ -220,7 +218,7 @@ class GImage(GRectangle):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # BUILT-IN METHODS
@@ -362,6 +360,8 @@ class GLabel(GRectangle):
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value == self._label.text:
+            return          # Rendering text is expensive; only do it on a change
         self._label.text = value
         self._label.texture_update()
     
@@ -387,7 +387,7 @@ class GLabel(GRectangle):
         self._halign = value
         self._label.halign = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     @property
     def valign(self):
@@ -411,7 +411,7 @@ class GLabel(GRectangle):
         self._valign = value
         self._label.valign = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # REDEFINED PROPERTIES
@@ -458,18 +458,12 @@ class GLabel(GRectangle):
         Changing this value will shift the center of the object so that the left
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **Invariant**: Must be an int or float.
         """
         if self._rotate.angle == 0.0:
             return self.x-self.width/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
+        return self.x-self.matrix.radius_x(self.width,self.height)
     
     @left.setter
     def left(self,value):
@@ -490,18 +484,12 @@ class GLabel(GRectangle):
         Changing this value will shift the center of the object so that the right
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **Invariant**: Must be an int or float.
         """
         if self._rotate.angle == 0.0:
             return self.x+self.width/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
+        return self.x+self.matrix.radius_x(self.width,self.height)
     
     @right.setter
     def right(self,value):
@@ -522,18 +510,12 @@ class GLabel(GRectangle):
         Changing this value will shift the center of the object so that the top
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **Invariant**: Must be an int or float.
         """
         if self._rotate.angle == 0.0:
             return self.y+self.height/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
+        return self.y+self.matrix.radius_y(self.width,self.height)
     
     @top.setter
     def top(self,value):
@@ -554,17 +536,12 @@ class GLabel(GRectangle):
         Changing this value will shift the center of the object so that the bottom
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
         **Invariant**: Must be an int or float.
         """
         if self._rotate.angle == 0.0:
             return self.y-self.height/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
+        return self.y-self.matrix.radius_y(self.width,self.height)
     
     
     @bottom.setter
@@ -600,7 +577,12 @@ class GLabel(GRectangle):
             if not key in excludes:
                 sanitized[key] = keywords[key]
         
-        self._label = Label(**sanitized)
+        if GameApp.SOFTWARE:
+            # There is no window to lay out a Kivy label in
+            from .gsoftview import SoftLabel
+            self._label = SoftLabel(**sanitized)
+        else:
+            self._label = Label(**sanitized)
         self._label.size_hint = (None,None)
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
@@ -610,9 +592,13 @@ class GLabel(GRectangle):
         GObject.__init__(self,**keywords)
         if not self.linecolor:
             self.linecolor = (0,0,0,1)
-        self._reset()
+        self._layout()
+        self._invalidate()
         self._defined = True
         self._label.bind(texture_size=self._callback)
+        if not GameApp.SOFTWARE:
+            # Kivy makes a new texture whenever the text no longer fits the old one
+            self._label.bind(texture=self._texture_made)
     
     def __str__(self):
         """
@@ -632,11 +618,21 @@ class GLabel(GRectangle):
         A workaround to deal with parameter requirements for callbacks
         """
         if self._defined:
-            self._reset()
+            self._layout()
+            self._invalidate()
     
-    def _reset(self):
+    def _texture_made(self,instance=None,value=None):
         """
-        Resets the drawing cache.
+        Counts the new texture of the Kivy label, for the statistics of the view.
+        """
+        GObject._count_texture()
+    
+    def _layout(self):
+        """
+        Sizes and anchors the label to fit its text.
+        
+        Unlike the drawing cache, this happens as soon as the text changes, so that
+        the size and edges of the label are always up to date.
         """
         # Set up the label at the center.
         self._label.size = self._label.texture_size
@@ -661,6 +657,7 @@ class GLabel(GRectangle):
             self._trans.y = self._hv-self.height/2.0
         elif self._vanchor == 'bottom':
             self._trans.y = self._hv+self.height/2.0
+        self._mtrue = False
         
         # Reset the label anchor.
         if self.halign == 'left':
@@ -673,7 +670,12 @@ class GLabel(GRectangle):
             self._label.top = self.height/2.0
         elif self.valign == 'bottom':
             self._label.bottom = -self.height/2.0
-        
+    
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        self._layout()
         GObject._reset(self)
         x = -self.width/2.0
         y = -self.height/2.0
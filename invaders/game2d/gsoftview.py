@@ -0,0 +1,942 @@
+"""
+Software rendering for 2D game support.
+
+This module provides a view that draws into a NumPy array instead of an OpenGL window.
+It needs no graphics window or graphics card, so it can run on machines without a
+display (such as a build server).  The pixels can be saved for screenshot tests, read
+as observations by a program playing the game, or written out as video frames.
+
+The software view is not a Kivy widget.  It is made by :class:`GameApp` when the game
+is created with the keyword ``backend='software'``.  Shapes are drawn from their
+attributes, not from their Kivy drawing commands, so no Kivy graphics instructions are
+ever built.  The result is close to, but not exactly the same as, the OpenGL view:
+edges are not smoothed and text uses the same font files, rendered by PIL.
+"""
+from .gobject import GObject, GScene
+from .grectangle import GRectangle, GEllipse, GImage, GLabel
+from .gsprite import GSprite
+from .gpath import GPath, GTriangle, GPolygon
+from .gparticles import GParticles
+from .gbatch import GSpriteBatch, _load_pixels
+from .glayer import GLayer
+import numpy as np
+
+
+def _compose(p, q):
+    """
+    Returns the transform p*q (q first, then p)
+
+    Transforms are 6-element tuples (a, b, c, d, tx, ty), as in :class:`GAffine`.
+
+    :param p: the outer transform
+    :type p:  6-element ``tuple``
+
+    :param q: the inner transform
+    :type q:  6-element ``tuple``
+    """
+    return (p[0]*q[0]+p[2]*q[1], p[1]*q[0]+p[3]*q[1],
+            p[0]*q[2]+p[2]*q[3], p[1]*q[2]+p[3]*q[3],
+            p[0]*q[4]+p[2]*q[5]+p[4], p[1]*q[4]+p[3]*q[5]+p[5])
+
+
+def _invert(m):
+    """
+    Returns the inverse of transform m, or None if it has no inverse
+
+    :param m: the transform to invert
+    :type m:  6-element ``tuple``
+    """
+    det = m[0]*m[3]-m[1]*m[2]
+    if det == 0:
+        return None
+    a =  m[3]/det
+    b = -m[1]/det
+    c = -m[2]/det
+    d =  m[0]/det
+    return (a, b, c, d, -(a*m[4]+c*m[5]), -(b*m[4]+d*m[5]))
+
+
+def _sample(pixels, u, v):
+    """
+    Returns the colors of an image at the given texture coordinates
+
+    The image rows are top-to-bottom, but v is 0 at the bottom of the image, as with
+    a Kivy texture.  The result has the shape of u plus a last axis of 4 (r, g, b, a)
+    as floats between 0 and 1.
+
+    :param pixels: The image pixels
+    :type pixels:  ``uint8`` array of shape (height, width, 4)
+
+    :param u: The horizontal texture coordinates, in [0,1]
+    :type u:  NumPy array of floats
+
+    :param v: The vertical texture coordinates, in [0,1]
+    :type v:  NumPy array of floats (same shape as u)
+    """
+    height, width = pixels.shape[0:2]
+    cols = np.clip((u*width).astype(int),0,width-1)
+    rows = np.clip(((1-v)*height).astype(int),0,height-1)
+    return pixels[rows,cols]/255.0
+
+
+# #mark -
+class SoftLabel(object):
+    """
+    A class representing text laid out and rendered without a graphics window.
+
+    A :class:`GLabel` uses a Kivy ``Label`` widget to lay out its text, but that widget
+    needs a window.  When the game uses the software view, each label uses one of these
+    objects instead.  It has the (few) attributes of a Kivy ``Label`` that a
+    :class:`GLabel` needs, and renders the text with PIL.
+
+    The attributes ``x`` and ``y`` are the bottom left corner of the text box, in the
+    coordinates of the label.  The attribute ``mask`` is the coverage of each pixel of
+    the text (rows top-to-bottom), as floats between 0 and 1.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def size(self):
+        """
+        The size of the text box.
+
+        **invariant**: Value is a pair of numbers >= 0
+        """
+        return (self.width,self.height)
+
+    @size.setter
+    def size(self,value):
+        self.width = value[0]
+        self.height = value[1]
+
+    @property
+    def right(self):
+        """
+        The right edge of the text box.
+
+        **invariant**: Value is a number
+        """
+        return self.x+self.width
+
+    @right.setter
+    def right(self,value):
+        self.x = value-self.width
+
+    @property
+    def top(self):
+        """
+        The top edge of the text box.
+
+        **invariant**: Value is a number
+        """
+        return self.y+self.height
+
+    @top.setter
+    def top(self,value):
+        self.y = value-self.height
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge of the text box.
+
+        **invariant**: Value is a number
+        """
+        return self.y
+
+    @bottom.setter
+    def bottom(self,value):
+        self.y = value
+
+    @property
+    def center(self):
+        """
+        The center of the text box.
+
+        **invariant**: Value is a pair of numbers
+        """
+        return (self.x+self.width/2.0,self.y+self.height/2.0)
+
+    @center.setter
+    def center(self,value):
+        self.x = value[0]-self.width/2.0
+        self.y = value[1]-self.height/2.0
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new text layout.
+
+        This class supports the keywords ``text``, ``font_size``, ``font_name`` and
+        ``bold`` of a Kivy ``Label``.  Any other keywords are ignored.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.text = keywords['text'] if 'text' in keywords else ''
+        self.font_size = keywords['font_size'] if 'font_size' in keywords else 15
+        self.font_name = keywords['font_name'] if 'font_name' in keywords else 'Roboto'
+        self.bold = keywords['bold'] if 'bold' in keywords else False
+        self.halign = 'center'
+        self.valign = 'middle'
+        self.color = (1,1,1,1)
+        self.size_hint = (None,None)
+        self.x = 0
+        self.y = 0
+        self.width = 100
+        self.height = 100
+        self.texture_size = (0,0)
+        self.mask = np.zeros((0,0))
+        self._callbacks = []
+        self.texture_update()
+
+
+    # PUBLIC METHODS
+    def bind(self,texture_size):
+        """
+        Registers a function to call when the size of the text changes.
+
+        :param texture_size: the function to call with this object and the new size
+        :type texture_size:  callable
+        """
+        self._callbacks.append(texture_size)
+
+    def texture_update(self):
+        """
+        Renders the text again, after a change to the text or font.
+        """
+        from PIL import Image, ImageDraw, ImageFont
+        import kivy.resources
+        # Find the font file the way Kivy does, with Roboto as the default
+        path = kivy.resources.resource_find(self.font_name)
+        if path is None and not self.font_name.endswith('.ttf'):
+            path = kivy.resources.resource_find(self.font_name+'.ttf')
+        if path is None or self.font_name == 'Roboto':
+            style = 'Bold' if self.bold else 'Regular'
+            path = kivy.resources.resource_find('data/fonts/Roboto-%s.ttf' % style)
+        font = ImageFont.truetype(path,max(int(round(self.font_size)),1))
+
+        lines  = self.text.split('\n')
+        ascent, descent = font.getmetrics()
+        height = ascent+descent
+        widths = [int(np.ceil(font.getlength(line))) for line in lines]
+        image  = Image.new('L',(max(widths+[1]),height*len(lines)),0)
+        draw   = ImageDraw.Draw(image)
+        for pos in range(len(lines)):
+            if self.halign == 'left':
+                left = 0
+            elif self.halign == 'right':
+                left = image.width-widths[pos]
+            else:
+                left = (image.width-widths[pos])//2
+            draw.text((left,pos*height),lines[pos],fill=255,font=font)
+
+        self.mask = np.asarray(image,dtype=np.float32)/255.0
+        size = (image.width,image.height)
+        if size != self.texture_size:
+            self.texture_size = size
+            for callback in self._callbacks:
+                callback(self,size)
+
+
+# #mark -
+class GSoftView(object):
+    """
+    A class representing a drawing window in memory, for a :class:`GameApp` application.
+
+    This view has the same methods as :class:`GView` for drawing, attaching and detaching
+    shapes, so a game does not need to know which view it has.  Shapes are drawn when the
+    frame ends, in order: a white background, then the attached shapes, then the shapes
+    drawn this frame.  The result is the attribute :attr:`pixels`.
+
+    The view may be smaller (or larger) than the game window.  The attribute :attr:`scale`
+    is the number of pixels per unit of the game window, so a scale of 0.5 draws an
+    800x700 game into 400x350 pixels.  Drawing fewer pixels is much faster.
+
+    **You should never construct an object of this class**.  Use the one provided in the
+    `view` attribute of :class:`GameApp`, when the game is started with the keyword
+    ``backend='software'``.
+    """
+    # Class attribute for the pixels of each image file, keyed by file name
+    IMAGE_CACHE = {}
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def scale(self):
+        """
+        The number of pixels per unit of the game window.
+
+        **invariant**: Value is a float > 0
+        """
+        return self._scale
+
+    @property
+    def pixels(self):
+        """
+        The pixels of the last frame.
+
+        The array has shape (height, width, 4) and type ``uint8``, with the rows in
+        top-to-bottom order and the channels as r, g, b, a (a is always 255).  The array
+        is replaced every frame, so you may keep it.
+
+        **invariant**: Value is a NumPy array
+        """
+        if self._pixels is None:
+            pixels = np.empty((self._pheight,self._pwidth,4),dtype=np.uint8)
+            pixels[:,:,0:3] = np.clip(self._buffer*255.0+0.5,0,255)
+            pixels[:,:,3] = 255
+            self._pixels = pixels
+        return self._pixels
+
+    @property
+    def stats(self):
+        """
+        The drawing statistics of the last frame drawn.
+
+        This is a dictionary with the same keys as the attribute ``stats`` of
+        :class:`GView`.  This view draws every shape again each frame, so 'changed' is
+        the same as 'groups'.  It never makes Kivy instructions, so 'resets' and
+        'instructions' are 0.  Its textures are the images in :attr:`IMAGE_CACHE`, so
+        'textures' counts the images loaded and 'cached' is the size of that cache.
+
+        **invariant**: Value is a dictionary of ints >= 0
+        """
+        return dict(self._stats)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,width,height,scale=1.0):
+        """
+        Creates a new view in memory.
+
+        :param width: the width of the game window
+        :type width:  ``int`` or ``float`` > 0
+
+        :param height: the height of the game window
+        :type height:  ``int`` or ``float`` > 0
+
+        :param scale: the number of pixels per unit of the game window
+        :type scale:  ``int`` or ``float`` > 0
+        """
+        self._scale = float(scale)
+        self._pwidth  = max(int(round(width*scale)),1)
+        self._pheight = max(int(round(height*scale)),1)
+        # Game coordinates to pixel coordinates, where pixel rows go down
+        self._screen = (self._scale,0.0,0.0,-self._scale,0.0,float(self._pheight))
+        self._buffer = np.ones((self._pheight,self._pwidth,3),dtype=np.float32)
+        self._pixels = None
+        self._attached = []
+        self._drawn = []
+        self._stats = {'groups':0,'changed':0,'resets':0,'instructions':0,
+                       'textures':0,'cached':0}
+
+
+    # PUBLIC METHODS
+    def draw(self,shape):
+        """
+        Draws the given shape to this view.
+
+        Unlike :class:`GView`, this view cannot draw raw Kivy graphics commands.  You
+        should use the `draw` method in :class:`GObject` instead.
+
+        :param shape: the shape to draw
+        :type shape:  :class:`GObject`
+        """
+        self._draw_shape(shape)
+
+    def clear(self):
+        """
+        Clears the contents of the view.
+
+        This method is called for you automatically at the start of the animation
+        frame.  Attached shapes are not cleared.
+        """
+        self._drawn = []
+
+    def save(self,filename):
+        """
+        Saves the last frame to an image file.
+
+        The format is determined by the file suffix (such as .png).  This method
+        requires PIL.
+
+        :param filename: the file to save to
+        :type filename:  ``str``
+        """
+        from PIL import Image
+        Image.fromarray(self.pixels).save(filename)
+
+
+    # HIDDEN METHODS
+    def _draw_shape(self,shape):
+        """
+        Draws the given shape to this view.
+
+        :param shape: the shape to draw
+        :type shape:  :class:`GObject`
+        """
+        assert isinstance(shape,GObject), '%s is not a GObject' % repr(shape)
+        self._drawn.append(shape)
+
+    def _attach_shape(self,shape):
+        """
+        Attaches the given shape to this view until it is detached.
+
+        :param shape: the shape to attach
+        :type shape:  :class:`GObject`
+        """
+        if not shape in self._attached:
+            self._attached.append(shape)
+
+    def _detach_shape(self,shape):
+        """
+        Detaches the given shape from this view.
+
+        :param shape: the shape to detach
+        :type shape:  :class:`GObject`
+        """
+        if shape in self._attached:
+            self._attached.remove(shape)
+
+    def _commit(self):
+        """
+        Draws the frame.
+
+        The frame is drawn as floats.  It is only converted to :attr:`pixels` when that
+        attribute is accessed, so frames that are never looked at cost less.
+        """
+        self._buffer[:] = 1.0
+        for shape in self._attached:
+            self._render(shape,self._screen)
+        for shape in self._drawn:
+            self._render(shape,self._screen)
+        self._pixels = None
+
+        resets, rebuilt, textures = GObject._take_counts()
+        stats = self._stats
+        stats['groups'] = len(self._attached)+len(self._drawn)
+        stats['changed'] = stats['groups']
+        stats['resets'] = resets
+        stats['instructions'] = rebuilt
+        stats['textures'] = textures
+        stats['cached'] = len(GSoftView.IMAGE_CACHE)
+
+    def _render(self,shape,parent):
+        """
+        Draws a shape into the buffer.
+
+        :param shape: the shape to draw
+        :type shape:  :class:`GObject`
+
+        :param parent: the transform from the shape coordinates of the parent to pixels
+        :type parent:  6-element ``tuple``
+        """
+        a = shape.matrix
+        m = _compose(parent,(a.a,a.b,a.c,a.d,a.tx,a.ty))
+        if isinstance(shape,GLayer):
+            m = _compose(m,(1.0,0.0,0.0,1.0,-shape.width/2.0,-shape.height/2.0))
+            for child in shape.children:
+                self._render(child,m)
+        elif isinstance(shape,GScene):
+            for child in shape.children:
+                self._render(child,m)
+        elif isinstance(shape,GSpriteBatch):
+            self._render_batch(shape,m)
+        elif isinstance(shape,GParticles):
+            self._render_particles(shape,m)
+        elif isinstance(shape,GLabel):
+            self._render_label(shape,m)
+        elif isinstance(shape,GImage) or isinstance(shape,GSprite):
+            self._render_image(shape,m)
+        elif isinstance(shape,GEllipse):
+            self._render_ellipse(shape,m)
+        elif isinstance(shape,GRectangle):
+            self._render_rectangle(shape,m)
+        elif isinstance(shape,GPath):
+            self._render_path(shape,m)
+
+    def _render_rectangle(self,shape,m):
+        """
+        Draws a rectangle (and its border) into the buffer.
+
+        :param shape: the rectangle to draw
+        :type shape:  :class:`GRectangle`
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+        """
+        w = shape.width/2.0
+        h = shape.height/2.0
+        if not shape.fillcolor is None:
+            self._fill_rectangle(m,w,h,shape.fillcolor)
+        t = shape.linewidth
+        if not shape.linecolor is None and t > 0:
+            self._stroke_rectangle(m,w,h,t,shape.linecolor)
+
+    def _fill_rectangle(self,m,w,h,color):
+        """
+        Fills a rectangle centered at the origin with a solid color.
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+
+        :param w: half the rectangle width
+        :type w:  ``float`` >= 0
+
+        :param h: half the rectangle height
+        :type h:  ``float`` >= 0
+
+        :param color: the fill color
+        :type color:  4-element list of floats
+        """
+        if m[1] == 0 and m[2] == 0:
+            self._fill_box(m,0.0,0.0,w,h,color)
+            return
+        quad = self._quads(m,0.0,0.0,2*w,2*h)
+        if quad:
+            rows, cols, lx, ly, valid = quad
+            valid &= (np.abs(lx) <= w) & (np.abs(ly) <= h)
+            self._blend(rows,cols,valid,color)
+
+    def _stroke_rectangle(self,m,w,h,t,color):
+        """
+        Draws the border of a rectangle centered at the origin.
+
+        As with a Kivy ``Line``, the border extends ``t`` on either side of the edges.
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+
+        :param w: half the rectangle width
+        :type w:  ``float`` >= 0
+
+        :param h: half the rectangle height
+        :type h:  ``float`` >= 0
+
+        :param t: the half-thickness of the border
+        :type t:  ``float`` > 0
+
+        :param color: the line color
+        :type color:  4-element list of floats
+        """
+        if m[1] == 0 and m[2] == 0:
+            if w <= t or h <= t:
+                self._fill_box(m,0.0,0.0,w+t,h+t,color)
+            else:
+                # Top and bottom span the corners, so no pixel is blended twice
+                self._fill_box(m,0.0,h,w+t,t,color)
+                self._fill_box(m,0.0,-h,w+t,t,color)
+                self._fill_box(m,-w,0.0,t,h-t,color)
+                self._fill_box(m,w,0.0,t,h-t,color)
+            return
+        quad = self._quads(m,0.0,0.0,2*(w+t),2*(h+t))
+        if quad:
+            rows, cols, lx, ly, valid = quad
+            lx = np.abs(lx)
+            ly = np.abs(ly)
+            valid &= (lx <= w+t) & (ly <= h+t) & ((lx >= w-t) | (ly >= h-t))
+            self._blend(rows,cols,valid,color)
+
+    def _fill_box(self,m,cx,cy,w,h,color):
+        """
+        Fills a box with a solid color, for a transform without rotation.
+
+        Only pixels whose centers are in the box are filled, as with :meth:`_quads`.
+        The transform must not rotate (its entries b and c are 0), so the box is a
+        block of the buffer.
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+
+        :param cx: the horizontal center of the box
+        :type cx:  ``float``
+
+        :param cy: the vertical center of the box
+        :type cy:  ``float``
+
+        :param w: half the box width
+        :type w:  ``float`` >= 0
+
+        :param h: half the box height
+        :type h:  ``float`` >= 0
+
+        :param color: the fill color
+        :type color:  4-element list of floats
+        """
+        x0 = m[0]*(cx-w)+m[4]
+        x1 = m[0]*(cx+w)+m[4]
+        y0 = m[3]*(cy-h)+m[5]
+        y1 = m[3]*(cy+h)+m[5]
+        c0 = max(int(np.ceil(min(x0,x1)-0.5)),0)
+        c1 = min(int(np.floor(max(x0,x1)-0.5))+1,self._pwidth)
+        r0 = max(int(np.ceil(min(y0,y1)-0.5)),0)
+        r1 = min(int(np.floor(max(y0,y1)-0.5))+1,self._pheight)
+        if c0 >= c1 or r0 >= r1:
+            return
+        alpha = color[3]
+        block = self._buffer[r0:r1,c0:c1]
+        if alpha >= 1:
+            block[:] = color[0:3]
+        elif alpha > 0:
+            block *= 1-alpha
+            block += np.asarray(color[0:3],dtype=np.float32)*alpha
+
+    def _render_ellipse(self,shape,m):
+        """
+        Draws an ellipse (and its border) into the buffer.
+
+        :param shape: the ellipse to draw
+        :type shape:  :class:`GEllipse`
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+        """
+        w = shape.width/2.0
+        h = shape.height/2.0
+        if not shape.fillcolor is None:
+            quad = self._quads(m,0.0,0.0,2*w,2*h)
+            if quad:
+                rows, cols, lx, ly, valid = quad
+                valid &= (lx/w)**2+(ly/h)**2 <= 1
+                self._blend(rows,cols,valid,shape.fillcolor)
+        t = shape.linewidth
+        if not shape.linecolor is None and t > 0:
+            quad = self._quads(m,0.0,0.0,2*(w+t),2*(h+t))
+            if quad:
+                rows, cols, lx, ly, valid = quad
+                valid &= (lx/(w+t))**2+(ly/(h+t))**2 <= 1
+                if w > t and h > t:
+                    valid &= (lx/(w-t))**2+(ly/(h-t))**2 >= 1
+                self._blend(rows,cols,valid,shape.linecolor)
+
+    def _render_image(self,shape,m):
+        """
+        Draws an image or the current frame of a sprite into the buffer.
+
+        :param shape: the image to draw
+        :type shape:  :class:`GImage` or :class:`GSprite`
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+        """
+        pixels = self._load(shape.source)
+        if not pixels is None:
+            if isinstance(shape,GSprite):
+                rows, cols = shape._format
+                fh = pixels.shape[0]//rows
+                fw = pixels.shape[1]//cols
+                r = shape.frame//cols
+                c = shape.frame%cols
+                pixels = pixels[r*fh:(r+1)*fh,c*fw:(c+1)*fw]
+            w = shape.width
+            h = shape.height
+            quad = self._quads(m,0.0,0.0,w,h)
+            if quad:
+                rows, cols, lx, ly, valid = quad
+                u = lx/w+0.5
+                v = ly/h+0.5
+                valid &= (u >= 0) & (u < 1) & (v >= 0) & (v < 1)
+                color = _sample(pixels,u,v)
+                if not shape.fillcolor is None:
+                    color = color*np.array(shape.fillcolor)
+                self._blend(rows,cols,valid,color)
+
+        t = shape.linewidth
+        if not shape.linecolor is None and t > 0:
+            self._stroke_rectangle(m,shape.width/2.0,shape.height/2.0,t,shape.linecolor)
+
+    def _render_label(self,shape,m):
+        """
+        Draws a label (its background, text and border) into the buffer.
+
+        :param shape: the label to draw
+        :type shape:  :class:`GLabel`
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+        """
+        w = shape.width/2.0
+        h = shape.height/2.0
+        if shape.fillcolor:
+            self._fill_rectangle(m,w,h,shape.fillcolor)
+
+        label = shape._label
+        if isinstance(label,SoftLabel) and label.mask.size:
+            tw, th = label.texture_size
+            cx, cy = label.center
+            quad = self._quads(m,cx,cy,tw,th)
+            if quad:
+                rows, cols, lx, ly, valid = quad
+                u = (lx-cx)/tw+0.5
+                v = (ly-cy)/th+0.5
+                valid &= (u >= 0) & (u < 1) & (v >= 0) & (v < 1)
+                mask = label.mask
+                mrows = np.clip(((1-v)*mask.shape[0]).astype(int),0,mask.shape[0]-1)
+                mcols = np.clip((u*mask.shape[1]).astype(int),0,mask.shape[1]-1)
+                color = np.empty(valid.shape+(4,),dtype=np.float32)
+                color[...,0:3] = label.color[0:3]
+                color[...,3] = mask[mrows,mcols]*label.color[3]
+                self._blend(rows,cols,valid,color)
+
+        t = shape.linewidth
+        if t > 0:
+            self._stroke_rectangle(m,w,h,t,shape.linecolor)
+
+    def _render_path(self,shape,m):
+        """
+        Draws a path, triangle or polygon into the buffer.
+
+        A polygon is filled as a triangle fan about its origin.  A textured polygon is
+        filled with ``fillcolor`` instead of its image.
+
+        :param shape: the path to draw
+        :type shape:  :class:`GPath`
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+        """
+        points = np.reshape(np.array(shape.points,dtype=float),(-1,2))
+        closed = isinstance(shape,GTriangle) or isinstance(shape,GPolygon)
+        if closed and not shape.fillcolor is None:
+            if isinstance(shape,GTriangle):
+                tris = points[np.newaxis,0:3]
+            else:
+                tris = np.empty((len(points),3,2))
+                tris[:,0] = 0
+                tris[:,1] = points
+                tris[:,2] = np.roll(points,-1,axis=0)
+            self._fill_triangles(tris,m,shape.fillcolor)
+
+        t = shape.linewidth
+        if not shape.linecolor is None and t > 0:
+            if closed:
+                points = np.vstack([points,points[0:1]])
+            self._stroke(points[:-1],points[1:],t,m,shape.linecolor)
+
+    def _render_batch(self,shape,m):
+        """
+        Draws the sprites of a sprite batch into the buffer.
+
+        :param shape: the batch to draw
+        :type shape:  :class:`GSpriteBatch`
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+        """
+        vertices = shape._vertices
+        if not len(vertices):
+            return
+        x0 = vertices[:,0,0]
+        y0 = vertices[:,0,1]
+        x1 = vertices[:,2,0]
+        y1 = vertices[:,2,1]
+        w = x1-x0
+        h = y1-y0
+        cx = (x0+x1)/2.0
+        cy = (y0+y1)/2.0
+        quad = self._quads(m,cx,cy,w,h)
+        if quad:
+            rows, cols, lx, ly, valid = quad
+            fx = (lx-cx[:,None,None])/w[:,None,None]+0.5
+            fy = (ly-cy[:,None,None])/h[:,None,None]+0.5
+            valid &= (fx >= 0) & (fx < 1) & (fy >= 0) & (fy < 1)
+            u0 = vertices[:,0,2,None,None]
+            v0 = vertices[:,0,3,None,None]
+            u1 = vertices[:,2,2,None,None]
+            v1 = vertices[:,2,3,None,None]
+            # The atlas rows are bottom-to-top, so flip them to sample as an image
+            color = _sample(shape.atlas._pixels[::-1],u0+fx*(u1-u0),v0+fy*(v1-v0))
+            if not shape.fillcolor is None:
+                color = color*np.array(shape.fillcolor)
+            self._blend(rows,cols,valid,color)
+
+    def _render_particles(self,shape,m):
+        """
+        Draws the particles of a particle system into the buffer.
+
+        :param shape: the particles to draw
+        :type shape:  :class:`GParticles`
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+        """
+        vertices = shape._vertices
+        if not len(vertices):
+            return
+        cx = (vertices[:,0,0]+vertices[:,2,0])/2.0
+        cy = (vertices[:,0,1]+vertices[:,2,1])/2.0
+        d = vertices[0,2,0]-vertices[0,0,0]
+        quad = self._quads(m,cx,cy,d,d)
+        if quad:
+            rows, cols, lx, ly, valid = quad
+            dx = lx-cx[:,None,None]
+            dy = ly-cy[:,None,None]
+            valid &= dx*dx+dy*dy <= d*d/4.0
+            self._blend(rows,cols,valid,vertices[:,0,None,None,4:8])
+
+    def _fill_triangles(self,tris,m,color):
+        """
+        Fills triangles in the buffer with a solid color.
+
+        :param tris: the triangle corners, in shape coordinates
+        :type tris:  NumPy array of shape (n,3,2)
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+
+        :param color: the fill color
+        :type color:  4-element list of floats
+        """
+        low = tris.min(axis=1)
+        high = tris.max(axis=1)
+        quad = self._quads(m,(low[:,0]+high[:,0])/2,(low[:,1]+high[:,1])/2,
+                           high[:,0]-low[:,0],high[:,1]-low[:,1])
+        if quad:
+            rows, cols, lx, ly, valid = quad
+            signs = []
+            for k in range(3):
+                p = tris[:,k,:,None,None]
+                q = tris[:,(k+1)%3,:,None,None]
+                signs.append((q[:,0]-p[:,0])*(ly-p[:,1])-(q[:,1]-p[:,1])*(lx-p[:,0]))
+            inside = ((signs[0] >= 0) & (signs[1] >= 0) & (signs[2] >= 0)) | \
+                     ((signs[0] <= 0) & (signs[1] <= 0) & (signs[2] <= 0))
+            self._blend(rows,cols,valid & inside,color)
+
+    def _stroke(self,start,end,width,m,color):
+        """
+        Draws line segments (with round ends) into the buffer.
+
+        As with a Kivy ``Line``, the segments extend ``width`` on either side.
+
+        :param start: the segment start points, in shape coordinates
+        :type start:  NumPy array of shape (n,2)
+
+        :param end: the segment end points, in shape coordinates
+        :type end:  NumPy array of shape (n,2)
+
+        :param width: the half-thickness of the segments
+        :type width:  ``int`` or ``float`` > 0
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+
+        :param color: the line color
+        :type color:  4-element list of floats
+        """
+        low = np.minimum(start,end)-width
+        high = np.maximum(start,end)+width
+        quad = self._quads(m,(low[:,0]+high[:,0])/2,(low[:,1]+high[:,1])/2,
+                           high[:,0]-low[:,0],high[:,1]-low[:,1])
+        if quad:
+            rows, cols, lx, ly, valid = quad
+            px = start[:,0,None,None]
+            py = start[:,1,None,None]
+            dx = end[:,0,None,None]-px
+            dy = end[:,1,None,None]-py
+            length = dx*dx+dy*dy
+            t = ((lx-px)*dx+(ly-py)*dy)/np.where(length > 0,length,1)
+            t = np.clip(t,0,1)
+            ex = lx-px-t*dx
+            ey = ly-py-t*dy
+            self._blend(rows,cols,valid & (ex*ex+ey*ey <= width*width),color)
+
+    def _quads(self,m,cx,cy,w,h):
+        """
+        Returns the pixels covered by rectangles in shape coordinates, or None if none are
+
+        The rectangles are centered at (cx,cy) with size (w,h), which may be numbers or
+        1-d arrays of length n.  For each rectangle, this method finds the pixels of its
+        bounding box on screen, as a grid of shape (bh,bw) (the largest box of all of the
+        rectangles).  It returns the tuple (rows, cols, lx, ly, valid), where rows and
+        cols are the pixel indices, lx and ly are the shape coordinates of the pixel
+        centers, and valid marks the pixels that are on screen and in the bounding box.
+        Each array has (or broadcasts to) shape (n,bh,bw).
+
+        :param m: the transform from the shape coordinates to pixels
+        :type m:  6-element ``tuple``
+        """
+        inverse = _invert(m)
+        if inverse is None:
+            return None
+        cx = np.atleast_1d(np.asarray(cx,dtype=float))
+        cy = np.atleast_1d(np.asarray(cy,dtype=float))
+        w = np.asarray(w,dtype=float)
+        h = np.asarray(h,dtype=float)
+        a, b, c, d, tx, ty = m
+        px = a*cx+c*cy+tx
+        py = b*cx+d*cy+ty
+        rx = (abs(a)*w+abs(c)*h)/2.0
+        ry = (abs(b)*w+abs(d)*h)/2.0
+        c0 = np.clip(np.floor(px-rx),0,self._pwidth).astype(int)
+        c1 = np.clip(np.ceil(px+rx),0,self._pwidth).astype(int)
+        r0 = np.clip(np.floor(py-ry),0,self._pheight).astype(int)
+        r1 = np.clip(np.ceil(py+ry),0,self._pheight).astype(int)
+        bw = int((c1-c0).max())
+        bh = int((r1-r0).max())
+        if bw <= 0 or bh <= 0:
+            return None
+
+        cols = c0[:,None,None]+np.arange(bw)[None,None,:]
+        rows = r0[:,None,None]+np.arange(bh)[None,:,None]
+        valid = (cols < c1[:,None,None]) & (rows < r1[:,None,None])
+        ia, ib, ic, id, itx, ity = inverse
+        fx = cols+0.5
+        fy = rows+0.5
+        lx = ia*fx+ic*fy+itx
+        ly = ib*fx+id*fy+ity
+        return (rows, cols, lx, ly, valid)
+
+    def _blend(self,rows,cols,valid,color):
+        """
+        Blends a color over the buffer at the given pixels.
+
+        The color may be a single rgba color, or an array of colors with the shape of
+        valid plus a last axis of 4.  Only pixels marked by valid are changed.
+
+        :param rows: the pixel rows, broadcastable to the shape of valid
+        :type rows:  NumPy array of ints
+
+        :param cols: the pixel columns, broadcastable to the shape of valid
+        :type cols:  NumPy array of ints
+
+        :param valid: the pixels to change
+        :type valid:  NumPy array of bools with shape (n,bh,bw)
+
+        :param color: the color(s) to blend
+        :type color:  4-element list, or NumPy array broadcastable to (n,bh,bw,4)
+        """
+        color = np.broadcast_to(np.asarray(color,dtype=np.float32),valid.shape+(4,))
+        if valid.shape[0] == 1:
+            # One rectangle is a solid block of the buffer
+            r0 = rows.flat[0]
+            c0 = cols.flat[0]
+            bh, bw = valid.shape[1:]
+            block = self._buffer[r0:r0+bh,c0:c0+bw]
+            alpha = (color[0,:block.shape[0],:block.shape[1],3]*valid[0,:block.shape[0],:block.shape[1]])[...,None]
+            block *= 1-alpha
+            block += color[0,:block.shape[0],:block.shape[1],0:3]*alpha
+            return
+
+        rows = np.broadcast_to(rows,valid.shape)[valid]
+        cols = np.broadcast_to(cols,valid.shape)[valid]
+        color = color[valid]
+        alpha = color[:,3:4]
+        self._buffer[rows,cols] = self._buffer[rows,cols]*(1-alpha)+color[:,0:3]*alpha
+
+    def _load(self,source):
+        """
+        Returns the pixels of an image file, or None if it cannot be loaded
+
+        :param source: the image file name
+        :type source:  ``str``
+        """
+        if source is None:
+            return None
+        if not source in GSoftView.IMAGE_CACHE:
+            import kivy.resources
+            path = kivy.resources.resource_find(source)
+            GSoftView.IMAGE_CACHE[source] = None if path is None else _load_pixels(path)
+            GObject._count_texture()
+        return GSoftView.IMAGE_CACHE[source]
@@ -33,7 +33,13 @@ class GSprite(GRectangle):
     
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+    
+    The frames of a filmstrip are cut from the texture once, and shared by every sprite
+    with the same ``source`` and ``format`` (see :meth:`load_frames`).  Changing the 
+    frame of a sprite never allocates a new texture region.
     """
+    # Class attribute for tracking the frames of each filmstrip, keyed by (source, format)
+    FRAME_CACHE = {}
     
     # MUTABLE PROPERTIES
     @property
@@ -50,7 +56,7 @@ class GSprite(GRectangle):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     @property
     def count(self):
@@ -80,6 +86,46 @@ class GSprite(GRectangle):
             self._bounds.texture = self._texture
     
     
+    # CLASS METHODS
+    @classmethod
+    def load_frames(cls,source,format):
+        """
+        Returns: The frames of the given filmstrip, or None if it cannot be loaded
+        
+        The frames are texture regions, in order left-to-right, top-to-bottom.  If the
+        filmstrip has already been cut into frames, it will return the cached frames.
+        Otherwise, it will cut the texture and cache the frames before returning them.
+        
+        :param source: The file name of the filmstrip
+        :type source:  ``str``
+        
+        :param format: The filmstrip grid size as (rows, columns)
+        :type format:  2-element tuple of ints > 0
+        """
+        key = (source,format)
+        if key in cls.FRAME_CACHE:
+            return cls.FRAME_CACHE[key]
+        
+        texture = GameApp.load_texture(source)
+        if not texture:
+            return None
+        
+        width  = texture.width/format[1]
+        height = texture.height/format[0]
+        frames = []
+        ty = 0
+        for row in range(format[0]):
+            tx = 0
+            for col in range(format[1]):
+                frames.append(texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height)))
+                tx += width
+            ty += height
+        
+        frames = tuple(frames)
+        cls.FRAME_CACHE[key] = frames
+        return frames
+    
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -89,10 +135,10 @@ class GSprite(GRectangle):
         keyword arguments that initialize various attributes. For example, to load the 
         filmstrip ``alien-strip1.png``, which has 3 rows and 2 columns, use the constructor::
             
-            GSprite(x=0,y=0,width=10,height=10,source='alien-strip1.png',frames=(3,2))
+            GSprite(x=0,y=0,width=10,height=10,source='alien-strip1.png',format=(3,2))
         
         This class supports the all same keywords as :class:`GImage`; the only new 
-        keyword is ``frames``. This keyword specifies the grid size of the animation
+        keyword is ``format``. This keyword specifies the grid size of the animation
         frames in the image.  See the documentation of :class:`GImage` and 
         :class:`GObject` for the other supported keywords.
         
@@ -103,7 +149,7 @@ class GSprite(GRectangle):
         self.source  = keywords['source'] if 'source' in keywords else None
         self._setFormat(keywords['format'] if 'format' in keywords else (1,1))
         self._frame  = 0
-        self._images = [None]*self.count
+        self._images = (None,)*self.count
         self._bounds = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
@@ -130,18 +176,9 @@ class GSprite(GRectangle):
         x = -self.width/2.0
         y = -self.height/2.0
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+        frames = GSprite.load_frames(self.source,self._format)
+        if frames:
+            self._images = frames
         else:
             print('Failed to load',repr(self.source))
         
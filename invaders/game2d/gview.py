@@ -15,6 +15,7 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
 
 from introcs.geom import Point2
+from .gobject import GObject
 
 
 class GInput(object):
@@ -23,7 +24,8 @@ class GInput(object):
 
     An input handler receives mouse and keyboard information, and makes it available
     to the user.  To access mouse information, simply access the attribute ``touch``.
-    To access keyboard information, use the method :meth:`is_key_down`.
+    To access keyboard information, use the method :meth:`is_key_down`.  Programs can
+    also hold keys down themselves with :meth:`press` and :meth:`release`.
 
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly hook it up to the keyboard and mouse.  Instead,
@@ -185,6 +187,36 @@ class GInput(object):
         """
         return not self._touch is None
 
+    def press(self,key):
+        """
+        Holds the given key down, as if it were pressed on the keyboard.
+
+        The key stays down until it is released, either by :meth:`release` or by the
+        keyboard.  This method is how a program (like a test, or the replay of a
+        recording) plays the game without a keyboard.
+
+        :param key: the key to press
+        :type key:  ``str``
+        """
+        assert type(key) == str, '%s is not a string' % repr(key)
+        if not self.is_key_down(key):
+            self._keycount += 1
+        self._keystate[key] = True
+
+    def release(self,key):
+        """
+        Lets go of the given key, as if it were released on the keyboard.
+
+        Nothing happens if the key is not down.
+
+        :param key: the key to release
+        :type key:  ``str``
+        """
+        assert type(key) == str, '%s is not a string' % repr(key)
+        if self.is_key_down(key):
+            self._keycount -= 1
+            self._keystate[key] = False
+
 
     # HIDDEN METHODS
     def _register(self,view):
@@ -319,12 +351,51 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    Behind the scenes, the view does not rebuild the window every frame.  It keeps the
+    list of shapes drawn in the previous frame, and at the end of each frame it only
+    changes the window from the first shape that differs.  So if you draw the same
+    shapes in the same order as last frame, Kivy only updates the shapes that moved or
+    changed color.
+
+    Shapes that are always on screen can instead be attached with the method ``attach``
+    in :class:`GObject`.  An attached shape is drawn every frame until it is detached,
+    with no need to call ``draw``.  Attached shapes are drawn in the order they were
+    attached, underneath the shapes drawn each frame.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
 
+    # IMMUTABLE PROPERTIES
+    @property
+    def stats(self):
+        """
+        The drawing statistics of the last frame shown.
+
+        This is a dictionary with the following keys:
+
+            'groups': the number of shapes (Kivy instruction groups) in the frame,
+                attached or drawn
+            'changed': the number of those groups the window had to add, because they
+                were not in the same place in the frame before
+            'resets': the number of shape caches rebuilt (see :class:`GObject`)
+            'instructions': the number of instructions in the rebuilt caches
+            'textures': the number of new textures, including the text of labels and
+                the images loaded
+            'cached': the number of textures in the texture cache of :class:`GameApp`
+
+        All of these but 'cached' count the work done since the frame before.  The
+        :class:`GameApp` adds them to its profiler every frame.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a dictionary of ints >= 0
+        """
+        return dict(self._stats)
+
+
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -336,11 +407,16 @@ class GView(FloatLayout):
         :class:`GameApp`. See the documentation of that class for more information.
         """
         FloatLayout.__init__(self)
+        self._attached = InstructionGroup()
         self._frame = InstructionGroup()
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
         self._contents = set()
+        self._drawn = []
+        self._shown = []
+        self._stats = {'groups':0,'changed':0,'resets':0,'instructions':0,
+                       'textures':0,'cached':0}
 
 
     # PUBLIC METHODS
@@ -355,20 +431,113 @@ class GView(FloatLayout):
         :type cmd:  A Kivy graphics command
         """
         if not cmd in self._contents:
-            self._frame.add(cmd)
+            self._drawn.append(cmd)
             self._contents.add(cmd)
 
+    def attach(self,cmd):
+        """
+        Attaches the given Kivy graphics command to this view until it is detached.
+
+        You should never call this method, since you do not understand raw Kivy graphics
+        commands.  Instead, you should use the `attach` method in :class:`GObject` instead.
+
+        :param cmd: the command to attach
+        :type cmd:  A Kivy graphics command
+        """
+        if self._attached.indexof(cmd) == -1:
+            self._attached.add(cmd)
+
+    def detach(self,cmd):
+        """
+        Detaches the given Kivy graphics command from this view.
+
+        You should never call this method, since you do not understand raw Kivy graphics
+        commands.  Instead, you should use the `detach` method in :class:`GObject` instead.
+
+        :param cmd: the command to detach
+        :type cmd:  A Kivy graphics command
+        """
+        if self._attached.indexof(cmd) != -1:
+            self._attached.remove(cmd)
+
     def clear(self):
         """
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  Attached
+        shapes are not cleared.
         """
-        self._frame.clear()
+        self._drawn = []
         self._contents.clear()
 
     # HIDDEN METHODS
+    def _draw_shape(self,shape):
+        """
+        Draws the given shape to this view.
+
+        The shape drawing cache is brought up to date first.
+
+        :param shape: the shape to draw
+        :type shape:  :class:`GObject`
+        """
+        shape._validate()
+        self.draw(shape._cache)
+
+    def _attach_shape(self,shape):
+        """
+        Attaches the given shape to this view until it is detached.
+
+        :param shape: the shape to attach
+        :type shape:  :class:`GObject`
+        """
+        self.attach(shape._cache)
+
+    def _detach_shape(self,shape):
+        """
+        Detaches the given shape from this view.
+
+        :param shape: the shape to detach
+        :type shape:  :class:`GObject`
+        """
+        self.detach(shape._cache)
+
+    def _commit(self):
+        """
+        Updates the window to show the commands drawn since the last clear.
+
+        This method is called for you automatically at the end of the animation frame.
+        The commands drawn in both this frame and the last, up to the first difference,
+        are left alone.  Only the rest of the window is replaced.  Any shape changed
+        since it was drawn (or attached) is brought up to date first.
+        """
+        GObject._validate_all()
+        drawn = self._drawn
+        shown = self._shown
+        same = 0
+        limit = min(len(drawn),len(shown))
+        while same < limit and drawn[same] is shown[same]:
+            same += 1
+
+        if same == 0:
+            self._frame.clear()
+        else:
+            for pos in range(same,len(shown)):
+                self._frame.remove(shown[pos])
+        for pos in range(same,len(drawn)):
+            self._frame.add(drawn[pos])
+        self._shown = drawn
+
+        from .app import GameApp
+        resets, rebuilt, textures = GObject._take_counts()
+        stats = self._stats
+        stats['groups'] = len(self._attached.children)+len(drawn)
+        stats['changed'] = len(drawn)-same
+        stats['resets'] = resets
+        stats['instructions'] = rebuilt
+        stats['textures'] = textures
+        stats['cached'] = len(GameApp.TEXTURE_CACHE)
+
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -378,4 +547,5 @@ class GView(FloatLayout):
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
+        self.canvas.add(self._attached)
         self.canvas.add(self._frame)
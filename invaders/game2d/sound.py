@@ -179,3 +179,109 @@ class SoundLibrary(object):
         :rtype:  ``iterable``
         """
         return self._data.keys()
+
+
+# #mark -
+class SoundBank(SoundLibrary):
+    """
+    A sound library for sound effects that play often and may overlap.
+    
+    Every sound in the bank is loaded once, as a fixed number of voices (copies of 
+    the same :class:`Sound`), when it is added to the bank::
+        
+        soundbank = SoundBank(voices=3)
+        soundbank['blast'] = 'blast2.wav'
+    
+    To play a sound, you trigger it instead of playing it directly::
+        
+        soundbank.trigger('blast')
+    
+    Triggers are queued until the next call to :meth:`flush`, which you should call 
+    once per animation frame.  Triggering a sound several times in the same frame 
+    plays it only once.  If every voice of a sound is already playing, the voice that
+    started first is restarted, so a sound never has more than ``voices`` copies 
+    playing at once.  Frames with no triggers cost nothing.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def voices(self):
+        """
+        The number of copies of each sound that can play at once.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._voices
+    
+    def __init__(self,voices=1):
+        """
+        Creates a new, empty sound bank.
+        
+        :param voices: The number of copies of each sound that can play at once
+        :type voices:  ``int`` > 0
+        """
+        assert type(voices) == int and voices > 0, 'voices %s is not a positive int' % repr(voices)
+        SoundLibrary.__init__(self)
+        self._voices = voices
+        self._players = {}
+        self._next = {}
+        self._pending = []
+    
+    def __setitem__(self, key, filename):
+        """
+        Loads all of the voices for the file filename and assigns them the given name.
+        
+        :param key: The key identifying a sound
+        :type key:  ``str``
+        
+        :param filename: The name of the file containing the sound source
+        :type filename:  ``str``
+        """
+        players = [Sound(filename) for _ in range(self._voices)]
+        self._data[key] = players[0]
+        self._players[key] = players
+        self._next[key] = 0
+    
+    def __delitem__(self, key):
+        """
+        Deletes all of the voices for the given sound name.
+        
+        :param key: The key identifying a sound
+        :type key:  ``str``
+        """
+        del self._data[key]
+        del self._players[key]
+        del self._next[key]
+        if key in self._pending:
+            self._pending.remove(key)
+    
+    def trigger(self, key):
+        """
+        Queues the given sound to play at the next call to :meth:`flush`.
+        
+        A sound that is already queued is not queued again.
+        
+        :param key: The key identifying a sound
+        :type key:  ``str``
+        """
+        assert key in self._players, '%s is not a sound in this bank' % repr(key)
+        if not key in self._pending:
+            self._pending.append(key)
+    
+    def flush(self):
+        """
+        Plays every queued sound once, and empties the queue.
+        
+        Each sound plays on its next voice, in round-robin order.  If that voice is
+        still playing, it is stopped and restarted.
+        """
+        if not self._pending:
+            return
+        for key in self._pending:
+            players = self._players[key]
+            voice = players[self._next[key]]
+            self._next[key] = (self._next[key]+1) % len(players)
+            if voice.playing:
+                voice.stop()
+            voice.play()
+        self._pending.clear()
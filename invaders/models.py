@@ -27,8 +27,7 @@ about whether to make a new class or not, please ask on Piazza.
 """
 from consts import *
 from game2d import *
-import random
-import math
+import numpy as np
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other
 # than consts.py.  If you need extra information from Gameplay, then it should
@@ -36,7 +35,7 @@ import math
 # calls the method.
 
 
-class Ship(GImage):
+class Ship(GSprite):
     """
     A class to represent the game ship.
 
@@ -58,6 +57,9 @@ class Ship(GImage):
     However, there is no need for any more attributes other than those
     inherited by GImage. You would only add attributes if you needed them
     for extra gameplay features (like animation).
+
+    The ship is drawn from the filmstrip SHIP_STRIP. Frame 0 is the ship,
+    and the rest of the frames are its explosion.
     """
     #  IF YOU ADD ATTRIBUTES, LIST THEM BELOW
     pass
@@ -95,7 +97,8 @@ class Ship(GImage):
         assert type(height) == int or type(height) == float
         assert height >= 0
 
-        super().__init__(x=x, y=y,width = width, height = height, source = 'Ship.png')
+        super().__init__(x=x, y=y,width = width, height = height, source = SHIP_STRIP,
+                         format = SHIP_FORMAT)
 
     # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
     def collideswShip(self, bolt):
@@ -110,163 +113,89 @@ class Ship(GImage):
         #Check if bolt was fired by player
         if bolt.getVelocity() > 0:
             return False
-        if self.contains(bolt.leftTopCorner()) == True:
-            return True
-        elif self.contains(bolt.rightTopCorner()) == True:
-            return True
-        elif self.contains(bolt.leftBottomCorner()) == True:
-            return True
-        elif self.contains(bolt.rightBottomCorner()) == True:
-            return True
-        else:
-            return False
+        #Check the whole distance the bolt moved, so a fast bolt cannot skip the ship
+        return bolt.intersects_swept(self, 0, bolt.getVelocity())
 
     def collideswShip2(self, pup):
         """
-        Returns True if the alien bolt collides with the ship.
-
-        This method returns False if bolt was not fired by an alien.
+        Returns True if the powerup collides with the ship.
 
         Parameter pup: The powerup to check
         Precondition: pup is of class PowerUp
         """
-        #Check if bolt was fired by player
-        if self.contains(pup.leftTopCorner()) == True:
-            return True
-        elif self.contains(pup.rightTopCorner()) == True:
-            return True
-        elif self.contains(pup.leftBottomCorner()) == True:
-            return True
-        elif self.contains(pup.rightBottomCorner()) == True:
-            return True
-        else:
-            return False
+        return self.intersects(pup)
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 
-class Alien(GImage):
+class Aliens(GSpriteBatch):
     """
-    A class to represent a single alien.
-
-    At the very least, you want a __init__ method to initialize the alien
-    dimensions. These dimensions are all specified in consts.py.
+    A class to represent the aliens in the formation.
 
-    You also MIGHT want to add code to detect a collision with a bolt. We
-    do not require this.  You could put this method in Wave if you wanted to.
-    But the advantage of putting it here is that Ships and Aliens collide
-    with different bolts.  Ships collide with Alien bolts, not Ship bolts.
-    And Aliens collide with Ship bolts, not Alien bolts. An easy way to
-    keep this straight is for this class to have its own collision method.
-
-    However, there is no need for any more attributes other than those
-    inherited by GImage. You would only add attributes if you needed them
-    for extra gameplay features (like giving each alien a score value).
+    All of the living aliens are drawn by a single Aliens object, as sprites
+    from the texture atlas. The aliens themselves are simulated in core.py,
+    which also checks them for collisions with the bolts. The sprites are
+    positioned relative to the formation origin, so a march step only moves
+    this object.
     """
     #  IF YOU ADD ATTRIBUTES, LIST THEM BELOW
-    #Attribute: _points: number of points an alien is worth
-    #Invariant: _points is an int >= 0
-    pass
+    # Attribute _regions: the atlas regions of the march poses of each alien kind
+    # Invariant: _regions is an int array of shape (len(ALIEN_STRIPS), ALIEN_POSES)
+    #
+    # Attribute _poses: the atlas region of each sprite, for each march pose
+    # Invariant: _poses is a list of ALIEN_POSES int arrays, each with one entry
+    # per sprite
+    #
+    # Attribute _pose: the march pose the aliens are drawn in
+    # Invariant: _pose is an int in 0..ALIEN_POSES-1
 
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def getAlien_x(self):
+    # INITIALIZER TO CREATE THE ALIENS
+    def __init__(self):
         """
-        Returns the x coordinate of the alien object.
+        Initializes an empty formation of aliens.
         """
-        return self.x
+        super().__init__()
+        self._regions = np.array([self.atlas.frames(strip, ALIEN_FORMAT)[:ALIEN_POSES]
+                                  for strip in ALIEN_STRIPS])
+        self._poses = [self._regions[:0, pose] for pose in range(ALIEN_POSES)]
+        self._pose = 0
 
-    def getAlien_y(self):
+    def getPose(self):
         """
-        Returns the y coordinate of the alien object.
+        Returns the march pose the aliens are drawn in.
         """
-        return self.y
+        return self._pose
 
-    def getAlienpoints(self):
-        """
-        Returns the number of points the alien is worth.
+    def setAliens(self, x, y, kind, pose):
         """
-        return self._points
+        Sets the aliens to draw.
 
-    def setAlien_x(self, value):
-        """
-        Sets x coordinate of the alien object to value.
+        Parameter x: the horizontal offset of each alien from the formation origin
+        Precondition: x is a 1-d array of floats
 
-        Parameter value: the new x coordinate for the alien object
-        Precondition: must be an int or float
-        """
-        assert type(value) in [int, float]
-        self.x = value
+        Parameter y: the vertical offset of each alien from the formation origin
+        Precondition: y is a 1-d array of floats, the same length as x
 
-    def setAlien_y(self, value):
-        """
-        Sets y coordinate of the alien object to value.
+        Parameter kind: the position of each alien filmstrip in ALIEN_STRIPS
+        Precondition: kind is a 1-d int array, the same length as x
 
-        Parameter value: the new y coordinate for the alien object
-        Precondition: must be an int or float
+        Parameter pose: the march pose to draw the aliens in
+        Precondition: pose is an int in 0..ALIEN_POSES-1
         """
-        assert type(value) in [int, float]
-        self.y = value
+        self._poses = [self._regions[kind, p] for p in range(ALIEN_POSES)]
+        self._pose = pose
+        self.set_sprites(self._poses[pose], x, y, ALIEN_WIDTH, ALIEN_HEIGHT)
 
-    # INITIALIZER TO CREATE AN ALIEN
-    def __init__(self, x, y, source, width = ALIEN_WIDTH, height = ALIEN_HEIGHT):
+    def setPose(self, pose):
         """
-        Initializes the alien dimensions.
-
-        Parameter x: The horizontal coordinate of the object center
-        Precondition: Value must be an int or float
+        Changes the march pose of every alien, without moving them.
 
-        Parameter y: The vertical coordinate of the object center
-        Precondition: Value must be an int or float
-
-        Parameter source: The image file of the object created
-        Precondition: Must be a png file
-
-        Parameter width: The horizontal length of the object
-        Precondition: Value must be an int or float and must be >= 0
-
-        Parameter height: The vertical length of the object
-        Precondition: Value must be an int or float and must be >= 0
-        """
-        assert type(x) in [int, float]
-        assert type(y) in [int, float]
-        assert source in ALIEN_IMAGES
-        assert type(width) == int or type(width) == float
-        assert width >= 0
-        assert type(height) == int or type(height) == float
-        assert height >= 0
-
-        super().__init__(x=x, y=y,width = width, height = height, source = source)
-        if source == ALIEN_IMAGES[0]:
-            self._points = 10
-        elif source == ALIEN_IMAGES[1]:
-            self._points = 20
-        elif source == ALIEN_IMAGES[2]:
-            self._points = 30
-
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collideswAlien(self, bolt):
+        Parameter pose: the march pose to draw the aliens in
+        Precondition: pose is an int in 0..ALIEN_POSES-1
         """
-        Returns True if the player bolt collides with this Alien.
+        if pose != self._pose:
+            self._pose = pose
+            self.set_regions(self._poses[pose])
 
-        This method returns False if bolt was not fired by the player.
-
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        #Check if bolt was fired by player
-        if bolt.getVelocity() < 0:
-            return False
-        if self.contains(bolt.leftTopCorner()) == True:
-            return True
-        elif self.contains(bolt.rightTopCorner()) == True:
-            return True
-        elif self.contains(bolt.leftBottomCorner()) == True:
-            return True
-        elif self.contains(bolt.rightBottomCorner()) == True:
-            return True
-        else:
-            return False
-
-     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 class Bolt(GRectangle):
     """
@@ -378,43 +307,19 @@ class Heart(GImage):
         source = 'heart.png'
         super().__init__(x=x, y=y,width = width, height = height, source = source)
 
-class Spark(GEllipse):
+class Sparks(GParticles):
     """
-    A class to represent particles created in shell explosions.
-    """
-    # HIDDEN ATTRIBUTES
-    # Attribute _vx: velocity in x direction
-    # Invariant: _vx is a float
-    #
-    # Attribute _vy: velocity in y direction
-    # Invariant: _vy is a float
-
-    def __init__(self, x, y, color=WHITE_COLOR):
-        """
-        Initializes a particle at (x,y) with random velocity and given color.
+    A class to represent the particles created in shell explosions.
 
-        Parameter x: the starting x-coordinate
-        Precondition: x is a number (int or float)
-
-        Parameter y: the starting y-coordinate
-        Precondition: y is a number (int or float)
-
-        Parameter color: the spark color
-        Precondition: color is a valid color object or name (e.g. a string)
-        """
-        super().__init__(x=x, y=y,
-                         width=PARTICLE_DIAMETER, height=PARTICLE_DIAMETER,
-                         fillcolor=color)
-        self._vy = random.uniform(-MAX_INIT_VEL,MAX_INIT_VEL)
-        self._vx = math.sqrt(MAX_INIT_VEL**2 - self._vy**2) * math.sin(random.uniform(0,2*math.pi))
+    All of the sparks on screen are drawn by a single Sparks object. The
+    sparks themselves are simulated in core.py.
+    """
 
-    def move(self):
+    def __init__(self):
         """
-        Moves the spark by the current velocity
+        Initializes an empty set of sparks.
         """
-        self.x += self._vx
-        self.y += self._vy
-        self._vy += GRAVITY
+        super().__init__(diameter=PARTICLE_DIAMETER)
 
 class PowerUp(GImage):
     """
@@ -8,6 +8,10 @@ you move to a new level, you are expected to make a new instance of the class.
 The subcontroller Wave manages the ship, the aliens and any laser bolts on
 screen. These are model objects.  Their classes are defined in models.py.
 
+The rules of the wave are simulated by a WaveCore (defined in core.py), which
+has no dependency on Kivy. Wave drives that core from the game loop, plays its
+sounds, and keeps the drawables in sync with it.
+
 Most of your work on this assignment will be in either this module or
 models.py. Whether a helper method belongs in this module or models.py is
 often a complicated issue.  If you do not know, ask on Piazza and we will
@@ -19,6 +23,8 @@ answer.
 from game2d import *
 from consts import *
 from models import *
+from core import *
+import numpy as np
 import random
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
@@ -51,100 +57,129 @@ class Wave(object):
 
     """
     # HIDDEN ATTRIBUTES:
-    # Attribute _ship: the player ship to control
-    # Invariant: _ship is a Ship object or None
+    # Attribute _core: the headless simulation of this wave
+    # Invariant: _core is a WaveCore object
     #
-    # Attribute _aliens: the 2d list of aliens in the wave
-    # Invariant: _aliens is a rectangular 2d list containing Alien objects or None
+    # Attribute _ship: the drawable for the player ship
+    # Invariant: _ship is a Ship object, or None if there has never been a ship.
+    # If the core ship is None, _ship is showing the explosion of the last ship.
     #
-    # Attribute _bolts: the laser bolts currently on screen
-    # Invariant: _bolts is a list of Bolt objects, possibly empty
+    # Attribute _wreck: the seconds since the ship was destroyed
+    # Invariant: _wreck is a float >= 0, or None if the core ship is not None
     #
-    # Attribute _dline: the defensive line being protected
-    # Invariant : _dline is a GPath object
+    # Attribute _aliens: the sprite batch drawing the living aliens
+    # Invariant: _aliens is an Aliens object whose position is the formation
+    # origin, with one sprite per living alien at the last sync
     #
-    # Attribute _lives: the number of lives left
-    # Invariant: _lives is an int >= 0
+    # Attribute _aliencount: the number of living aliens at the last sync
+    # Invariant: _aliencount is an int >= 0
     #
-    # Attribute _time: the amount of time since the last Alien "step"
-    # Invariant: _time is a float >= 0s
+    # Attribute _bolts: the drawables for the laser bolts, reused from frame to frame
+    # Invariant: _bolts is a list of Bolt objects, at least as long as the
+    # list of bolts in the core at the last sync
     #
-    # You may change any attribute above, as long as you update the invariant
-    # You may also add any new attributes as long as you document them.
-    # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+    # Attribute _boltcount: the number of bolts in the core at the last sync
+    # Invariant: _boltcount is an int between 0 and len(_bolts); the first
+    # _boltcount drawables in _bolts are the bolts on screen
     #
-    #Attribute _direction: the direction that the aliens are moving
-    #Invariant: _direction is a string that is either "left" or "right"
+    # Attribute _sparks: the drawable for all of the sparks
+    # Invariant: _sparks is a Sparks object
     #
-    #Attribute _fire: the number of steps until an alien fires
-    #Invariant: _fire is an int between 1 and BOLT_RATE
+    # Attribute _sparkcount: the number of sparks in the core at the last sync
+    # Invariant: _sparkcount is an int >= 0, or -1 before the first sync
     #
-    #Attribute _aliensteps: the number of steps alien has taken since firing a bolt
-    #Invariant: _aliensteps: is an int between 0 and BOLT_RATE
+    # Attribute _powerup: the drawables for the power-ups, keyed by core power-up
+    # Invariant: _powerup is a dict mapping PowerUpState objects to PowerUp objects
+    #
+    # Attribute _dline: the defensive line being protected
+    # Invariant : _dline is a GPath object
     #
-    #Attribute _end: when the wave is finished or the user has lost
-    #Invariant: _end is True when the wave is over and False when the wave is not finished
+    # Attribute _heart: the hearts representing the lives
+    # Invariant: _heart is a list of Heart objects with at least as many
+    # elements as the number of lives
     #
-    #Attribute _win: determines if the outcome is a win or a loss
-    #Invariant: _win is True when the player has won or False when the aliens have won
+    # Attribute _static: the layer caching the defensive line and the hearts
+    # Invariant: _static is a GLayer the size of the game, whose children are
+    # _dline and the first _lifecount hearts
     #
-    #Attribute: _speed: the speed of the alien movement
-    #Invariant: the number of seconds (0 < float <= 1) between alien steps
+    # Attribute _lifecount: the number of lives when _static was last updated
+    # Invariant: _lifecount is an int, -1 before the first update
     #
-    #Attribute: _alienrows: the number of rows of aliens
-    #Invariant: _alienrows is an int between ALIEN_ROWS and 10
+    # Attribute _alpha: how far into the next update to draw moving objects
+    # Invariant: _alpha is a float in [0,1]; at 1 objects are drawn where the
+    # core has them, and at 0 where they were one update earlier
     #
-    #Attribute: _score: the player score
-    #Invariant: _score is a int >= 0
+    # Attribute _sounds: the sound effects of the game, keyed by file name
+    # Invariant: _sounds is a SoundBank object containing every sound in GAME_SOUNDS
     #
-    #Attribute: _release: the number of steps alien until a PowerUp is released
-    #Invariant: _release is an int between 0 and BOLT_RATE
+    # Attribute _profiler: the profiler that times the phases of this wave
+    # Invariant: _profiler is a GProfiler object. Each phase is named 'wave.'
+    # followed by the method it times ('wave.sync' is the sync in draw)
+    #
+    # The rest of the game state (lives, score, timers, etc.) lives in _core.
 
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getShip(self):
         """
-        Returns the value of self._ship
+        Returns the player ship, or None if it was destroyed
         """
-        return self._ship
+        return self._core.getShip()
 
     def getLives(self):
         """
-        Returns the value of self._lives
+        Returns the number of lives left
         """
-        return self._lives
+        return self._core.getLives()
 
     def getSpeed(self):
         """
-        Returns the value of self._speed
+        Returns the number of seconds between alien steps
         """
-        return self._speed
+        return self._core.getSpeed()
 
     def getScore(self):
         """
-        Returns the value of self._score
+        Returns the player score
         """
-        return self._score
+        return self._core.getScore()
 
     def getAlienRows(self):
         """
-        Returns the value of self._alienrows
+        Returns the number of rows of aliens
         """
-        return self._alienrows
+        return self._core.getAlienRows()
 
     def getEnd(self):
         """
-        Returns the value of self._end.
+        Returns True if the wave is finished
         """
-        return self._end
+        return self._core.getEnd()
 
     def getWin(self):
         """
-        Returns the value of self._win.
+        Returns True if the player has won the wave
         """
-        return self._win
+        return self._core.getWin()
 
-    def __init__(self, lives, speed, alienrows, score):
+    def getCore(self):
+        """
+        Returns the headless simulation of this wave
+        """
+        return self._core
+
+    def setAlpha(self, alpha):
+        """
+        Sets how far between the last two updates to draw moving objects
+
+        Parameter alpha: the fraction of an update since the last update
+        Precondition: alpha is a float in [0,1]
+        """
+        assert type(alpha) in [int, float] and 0 <= alpha <= 1
+        self._alpha = alpha
+
+    def __init__(self, lives, speed, alienrows, score, sounds, profiler=None,
+                 seed=None):
         """
         Initializing the wave.
 
@@ -153,68 +188,79 @@ class Wave(object):
 
         Parameter speed: the speed the aliens move across the screen
         Precondition: speed is a float between 0 and ALIEN_SPEED
+
+        Parameter alienrows: the number of rows of aliens
+        Precondition: alienrows is an int between 1 and 10
+
+        Parameter score: the player score at the start of the wave
+        Precondition: score is an int >= 0
+
+        Parameter sounds: the sound effects of the game, keyed by file name
+        Precondition: sounds is a SoundBank object containing GAME_SOUNDS
+
+        Parameter profiler: the profiler to time the phases of the wave in
+        Precondition: profiler is a GProfiler object, or None to not time them
+
+        Parameter seed: the seed for the random choices of the wave (which
+        alien fires, where power ups fall, how sparks fly)
+        Precondition: seed is None or an int >= 0
         """
-        self._alienrows = alienrows
-        self._aliens = self._createList()
-        self._ship = Ship(GAME_WIDTH/2, SHIP_BOTTOM)
+        self._core = WaveCore(lives, speed, alienrows, score, seed=seed)
+        self._sounds = sounds
+        self._aliens = Aliens()
+        self._aliencount = -1
+        self._ship = None
+        self._wreck = None
         line = [0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE]
         self._dline = GPath(points = line, linewidth = 3, linecolor = 'white')
-        self._time = 0
-        self._direction = 'right'
         self._bolts = []
-        self._fire = random.randint(1,BOLT_RATE)
-        self._aliensteps = 0
-        self._lives = lives
-        self._end = False
-        self._win = False
+        self._boltcount = 0
+        self._sparks = Sparks()
+        self._sparkcount = -1
+        self._powerup = {}
         self._heart = self._drawLives()
-        self._speed = speed
-        self._sparks = []
-        self._score = score
-        self._time2 = 0
-        self._release = random.randint(5, PUP_RATE)
-        self._powerup = []
+        self._static = GLayer(x = GAME_WIDTH/2, y = GAME_HEIGHT/2,
+                              width = GAME_WIDTH, height = GAME_HEIGHT)
+        self._lifecount = -1
+        self._alpha = 1.0
+        self._profiler = GProfiler() if profiler is None else profiler
 
     def updatePowerUp(self, dt):
         """
+        Releases, moves and collects the power-ups.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._profiler.begin('wave.updatePowerUp')
+        self._core.updatePowerUp(dt)
+        self._playSounds()
+        self._profiler.end('wave.updatePowerUp')
+
+    def updateWreck(self, dt):
         """
-        self._time2 = self._time2+ dt
-        if self._release <= self._time2:
-            x = random.randint(0, GAME_WIDTH)
-            self._powerup.append(PowerUp(x))
-            self._release = random.randint(5, PUP_RATE)
-            self._time2 = 0
-
-        for i in range(len(self._powerup)):
-            self._powerup[i].y = self._powerup[i].y + PUP_SPEED
-        j = 0
-        while j < len(self._powerup):
-            if self._ship.collideswShip2(self._powerup[j]) == True:
-                del self._powerup[j]
-                self._lives = min(self._lives + 1, 5)
-                self._heart = self._drawLives()
-                j = len(self._powerup)
-            else:
-                j += 1
-        #delete powerup
-        i = 0
-        while i < len(self._powerup):
-            if self._powerup[i].y > GAME_WIDTH or self._powerup[i].y < 0:
-                del self._powerup[i]
-            else:
-                i += 1
+        Moves the explosion of a destroyed ship forward in time.
 
+        Invaders calls this every update, whatever its state, so the explosion
+        still plays while the game is paused for the lost life.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self._core.getShip() is None:
+            self._wreck = (0.0 if self._wreck is None else self._wreck)+dt
+        else:
+            self._wreck = None
 
     def shipAlive(self):
         """
-        Changes the self._ship from None to a ship object and resets bolts
+        Creates a new ship and removes all bolts
         """
-        self._ship = Ship(GAME_WIDTH/2, SHIP_BOTTOM)
-        self._bolts = []
+        self._core.shipAlive()
 
     def updateShip(self, dt, input):
         """
-        Animates the self._ship and makes it move left and right.
+        Animates the ship and makes it move left and right.
 
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
@@ -222,12 +268,9 @@ class Wave(object):
         Attribute input: the input (inherited from GameApp)
         Precondition: input is an instance of GInput
         """
-        da = self._ship.x
-        if input.is_key_down('left'):
-            da = max(da -SHIP_MOVEMENT, SHIP_WIDTH/2)
-        if input.is_key_down('right'):
-            da = min(da+SHIP_MOVEMENT,GAME_WIDTH-SHIP_WIDTH/2)
-        self._ship.x = da
+        self._profiler.begin('wave.updateShip')
+        self._core.updateShip(dt, input)
+        self._profiler.end('wave.updateShip')
 
     def updateAlienMovement(self, dt):
         """
@@ -236,33 +279,13 @@ class Wave(object):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        self._time = self._time + dt
-        if not self._checksifAlien():
-            if self._time > self._speed:
-                if self._direction == 'right':
-                    self._alienMoveRight()
-                    self._time = 0
-                    self._aliensteps = self._aliensteps + 1
-                elif self._direction == 'left':
-                    self._alienMoveLeft()
-                    self._time = 0
-                    self._aliensteps = self._aliensteps + 1
-
-        self._crossDline()
-        #move Sparks
-        for spark in self._sparks:
-            spark.move()
-        #Deletes Sparks
-        i = 0
-        while i < len(self._sparks):
-            if self._sparks[i].y < -10:
-                del self._sparks[i]
-            else:
-                i += 1
+        self._profiler.begin('wave.updateAlienMovement')
+        self._core.updateAlienMovement(dt)
+        self._profiler.end('wave.updateAlienMovement')
 
     def updateBolts(self, dt, input):
         """
-        Animates the bolts from both the players and modifies self._bolts for each bolt
+        Fires new bolts and moves all of the bolts on screen
 
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
@@ -270,301 +293,223 @@ class Wave(object):
         Attribute input: the input (inherited from GameApp)
         Precondition: input is an instance of GInput
         """
-        if self._end == False:
-            self._updatePlayerBolts(dt, input)
-            self._updateAlienBolts(dt)
-            for i in range(len(self._bolts)):
-                self._bolts[i].y = self._bolts[i].y + self._bolts[i].getVelocity()
-
-            #Delete player bolts once they are off offscreen
-            i = 0
-            while i < len(self._bolts):
-                if self._bolts[i].y > GAME_WIDTH or self._bolts[i].y < 0:
-                    del self._bolts[i]
-                else:
-                    i += 1
+        self._profiler.begin('wave.updateBolts')
+        self._core.updateBolts(dt, input)
+        self._playSounds()
+        self._profiler.end('wave.updateBolts')
 
     def alienDead(self, dt):
         """
-        Sets an alien that is hit by bolt to None and changes self._win if all aliens are None
+        Removes any alien hit by a bolt and ends the wave if all aliens are dead
 
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        pewSound = Sound('blast2.wav')
-        for c in range(len(self._aliens)):
-            for r in range(len(self._aliens[c])):
-                for i in range(len(self._bolts)):
-                    if self._aliens[c][r] != None:
-                        if self._aliens[c][r].collideswAlien(self._bolts[i]) == True:
-                            pewSound.play()
-                            self._explodeAlien(self._aliens[c][r])
-                            self._addsScore(self._aliens[c][r])
-                            self._aliens[c][r] = None
-                            del self._bolts[i]
-        self._end = self._checksifAlien()
-        if self._checksifAlien() == True:
-            self._win = True
-
-    def _addsScore(self, alien):
-        """
-        Adds to the player score, each time an alien is hit.
-
-        Parameter alien: the alien whose points are being added
-        Preondition: alien is an Alien object
-        """
-        points = alien.getAlienpoints()
-        self._score = self._score + points
+        self._profiler.begin('wave.alienDead')
+        self._core.alienDead(dt)
+        self._playSounds()
+        self._profiler.end('wave.alienDead')
 
     def shipDead(self, dt):
         """
-        Alters self._lives, self._ship, and self._win when ship is hit by bolt
+        Destroys the ship (and takes a life) when it is hit by a bolt
 
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        i = 0
-        pewSound = Sound('blast2.wav')
-        while i < len(self._bolts):
-            if self._ship.collideswShip(self._bolts[i]) == True:
-                del self._bolts[i]
-                self._ship = None
-                pewSound.play()
-                self._lives = self._lives - 1
-                if self._lives == 0:
-                    self._win = False
-                i = len(self._bolts)
-            else:
-                i += 1
+        self._profiler.begin('wave.shipDead')
+        self._core.shipDead(dt)
+        self._playSounds()
+        self._profiler.end('wave.shipDead')
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
     def draw(self, view):
         """
         Draws the aliens, ship, defense line, and bolts onto the screen
         """
+        self._profiler.begin('wave.sync')
+        self._sync()
+        self._profiler.end('wave.sync')
         #Draw the aliens
-        for col in range(len(self._aliens)):
-            for row in range(len(self._aliens[col])):
-                if not (self._aliens[col][row] is None):
-                    self._aliens[col][row].draw(view)
+        self._aliens.draw(view)
         #Draw the ship
         if self._ship != None:
             self._ship.draw(view)
-        #Draw the defensive line
-        self._dline.draw(view)
+        #Draw the defensive line and lives
+        self._static.draw(view)
         #Draw Bolts
-        for things in range(len(self._bolts)):
-            self._bolts[things].draw(view)
-        #Draw Lives
-        for hearts in range(self._lives):
-            self._heart[hearts].draw(view)
-
+        for i in range(self._boltcount):
+            self._bolts[i].draw(view)
         #Draw Sparks
-        for spark in range(len(self._sparks)):
-            self._sparks[spark].draw(view)
-
-        for pup in range(len(self._powerup)):
-            self._powerup[pup].draw(view)
+        self._sparks.draw(view)
+        #Draw PowerUps
+        for pup in self._powerup.values():
+            pup.draw(view)
 
+    # HELPER METHODS
+    def _playSounds(self):
+        """
+        Triggers the sounds for the events recorded by the core.
 
-    def _drawLives(self):
+        The sounds play when Invaders flushes the sound bank at the end of the
+        update, so a sound triggered twice in one update plays once.
         """
-        Helper to draw the hearts represting each life.
+        for source in self._core.popEvents():
+            self._sounds.trigger(source)
+
+    def _sync(self):
         """
-        y = GAME_HEIGHT - ALIEN_V_SEP - 25
-        thing = ALIEN_H_SEP + 30
-        list = []
-        for life in range(self._lives):
-            x = 2*thing + 50*(life - 1)
-            list.append(Heart(x, y))
-        return list
+        Updates the drawables to match the state of the core.
 
-    def _alienMoveRight(self):
-        """
-        Animates the aliens and makes them move right.
-        """
-        #Figure out which is the last alien
-        good_c = self._findRightAlien()
-        good_r = self._bottomAlien(good_c)
-        x_last_A = self._aliens[good_r][good_c].getAlien_x()
-        check = x_last_A + ALIEN_H_WALK + ALIEN_H_SEP
-        if check < GAME_WIDTH - ALIEN_H_SEP:
-            for col in range(len(self._aliens)):
-                for row in range(len(self._aliens[col])):
-                    if not (self._aliens[col][row] is None):
-                        new = self._aliens[col][row].getAlien_x() + ALIEN_H_WALK
-                        self._aliens[col][row].setAlien_x(new)
+        Moving objects are drawn _alpha of the way from where they were before
+        the last update to where they are now. The aliens march in discrete
+        steps, so they are always drawn where they are.
+        """
+        lag = 1-self._alpha
+        ship = self._core.getShip()
+        if ship is None:
+            self._syncWreck()
         else:
-            self._alienMoveDown()
-            self._direction = "left"
+            if self._ship is None:
+                self._ship = Ship(ship.x, ship.y)
+            self._ship.x = ship.x-lag*(ship.x-ship.px)
+            self._ship.frame = 0
+            self._wreck = None
+
+        self._syncAliens()
+        self._syncBolts()
+        self._syncSparks()
+        self._powerup = self._syncList(self._core.getPowerUps(), self._powerup,
+                                       lambda p: PowerUp(p.x),
+                                       lambda p: (0, PUP_SPEED))
 
-    def _findLeftAlien(self):
+        if self._core.getLives() > len(self._heart):
+            self._heart = self._drawLives()
+        self._syncStatic()
+
+    def _syncStatic(self):
         """
-        Returns the column of the left-most column of aliens that is not None
+        Updates the layer of the defensive line and hearts.
+
+        The layer is only drawn again when the number of lives changes.
         """
-        for i in range(ALIENS_IN_ROW):
-            for j in range(self._alienrows):
-                if self._aliens[j][i] != None:
-                    return i
+        lives = self._core.getLives()
+        if lives != self._lifecount:
+            self._lifecount = lives
+            self._static.children = [self._dline] + self._heart[:lives]
 
-    def _findRightAlien(self):
+    def _syncAliens(self):
         """
-        Returns the column of right-most column of aliens that is not None
+        Updates the alien sprites to match the formation in the core.
+
+        A march step only moves the sprite batch and changes the pose of the
+        aliens. The sprites themselves are only rebuilt when an alien has died
+        since the last sync.
         """
-        for i in range(ALIENS_IN_ROW):
-            for j in range(self._alienrows):
-                if self._aliens[j][ALIENS_IN_ROW-1-i] != None:
-                    return ALIENS_IN_ROW-1-i
+        aliens = self._core.getAliens()
+        self._aliens.x = aliens.originx
+        self._aliens.y = aliens.originy
+
+        pose = aliens.version % ALIEN_POSES
+        if aliens.count != self._aliencount:
+            self._aliencount = aliens.count
+            alive = aliens.alive
+            self._aliens.setAliens(aliens.localx[alive], aliens.localy[alive],
+                                   aliens.kind[alive], pose)
+        else:
+            self._aliens.setPose(pose)
 
-    def _alienMoveLeft(self):
+    def _syncWreck(self):
         """
-        Animates the aliens and makes them move left
+        Updates the explosion of the ship after it has been destroyed.
+
+        The explosion moves on one frame every SHIP_EXPLODE seconds (see
+        updateWreck), and stays on its last frame once it is over.
         """
-        good_c = self._findLeftAlien()
-        good_r = self._bottomAlien(good_c)
-        x_first_A = self._aliens[good_r][good_c].getAlien_x()
+        if self._ship is None:
+            return
+        wreck = 0.0 if self._wreck is None else self._wreck
+        frame = 1+int(wreck/SHIP_EXPLODE)
+        self._ship.frame = min(frame, self._ship.count-1)
 
-        check = x_first_A - ALIEN_H_WALK - ALIEN_H_SEP
-        if check > 0 + ALIEN_H_SEP:
-            for col in range(len(self._aliens)):
-                for row in range(len(self._aliens[col])):
-                    if not (self._aliens[col][row] is None):
-                        new = self._aliens[col][row].getAlien_x() - ALIEN_H_WALK
-                        self._aliens[col][row].setAlien_x(new)
-        else:
-            self._alienMoveDown()
-            self._direction = "right"
+    def _syncBolts(self):
+        """
+        Updates the bolt drawables to match the bolts in the core.
 
-    def _alienMoveDown(self):
+        All bolts look the same, so the i-th drawable simply draws the i-th
+        bolt in the core. New drawables are only made when there are more
+        bolts on screen than ever before in this wave.
         """
-        Animates the aliens and makes them move down
+        bolts = self._core.getBolts()
+        lag = 1-self._alpha
+        while len(self._bolts) < len(bolts):
+            self._bolts.append(Bolt(BOLT_SPEED, 0, 0))
+        for i in range(len(bolts)):
+            bolt = bolts[i]
+            self._bolts[i].x = bolt.x
+            self._bolts[i].y = bolt.y-lag*bolt.velocity
+        self._boltcount = len(bolts)
+
+    def _syncSparks(self):
         """
-        for col in range(len(self._aliens)):
-            for row in range(len(self._aliens[col])):
-                if not (self._aliens[col][row] is None):
-                    new = self._aliens[col][row].getAlien_y() - ALIEN_V_WALK
-                    self._aliens[col][row].setAlien_y(new)
-
-        if self._direction == 'right':
-            self._direction = 'left'
-        if self._direction == 'left':
-            self._direction = 'right'
-        #Gameover when Alien_y is less than D_Line
+        Updates the spark drawable to match the particles in the core.
 
-    def _updatePlayerBolts(self, dt, input):
-        """
-        Fires a bolt from the player
-        """
-        boltFired = False
-        pewSound = Sound('pew2.wav')
-        old_len = len(self._bolts)
-        for i in range(len(self._bolts)):
-            if self._bolts[i].getVelocity() > 0:
-                boltFired = True
-        if boltFired == False:
-            if input.is_key_down('up'):
-                x = self._ship.getShip_x()
-                y = SHIP_HEIGHT/2 + SHIP_BOTTOM + BOLT_HEIGHT/2
-                new = Bolt(0,x, y)
-                new.isPlayerBolt()
-                self._bolts.append(new)
-        if len(self._bolts) > old_len:
-            pewSound.play()
-
-    def _updateAlienBolts(self, dt):
-        """
-        Figures out which alien to fire and fires the bolt from that alien
-        """
-        #Figuring out column of aliens
-        pewSound = Sound('pop1.wav')
-        thing = False
-        while thing == False:
-            column = random.randint(0,len(self._aliens[0])-1)
-            for aliens in range(len(self._aliens)):
-                if self._aliens[aliens][column] != None:
-                    thing = True
-
-        if self._aliensteps == self._fire:
-            #Fire Bolt
-            key_alien_row = self._bottomAlien(column)
-            x_pos = self._aliens[key_alien_row][column].getAlien_x()
-            y_pos = self._aliens[key_alien_row][column].getAlien_y() - ALIEN_HEIGHT/2
-            new = Bolt(0, x_pos, y_pos)
-            new.isAlienBolt()
-            self._bolts.append(new)
-            pewSound.play()
-            self._fire = random.randint(1,BOLT_RATE)
-            self._aliensteps = 0
-
-    def _bottomAlien(self, column):
-        """
-        Returns the bottom most alien in column that is not None
-
-        Parameter: column is a column in self._aliens
-        Precondition: column is an int between 0 and number of columns
-        in self._aliens
-        """
-
-        for aliens in range(len(self._aliens)):
-            if self._aliens[aliens][column] != None:
-                return aliens
-
-    def _crossDline(self):
-        """
-        Sets self._end to True if bottom alien has crossed dline
-        """
-        for c in range(len(self._aliens)):
-            for r in range(len(self._aliens[c])):
-                if self._aliens[c][r] != None:
-                    if self._aliens[c][r].getAlien_y() - ALIEN_HEIGHT/2 < DEFENSE_LINE:
-                        self._end = True
-                        self._win = False
-
-    def _checksifAlien(self):
-        """
-        Sees if the all of the aliens in self._aliens are None
-        """
-        for c in range(len(self._aliens)):
-            for r in range(len(self._aliens[c])):
-                if self._aliens[c][r] != None:
-                    return False
-        return True
-
-    def _explodeAlien(self, alien):
-        """
-        Explodes the alien when a bolt hits it.
-
-        Parameter alien: The alien to explode
-        Precondition: alien must be of type Alien
-        """
-        color = introcs.RGB(random.randrange(256),
-                            random.randrange(256),
-                            random.randrange(256))
-        for i in range(PARTICLES_PER_SHELL):
-            spark = Spark(alien.getAlien_x(), alien.getAlien_y(), color)
-            self._sparks.append(spark)
-
-    def _createList(self):
-        """
-        Returns a 2d list of Alien objects
-        """
-        lista = []
-        first_x = ALIEN_H_SEP + ALIEN_WIDTH/2
-        first_y = GAME_HEIGHT - (ALIEN_CEILING + ALIEN_HEIGHT/2 +
-        (self._alienrows-1)*ALIEN_HEIGHT + (self._alienrows-1)*ALIEN_V_SEP)
-        for i in range(self._alienrows):
-            #this is the number of rows of aliens
-            listb = []
-            for j in range(ALIENS_IN_ROW):
-                #number of aliens in EACH row
-                if i%6 == 0 or i%6 == 1:
-                    listb.append(Alien(first_x, first_y, ALIEN_IMAGES[0]))
-                elif i%6 == 2 or i%6 == 3:
-                    listb.append(Alien(first_x, first_y, ALIEN_IMAGES[1]))
-                elif i%6 == 4 or i%6 == 5:
-                    listb.append(Alien(first_x, first_y, ALIEN_IMAGES[2]))
-                first_x = first_x + ALIEN_H_SEP + ALIEN_WIDTH
-            lista.append(listb)
-            first_y = first_y + ALIEN_V_SEP + ALIEN_HEIGHT
-            first_x = ALIEN_H_SEP + ALIEN_WIDTH/2
-        return lista
+        Most of the time there are no sparks, and then the drawable is only
+        emptied once, when the last spark goes out.
+        """
+        sparks = self._core.getSparks()
+        n = sparks.count
+        if n == 0 and self._sparkcount == 0:
+            return
+        self._sparkcount = n
+        lag = 1-self._alpha
+        x = sparks.x[:n]-lag*sparks.vx[:n]
+        y = sparks.y[:n]-lag*(sparks.vy[:n]-GRAVITY)
+        self._sparks.set_particles(x, y, sparks.colors[:n])
+
+    def _syncList(self, states, drawables, create, velocity):
+        """
+        Returns a dict of drawables for states, reusing those in drawables.
+
+        Parameter states: the core objects to draw
+        Precondition: states is a list of Box objects
+
+        Parameter drawables: the drawables from the previous frame
+        Precondition: drawables is a dict mapping core objects to GObjects
+
+        Parameter create: the function to make a drawable for a new core object
+        Precondition: create is a function taking one core object
+
+        Parameter velocity: the function giving how far a core object moved in
+        the last update
+        Precondition: velocity is a function taking one core object and
+        returning a pair of numbers
+        """
+        lag = 1-self._alpha
+        result = {}
+        for state in states:
+            if state in drawables:
+                shape = drawables[state]
+            else:
+                shape = create(state)
+            if lag:
+                dx, dy = velocity(state)
+                shape.x = state.x-lag*dx
+                shape.y = state.y-lag*dy
+            else:
+                shape.x = state.x
+                shape.y = state.y
+            result[state] = shape
+        return result
+
+    def _drawLives(self):
+        """
+        Helper to draw the hearts represting each life.
+        """
+        y = GAME_HEIGHT - ALIEN_V_SEP - 25
+        thing = ALIEN_H_SEP + 30
+        list = []
+        for life in range(self._core.getLives()):
+            x = 2*thing + 50*(life - 1)
+            list.append(Heart(x, y))
+        return list